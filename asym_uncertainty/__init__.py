@@ -13,10 +13,22 @@
 #    You should have received a copy of the GNU General Public License
 #    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
 
+from .adaptive import *
 from .algebra import *
 from .asym_uncertainty import *
 from .auxiliary import *
+from .buffer_pool import *
+from .copula import *
+from .draw_cache import *
 from .evaluation import *
+from .expression_graph import *
 from .functions import *
 from .io import *
 from .mc_statistics import *
+from .mode_estimators import *
+from .operation_cache import *
+from .options import *
+from .quasi_random import *
+from .random_streams import *
+from .streaming import *
+from .unc_array import *
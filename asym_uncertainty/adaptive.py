@@ -0,0 +1,218 @@
+"""Adaptive Monte-Carlo propagation with an automatic number of random values"""
+
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+import warnings
+
+from numpy import absolute, array, concatenate, extract, sqrt, std
+
+from .asym_uncertainty import Unc
+from .evaluation import evaluate
+from .io import pdg_rounding_exponent
+from .mc_statistics import as_sample_array, randn_asym
+from .random_streams import STREAM_RESAMPLING, generator
+
+ADAPTIVE_BATCH_SIZE = int(1e4) # Default number of random values per batch, the minimum
+# recommended by JCGM 101 for a 95 % coverage interval
+ADAPTIVE_MAX_N_RANDOM = int(1e7) # Default maximum number of random values
+ADAPTIVE_MIN_BATCHES = 2 # Minimum number of batches to estimate the spread of the results
+
+def sample_input(operand, n_random, block):
+    """Sample a batch of random values for an input of adaptive_propagation()
+
+    Parameters
+    ----------
+    operand : Unc, int or float
+        Input quantity. Numbers and exact Unc objects are returned as constants. Unc objects \
+with stored random values are re-sampled with replacement, see sample_inputs().
+    n_random : positive int
+        Number of random values
+    block : non-negative int
+        Index of the batch, which selects an independent block of the stream of operand.seed
+
+    Returns
+    -------
+    rand : ndarray or float
+        Random values of the input
+    """
+
+    return sample_inputs([operand], n_random, block)[0]
+
+def sample_inputs(inputs, n_random, block):
+    """Sample a batch of random values for all inputs of adaptive_propagation()
+
+    Unc objects with stored random values are re-sampled with replacement. All stored \
+inputs with the same number of random values share the same random indices, which are drawn \
+from the stream STREAM_RESAMPLING of the first of them. Therefore, correlations between \
+stored inputs are preserved, for example between stored quantities and a stored result of \
+them, or between the copies returned by copula.correlate(). Other inputs are sampled \
+independently from the stream of their seed.
+
+    Parameters
+    ----------
+    inputs : list of Unc, int or float
+        Input quantities. Numbers and exact Unc objects are returned as constants.
+    n_random : positive int
+        Number of random values
+    block : non-negative int
+        Index of the batch, which selects an independent block of the streams of the seeds
+
+    Returns
+    -------
+    rands : list of ndarray or float
+        Random values of the inputs
+    """
+
+    indices = {}
+    rands = []
+    for operand in inputs:
+        if isinstance(operand, (int, float)):
+            rands.append(operand)
+        elif operand.is_exact:
+            rands.append(operand.mean_value)
+        elif len(operand.random_values) > 1:
+            n_stored = len(operand.random_values)
+            if n_stored not in indices:
+                rng = generator(operand.seed, stream=STREAM_RESAMPLING, block=block)
+                indices[n_stored] = rng.integers(n_stored, size=n_random)
+            rands.append(as_sample_array(operand.random_values[indices[n_stored]]))
+        else:
+            rands.append(randn_asym(operand.mean_value, [operand.sigma_low, operand.sigma_up],
+                                    limits=operand.limits, random_seed=operand.seed,
+                                    n_random=n_random, block=block))
+
+    return rands
+
+def numerical_tolerance(evaluation):
+    """Get the numerical tolerance of a result according to JCGM 101 (7.9.2)
+
+    The tolerance is half a unit of the last digit that Unc.round_digits() displays.
+
+    Parameters
+    ----------
+    evaluation : [float, float, float]
+        Most probable value, lower and upper uncertainty as returned by evaluation.evaluate()
+
+    Returns
+    -------
+    tolerance : float
+        Numerical tolerance, or None if all values are zero
+    """
+
+    values = absolute(array(evaluation))
+    if evaluation[1] > 0. and evaluation[2] > 0.:
+        values = values[1:]
+    nonzero = extract(values > 0., values)
+    if len(nonzero) == 0:
+        return None
+
+    return 0.5*10.**pdg_rounding_exponent(nonzero.min())
+
+def adaptive_propagation(model, *inputs, batch_size=ADAPTIVE_BATCH_SIZE,
+                         max_n_random=ADAPTIVE_MAX_N_RANDOM, store=False):
+    """Propagate uncertainties through a model with the adaptive Monte-Carlo procedure of \
+JCGM 101:2008 (7.9)
+
+    Random values are generated in batches of batch_size values. For each batch, the most \
+probable value and the limits of the shortest coverage interval are determined. After each \
+batch, the standard deviations s of their averages over all batches are compared to \
+the numerical tolerance delta, which is half a unit of the last digit displayed by \
+Unc.round_digits(). The procedure stops if 2*s <= delta for all three values, or if \
+max_n_random values have been generated. The result is evaluated from all random values.
+
+    Each input is sampled once per batch, from an independent block of the stream of its \
+seed (see random_streams.seed_sequence()). Therefore, the procedure is reproducible, and an \
+input which appears several times in the model is fully correlated with itself. Inputs with \
+stored random values are re-sampled jointly, which preserves their correlations (see \
+sample_inputs()).
+
+    Example
+    -------
+    x = Unc(1., 0.1, 0.2)
+    y = Unc(2., 0.3, 0.3, limits=[0., inf])
+    z = adaptive_propagation(lambda x, y: x*numpy.exp(-y), x, y)
+
+    Parameters
+    ----------
+    model : function
+        Function of the inputs, which must accept numpy arrays and scalars as arguments \
+and return a numpy array of the same length as the input arrays
+    *inputs : Unc, int or float
+        Inputs of the model
+    batch_size : positive int, optional
+        Number of random values per batch (default: ADAPTIVE_BATCH_SIZE)
+    max_n_random : positive int, optional
+        Maximum total number of random values (default: ADAPTIVE_MAX_N_RANDOM)
+    store : bool, optional
+        Store the random values in the result (default: False)
+
+    Returns
+    -------
+    result : Unc
+        Result of the model, whose n_random is the total number of random values that was \
+needed
+    """
+
+    try:
+        if not isinstance(batch_size, int) or batch_size < 2:
+            raise ValueError("batch_size must be an int > 1")
+        if max_n_random < ADAPTIVE_MIN_BATCHES*batch_size:
+            raise ValueError("max_n_random must allow for at least %i batches" %
+                             ADAPTIVE_MIN_BATCHES)
+        for operand in inputs:
+            if not isinstance(operand, (int, float, Unc)):
+                raise ValueError("Inputs must be either a built-in numerical type or Unc")
+    except ValueError:
+        print("ValueError")
+        raise
+
+    batches = []
+    batch_results = []
+    stable = False
+
+    while not stable and (len(batches) + 1)*batch_size <= max_n_random:
+        block = len(batches)
+        rand_result = model(*sample_inputs(inputs, batch_size, block))
+        batches.append(rand_result)
+
+        batch_evaluation = evaluate(rand_result)[0]
+        batch_results.append([batch_evaluation[0], batch_evaluation[0] - batch_evaluation[1],
+                              batch_evaluation[0] + batch_evaluation[2]])
+
+        if len(batches) < ADAPTIVE_MIN_BATCHES:
+            continue
+
+        results = array(batch_results)
+        tolerance = numerical_tolerance([results[:, 0].mean(),
+                                         results[:, 0].mean() - results[:, 1].mean(),
+                                         results[:, 2].mean() - results[:, 0].mean()])
+        if tolerance is None:
+            stable = True
+        else:
+            spread = std(results, axis=0, ddof=1)/sqrt(len(batches))
+            stable = bool((2.*spread <= tolerance).all())
+
+    if not stable:
+        warnings.warn("Adaptive propagation did not stabilize within %i random values." %
+                      max_n_random, RuntimeWarning)
+
+    rand_result = concatenate(batches)
+    if store:
+        return Unc(random_values=rand_result, store=True)
+
+    evaluation = evaluate(rand_result, overwrite_input=True)[0]
+
+    return Unc(evaluation[0], evaluation[1], evaluation[2], n_random=len(rand_result))
@@ -17,10 +17,15 @@
 
 import warnings
 
-from numpy import array
+from numpy import add as nadd
+from numpy import power as npower
+from numpy import array, multiply, subtract, true_divide
 from numpy import abs as nabs
 
-from .mc_statistics import randn_asym
+from .auxiliary import asym_normal_mean
+from .buffer_pool import BUFFER_POOL
+from .mc_statistics import as_sample_array, control_variate_weights, randn_asym, sample_dtype
+from .options import get_option, with_current_options
 
 from .evaluation import evaluate
 from .io import check_numeric
@@ -35,7 +40,7 @@ def add(self, other):
         store_rand_result = True
 
     if isinstance(other, (int, float)):
-        return [([self.mean_value + other, self.sigma_low, self.sigma_up],
+        return [(lambda: [self.mean_value + other, self.sigma_low, self.sigma_up],
                  self.random_values+other),
                 store_rand_result]
 
@@ -46,32 +51,25 @@ def add(self, other):
         return [([2.*self.mean_value, 2.*self.sigma_low, 2.*self.sigma_up], array([0.])),
                 store_rand_result]
 
-    if other.is_exact:
-        return [([self.mean_value + other.mean_value, self.sigma_low, self.sigma_up],
+    if is_exact_constant(other):
+        return [(lambda: [self.mean_value + other.mean_value, self.sigma_low, self.sigma_up],
                  self.random_values + other.mean_value),
                 store_rand_result]
-    if self.is_exact:
-        return [([self.mean_value + other.mean_value, other.sigma_low, other.sigma_up],
+    if is_exact_constant(self):
+        return [(lambda: [self.mean_value + other.mean_value, other.sigma_low, other.sigma_up],
                  self.mean_value + other.random_values), store_rand_result]
 
-    if self.store:
-        rand_self = self.random_values
-    else:
-        rand_self = randn_asym(self.mean_value, [self.sigma_low, self.sigma_up],
-                               limits=self.limits, random_seed=self.seed,
-                               n_random=self.n_random)
-    if self.store:
-        rand_other = other.random_values
-    else:
-        rand_other = randn_asym(other.mean_value, [other.sigma_low, other.sigma_up],
-                                limits=other.limits, random_seed=other.seed,
-                                n_random=other.n_random)
+    scratch = []
+    rand_self = sample_operand(self, scratch)
+    rand_other = sample_operand(other, scratch)
 
     common_array_size = array_size_min(len(rand_self), len(rand_other))
-    rand_result = (rand_self[0:common_array_size]+
-                   rand_other[0:common_array_size])
+    rand_result = nadd(rand_self[0:common_array_size], rand_other[0:common_array_size],
+                       out=scratch_buffer(common_array_size, scratch))
 
-    return [evaluate(rand_result), store_rand_result]
+    return [evaluate_operation(rand_result, [self, rand_self], [other, rand_other],
+                               overwrite_input=not store_rand_result, scratch=scratch),
+            store_rand_result]
 
 def array_size_min(array_1_length, array_2_length):
     """Given two array sizes, warn if they are not equal. Always return the smaller value.
@@ -91,6 +89,92 @@ def array_size_min(array_1_length, array_2_length):
                       UserWarning)
     return min(array_1_length, array_2_length)
 
+def evaluate_operation(rand_result, *sampled_operands, overwrite_input=False, scratch=()):
+    """Evaluate the random values of the result of an operation
+
+    The evaluation is deferred, since it is not needed if the result stores its random \
+values, which are evaluated by Unc(), or if the option 'lazy_evaluation' is set (see \
+Unc.from_operation()). It uses the values of the options at the time of the operation. If the \
+option 'control_variates' is set, the sampled operands whose distribution is known \
+analytically, i.e. operands which neither store their random values nor are represented by \
+the pending random values of a lazy evaluation, are used as control variates (see \
+mc_statistics.control_variate_weights()). In this case, the random values are evaluated \
+immediately.
+
+    Parameters
+    ----------
+    rand_result : ndarray
+        Random values of the result
+    *sampled_operands : [Unc, ndarray]
+        Operands of the operation and their random values
+    overwrite_input : bool, optional
+        If True, rand_result may be sorted in place, since the result does not store its \
+random values (default: False)
+    scratch : list of ndarray, optional
+        Buffers of buffer_pool.BUFFER_POOL which hold the random values of the operands or \
+of the result (see sample_operand() and scratch_buffer()). The buffers of the operands are \
+released at the end of this function. The buffer of the result is released after its \
+evaluation if overwrite_input is True, and it is kept by the result otherwise. If the \
+evaluation is deferred, the buffer stays out of the pool until it is carried out, and a lazy \
+evaluation keeps it as Unc.pending_random_values until then. (default: ())
+
+    Returns
+    -------
+    (evaluation, rand_result) : (function or [float, float, float], ndarray)
+        Function without arguments which returns the most probable value, lower and upper \
+uncertainty as returned by evaluation.evaluate(), or these values, and the random values
+    """
+
+    release_result = overwrite_input and any(buffer is rand_result for buffer in scratch)
+    operand_buffers = [buffer for buffer in scratch if buffer is not rand_result]
+
+    # Scalars of the operands (for example numpy.float64 mean values) may have promoted
+    # single-precision random values to double precision.
+    rand_result = as_sample_array(rand_result)
+
+    def evaluate_result():
+        evaluation = evaluate(rand_result, overwrite_input=overwrite_input)[0]
+        if release_result:
+            BUFFER_POOL.release(rand_result)
+        return evaluation
+
+    if not get_option("control_variates"):
+        BUFFER_POOL.release(*operand_buffers)
+        return (with_current_options(evaluate_result), rand_result)
+
+    controls = [rand_operand[:len(rand_result)] -
+                asym_normal_mean(operand.mean_value, [operand.sigma_low, operand.sigma_up],
+                                 limits=operand.limits)
+                for operand, rand_operand in sampled_operands
+                if not operand.store and operand.pending_random_values is None]
+    BUFFER_POOL.release(*operand_buffers)
+    if not controls:
+        return (with_current_options(evaluate_result), rand_result)
+
+    evaluation = evaluate(rand_result, weights=control_variate_weights(rand_result, controls))[0]
+    if release_result:
+        BUFFER_POOL.release(rand_result)
+    return (evaluation, rand_result)
+
+def is_exact_constant(operand):
+    """Check whether an operand of an operation is replaced by its mean value
+
+    Exact operands which store their random values are represented by them, like all operands \
+with stored random values or pending random values (see Unc.pending_random_values). Then, \
+their evaluation, which may be pending (see Unc.pending_evaluation), is not needed.
+
+    Parameters
+    ----------
+    operand : Unc
+
+    Returns
+    -------
+    is_exact_constant : bool
+        True, if the operand is exact and does not store its random values
+    """
+
+    return not operand.store and operand.pending_random_values is None and operand.is_exact
+
 def mul(self, other):
     """Implementation of Unc.__mul__()"""
 
@@ -101,40 +185,36 @@ def mul(self, other):
         store_rand_result = True
 
     if isinstance(other, (int, float)):
-        return [([self.mean_value*other, self.sigma_low*nabs(other), self.sigma_up*nabs(other)],
+        return [(lambda: [self.mean_value*other, self.sigma_low*nabs(other),
+                          self.sigma_up*nabs(other)],
                  self.random_values*other), store_rand_result]
 
     if other.store:
         store_rand_result = True
 
-    if other.is_exact:
-        return [([self.mean_value*other.mean_value, self.sigma_low*nabs(other.mean_value),
-                  self.sigma_up*nabs(other.mean_value)], self.random_values*other.mean_value),
+    if is_exact_constant(other):
+        return [(lambda: [self.mean_value*other.mean_value, self.sigma_low*nabs(other.mean_value),
+                          self.sigma_up*nabs(other.mean_value)],
+                 self.random_values*other.mean_value),
                 store_rand_result]
-    if self.is_exact:
-        return [([self.mean_value*other.mean_value, other.sigma_low*nabs(self.mean_value),
-                  other.sigma_up*nabs(self.mean_value)], self.mean_value*other.random_values),
+    if is_exact_constant(self):
+        return [(lambda: [self.mean_value*other.mean_value, other.sigma_low*nabs(self.mean_value),
+                          other.sigma_up*nabs(self.mean_value)],
+                 self.mean_value*other.random_values),
                 store_rand_result]
 
 
-    if self.store:
-        rand_self = self.random_values
-    else:
-        rand_self = randn_asym(self.mean_value, [self.sigma_low, self.sigma_up],
-                               limits=self.limits, random_seed=self.seed,
-                               n_random=self.n_random)
-    if other.store:
-        rand_other = other.random_values
-    else:
-        rand_other = randn_asym(other.mean_value, [other.sigma_low, other.sigma_up],
-                                limits=other.limits, random_seed=other.seed,
-                                n_random=other.n_random)
+    scratch = []
+    rand_self = sample_operand(self, scratch)
+    rand_other = sample_operand(other, scratch)
 
     common_array_size = array_size_min(len(rand_self), len(rand_other))
-    rand_result = (rand_self[0:common_array_size]*
-                   rand_other[0:common_array_size])
+    rand_result = multiply(rand_self[0:common_array_size], rand_other[0:common_array_size],
+                           out=scratch_buffer(common_array_size, scratch))
 
-    return [evaluate(rand_result), store_rand_result]
+    return [evaluate_operation(rand_result, [self, rand_self], [other, rand_other],
+                               overwrite_input=not store_rand_result, scratch=scratch),
+            store_rand_result]
 
 def power(self, other):
     """Implementation of Unc.__pow__()"""
@@ -146,59 +226,49 @@ def power(self, other):
         store_rand_result = True
 
     if isinstance(other, (int, float)):
-        if self.is_exact:
+        if is_exact_constant(self):
             return [([self.mean_value**other, 0., 0.],
                      array([self.mean_value**other])),
                     store_rand_result]
 
-        if self.store:
-            rand_self = self.random_values
-        else:
-            rand_self = randn_asym(self.mean_value, [self.sigma_low, self.sigma_up],
-                                   limits=self.limits, random_seed=self.seed,
-                                   n_random=self.n_random)
-        rand_result = (rand_self**other)
-        return [evaluate(rand_result), store_rand_result]
+        scratch = []
+        rand_self = sample_operand(self, scratch)
+        rand_result = npower(rand_self, other, out=scratch_buffer(len(rand_self), scratch))
+        return [evaluate_operation(rand_result, [self, rand_self],
+                                   overwrite_input=not store_rand_result, scratch=scratch),
+                store_rand_result]
 
     if other.store:
         store_rand_result = True
 
-    if self.is_exact:
-        if other.is_exact:
+    if is_exact_constant(self):
+        if is_exact_constant(other):
             return [([self.mean_value**other.mean_value, 0., 0.],
                      array([self.mean_value**other.mean_value])),
                     store_rand_result]
 
-        if other.store:
-            rand_other = other.random_values
-        else:
-            rand_other = randn_asym(other.mean_value, [other.sigma_low, other.sigma_up],
-                                    limits=other.limits, random_seed=other.seed,
-                                    n_random=other.n_random)
+        scratch = []
+        rand_other = sample_operand(other, scratch)
 
-        rand_result = self.mean_value**rand_other
+        rand_result = npower(self.mean_value, rand_other,
+                             out=scratch_buffer(len(rand_other), scratch))
 
-        return [evaluate(rand_result), store_rand_result]
+        return [evaluate_operation(rand_result, [other, rand_other],
+                                   overwrite_input=not store_rand_result, scratch=scratch),
+                store_rand_result]
 
-    if self.store:
-        rand_self = self.random_values
-    else:
-        rand_self = randn_asym(self.mean_value, [self.sigma_low, self.sigma_up],
-                               limits=self.limits, random_seed=self.seed,
-                               n_random=self.n_random)
+    scratch = []
+    rand_self = sample_operand(self, scratch)
 
-    if other.store:
-        rand_other = other.random_values
-    else:
-        rand_other = randn_asym(other.mean_value, [other.sigma_low, other.sigma_up],
-                                limits=other.limits, random_seed=other.seed,
-                                n_random=other.n_random)
+    rand_other = sample_operand(other, scratch)
 
     common_array_size = array_size_min(len(rand_self), len(rand_other))
-    rand_result = (rand_self[0:common_array_size]**
-                   rand_other[0:common_array_size])
+    rand_result = npower(rand_self[0:common_array_size], rand_other[0:common_array_size],
+                         out=scratch_buffer(common_array_size, scratch))
 
-    return [evaluate(rand_result), store_rand_result]
+    return [evaluate_operation(rand_result, [self, rand_self], [other, rand_other],
+                               overwrite_input=not store_rand_result, scratch=scratch),
+            store_rand_result]
 
 def rpower(self, other):
     """Implementation of Unc.__pow__()"""
@@ -208,15 +278,70 @@ def rpower(self, other):
 
     if self.store:
         store_rand_result = True
-        rand_self = self.random_values
-    else:
-        rand_self = randn_asym(self.mean_value, [self.sigma_low, self.sigma_up],
-                               limits=self.limits, random_seed=self.seed,
-                               n_random=self.n_random)
+    scratch = []
+    rand_self = sample_operand(self, scratch)
+
+    rand_result = npower(other, rand_self, out=scratch_buffer(len(rand_self), scratch))
+
+    return [evaluate_operation(rand_result, [self, rand_self],
+                               overwrite_input=not store_rand_result, scratch=scratch),
+            store_rand_result]
+
+def sample_operand(operand, scratch=None):
+    """Get the random values which represent an operand of a calculation
+
+    If the operand stores its random values, they are returned directly, and so are the \
+random values of a result whose lazy evaluation is pending (see \
+Unc.pending_random_values). If it is the result of an expression graph (see \
+expression_graph.Expression), its random values are calculated from the leaves of the graph. \
+Otherwise, n_random values are sampled from the asymmetric normal distribution of the \
+operand, using its seed.
+
+    Parameters
+    ----------
+    operand : Unc
+    scratch : list of ndarray or None, optional
+        If given, sampled values are written into a buffer of buffer_pool.BUFFER_POOL, \
+which is appended to scratch (default: None)
+
+    Returns
+    -------
+    random_values : ndarray
+    """
+
+    if operand.store:
+        return operand.random_values
+
+    if operand.pending_random_values is not None:
+        return operand.pending_random_values
+
+    if operand.expression is not None:
+        return as_sample_array(operand.expression.sample())
 
-    rand_result = other**rand_self
+    return randn_asym(operand.mean_value, [operand.sigma_low, operand.sigma_up],
+                      limits=operand.limits, random_seed=operand.seed,
+                      n_random=operand.n_random,
+                      out=None if scratch is None else scratch_buffer(operand.n_random, scratch))
 
-    return [evaluate(rand_result), store_rand_result]
+def scratch_buffer(n_random, scratch):
+    """Take a buffer for random values from buffer_pool.BUFFER_POOL
+
+    Parameters
+    ----------
+    n_random : positive int
+        Number of random values
+    scratch : list of ndarray
+        Buffers of the current operation, to which the new buffer is appended
+
+    Returns
+    -------
+    buffer : ndarray
+        Array of the type mc_statistics.sample_dtype() with undefined values
+    """
+
+    buffer = BUFFER_POOL.acquire(n_random, sample_dtype())
+    scratch.append(buffer)
+    return buffer
 
 def sub(self, other, rsub=False):
     """Implementation of Unc.__sub__()
@@ -234,10 +359,10 @@ def sub(self, other, rsub=False):
 
     if isinstance(other, (int, float)):
         if rsub:
-            return [([other - self.mean_value, self.sigma_low, self.sigma_up],
+            return [(lambda: [other - self.mean_value, self.sigma_low, self.sigma_up],
                      other-self.random_values),
                     store_rand_result]
-        return [([self.mean_value - other, self.sigma_low, self.sigma_up],
+        return [(lambda: [self.mean_value - other, self.sigma_low, self.sigma_up],
                  self.random_values - other),
                 store_rand_result]
 
@@ -247,31 +372,24 @@ def sub(self, other, rsub=False):
     if self.seed == other.seed:
         return [([0., 0., 0.], array([0.])), store_rand_result]
 
-    if other.is_exact:
-        return [([self.mean_value - other.mean_value, self.sigma_low, self.sigma_up],
+    if is_exact_constant(other):
+        return [(lambda: [self.mean_value - other.mean_value, self.sigma_low, self.sigma_up],
                  self.random_values - other.mean_value), store_rand_result]
-    if self.is_exact:
-        return [([self.mean_value - other.mean_value, other.sigma_low, other.sigma_up],
+    if is_exact_constant(self):
+        return [(lambda: [self.mean_value - other.mean_value, other.sigma_low, other.sigma_up],
                  self.mean_value - other.random_values), store_rand_result]
 
-    if self.store:
-        rand_self = self.random_values
-    else:
-        rand_self = randn_asym(self.mean_value, [self.sigma_low, self.sigma_up],
-                               limits=self.limits, random_seed=self.seed,
-                               n_random=self.n_random)
-    if other.store:
-        rand_other = other.random_values
-    else:
-        rand_other = randn_asym(other.mean_value, [other.sigma_low, other.sigma_up],
-                                limits=other.limits, random_seed=other.seed,
-                                n_random=other.n_random)
+    scratch = []
+    rand_self = sample_operand(self, scratch)
+    rand_other = sample_operand(other, scratch)
 
     common_array_size = array_size_min(len(rand_self), len(rand_other))
-    rand_result = (rand_self[0:common_array_size] -
-                   rand_other[0:common_array_size])
+    rand_result = subtract(rand_self[0:common_array_size], rand_other[0:common_array_size],
+                           out=scratch_buffer(common_array_size, scratch))
 
-    return [evaluate(rand_result), store_rand_result]
+    return [evaluate_operation(rand_result, [self, rand_self], [other, rand_other],
+                               overwrite_input=not store_rand_result, scratch=scratch),
+            store_rand_result]
 
 def truediv(self, other):
     """Implementation of Unc.__truediv__()"""
@@ -283,41 +401,42 @@ def truediv(self, other):
         store_rand_result = True
 
     if isinstance(other, (int, float)):
-        return [([self.mean_value/other, self.sigma_low/nabs(other), self.sigma_up/nabs(other)],
+        return [(lambda: [self.mean_value/other, self.sigma_low/nabs(other),
+                          self.sigma_up/nabs(other)],
                  self.random_values/other),
                 store_rand_result]
 
     if self.seed == other.seed:
         return [([1., 0., 0.], array([1.])), store_rand_result]
 
-    if other.is_exact:
-        return [([self.mean_value/nabs(other.mean_value), self.sigma_low/nabs(other.mean_value),
-                  self.sigma_up/nabs(other.mean_value)], self.random_values/other.mean_value),
+    if is_exact_constant(other):
+        return [(lambda: [self.mean_value/nabs(other.mean_value),
+                          self.sigma_low/nabs(other.mean_value),
+                          self.sigma_up/nabs(other.mean_value)],
+                 self.random_values/other.mean_value),
                 store_rand_result]
 
     if other.store:
-        rand_other = other.random_values
         store_rand_result = True
-    else:
-        rand_other = randn_asym(other.mean_value, [other.sigma_low, other.sigma_up],
-                                limits=other.limits, random_seed=other.seed,
-                                n_random=other.n_random)
+    scratch = []
+    rand_other = sample_operand(other, scratch)
 
-    if self.is_exact:
+    if is_exact_constant(self):
         if self.mean_value == 0.:
+            BUFFER_POOL.release(*scratch)
             return [([0., 0., 0.], array([0.])), store_rand_result]
-        rand_result = self.mean_value/rand_other
-
-    else:
-        if self.store:
-            store_rand_result = True
-            rand_self = self.random_values
-        else:
-            rand_self = randn_asym(self.mean_value, [self.sigma_low, self.sigma_up],
-                                   limits=self.limits, random_seed=self.seed,
-                                   n_random=self.n_random)
-        common_array_size = array_size_min(len(rand_self), len(rand_other))
-        rand_result = (rand_self[0:common_array_size]/
-                       rand_other[0:common_array_size])
-
-    return [evaluate(rand_result, force_inside_shortest_coverage=True), store_rand_result]
+        rand_result = true_divide(self.mean_value, rand_other,
+                                  out=scratch_buffer(len(rand_other), scratch))
+
+        return [evaluate_operation(rand_result, [other, rand_other],
+                                   overwrite_input=not store_rand_result, scratch=scratch),
+                store_rand_result]
+
+    rand_self = sample_operand(self, scratch)
+    common_array_size = array_size_min(len(rand_self), len(rand_other))
+    rand_result = true_divide(rand_self[0:common_array_size], rand_other[0:common_array_size],
+                              out=scratch_buffer(common_array_size, scratch))
+
+    return [evaluate_operation(rand_result, [self, rand_self], [other, rand_other],
+                               overwrite_input=not store_rand_result, scratch=scratch),
+            store_rand_result]
@@ -19,17 +19,75 @@ using a Monte Carlo uncertainty propagation method"""
 import warnings
 
 from math import inf
+from threading import Lock
 
-from numpy import array
+from numpy import add as nadd
+from numpy import power as npower
+from numpy import arange, array, multiply, negative, subtract, true_divide
 
-from .mc_statistics import check_num_array_argument
+from .expression_graph import Expression, evaluate_expression, is_graph_leaf_constant
+from .mc_statistics import as_sample_array, check_num_array_argument
+from .operation_cache import OPERATION_CACHE, cached_operation
+from .options import get_option, with_current_options
+from .random_streams import check_random_seed
 
 from .algebra import add, mul, power, rpower, sub, truediv
-from .evaluation import evaluate
-from .io import check_limit_update, check_numeric, round_digits, sample_random_numbers
+from .io import check_limit_update, check_numeric, coverage, evaluate_random_values, round_digits
+from .io import resolve_pending_evaluation, sample_random_numbers
 from .io import set_limits, set_lower_limit, set_mean_value, set_n_random, set_sigma_low
 from .io import set_sigma_up, set_upper_limit
 
+# Protects Unc.n_instances, so that quantities created in parallel threads never share a seed
+_SEED_LOCK = Lock()
+
+def reserve_seeds(n_seeds):
+    """Reserve consecutive seeds for new quantities, which are not used by any other quantity
+
+    Parameters
+    ----------
+    n_seeds : int
+        Number of seeds
+
+    Returns
+    -------
+    seeds : ndarray
+        Reserved seeds, see Unc.seed
+    """
+
+    with _SEED_LOCK:
+        first_seed = Unc.n_instances
+        Unc.n_instances += n_seeds
+
+    return arange(first_seed, first_seed + n_seeds)
+
+def _evaluated_attribute(name):
+    """Attribute of Unc which may be the result of its pending evaluation
+
+    The pending evaluation is carried out before the attribute is read or set (see \
+io.resolve_pending_evaluation()).
+
+    Parameters
+    ----------
+    name : str
+        Name of the attribute. Its value is stored as '_' + name.
+
+    Returns
+    -------
+    attribute : property
+    """
+
+    stored_name = "_" + name
+
+    def get_attribute(self):
+        resolve_pending_evaluation(self)
+        return getattr(self, stored_name)
+
+    def set_attribute(self, value):
+        resolve_pending_evaluation(self)
+        setattr(self, stored_name, value)
+
+    return property(get_attribute, set_attribute)
+
 class Unc:
     """Class for a quantity with asymmetric uncertainty
 
@@ -97,9 +155,11 @@ of the Particle Data Group
 
     seed: int
         Static variable that counts the number of Unc objects created so far and seeds the random \
-number generator of x. Giving each number x a fixed seed makes it possible to introduce \
-correlations in calculations, for example in a calculation like z = x/(1+x) where \
-x appears several times.
+number stream of x (see random_streams.generator()). Giving each number x a fixed seed makes it \
+possible to introduce correlations in calculations, for example in a calculation like \
+z = x/(1+x) where x appears several times. Since each seed has its own stream, independent \
+quantities can be propagated in parallel threads. A seed which was reserved before, for \
+example with reserve_seeds(), can be given to Unc() instead.
 
     store: bool
         If True, a numpy array of the values x_rand is stored in the Unc object. Furthermore, this \
@@ -108,17 +168,62 @@ resulting Unc object from a calculation will also store the randomly sampled val
 from which its mean and shortest coverage interval were determined.
     random_values: numpy array
         Array of randomly sampled numbers from the probability distribution of Unc. The number of \
-values is given by the settings of the imported mc_statistics package.
+values is given by the settings of the imported mc_statistics package. Their floating-point \
+type is given by the option 'dtype' (see mc_statistics.sample_dtype()).
+    sorted_random_values: numpy array or None
+        Cache of the random values sorted in ascending order, or None if they have not been \
+sorted yet.
+    sampled_distribution: [float, [float, float], [float, float]] or None
+        Mean value, standard deviations and limits of the asymmetric normal distribution \
+from which the random values were sampled, or None if they were obtained otherwise. \
+If n_random is increased, more values are sampled from this distribution \
+(see mc_statistics.sample_prefix()). If the option 'input_evaluation' is 'analytic', \
+mean_value, sigma_low and sigma_up are the mode and the shortest coverage interval of this \
+distribution instead of an evaluation of the random values, and new limits are applied to it \
+instead of resampling the random values (see evaluation.evaluate_distribution()).
     n_random: int
         Determines the number of randomly sampled numbers in each algebraic operation. \
 Must be larger than 1 to be able to apply statistical methods on the set of random numbers.
+    pending_evaluation: function or None
+        If the option 'lazy_evaluation' is set, the evaluation of random values is deferred \
+until mean_value, sigma_low, sigma_up, is_exact or rounded are accessed for the first time. \
+Until then, this function without arguments returns their most probable value, lower and \
+upper uncertainty. Otherwise, it is None.
+    pending_random_values: numpy array or None
+        Random values of the result of an operation whose evaluation is pending and which \
+does not store its random values. If the result is an operand of another operation before it \
+is evaluated, these values are used instead of sampling its distribution, so that the \
+evaluation is not needed (see algebra.sample_operand()). They are removed when the \
+evaluation is carried out or n_random is changed. Otherwise, it is None.
+    expression: expression_graph.Expression or None
+        If the option 'expression_graph' is set, the result of an operation on Unc which do \
+not store their random values is a node of an expression graph. Its random values are \
+calculated from the leaves of the graph whenever it is used in another operation, and \
+its evaluation is pending (see Unc.from_expression()). Setting mean_value, sigma_low, \
+sigma_up, the limits or n_random with the corresponding set* methods removes the node. \
+Otherwise, it is None.
+
+    If the option 'operation_cache_size' is larger than zero, repeated operations on the same \
+operands return the same result (see operation_cache.OperationCache). The set* methods \
+remove all cached results of operations whose operands or result is the changed quantity.
     """
 
     # Count the number of instances of Unc
     n_instances = 0
 
+    # Types of operands which implement the operations with Unc themselves, for example
+    # unc_array.UncArray. The operators of Unc return NotImplemented for them, so that their
+    # reflected operators are called.
+    deferred_operand_types = ()
+
+    mean_value = _evaluated_attribute("mean_value")
+    sigma_low = _evaluated_attribute("sigma_low")
+    sigma_up = _evaluated_attribute("sigma_up")
+    is_exact = _evaluated_attribute("is_exact")
+    rounded = _evaluated_attribute("rounded")
+
     def __init__(self, mean_value=1., sigma_low=None, sigma_up=None, limits=None, store=False,
-                 random_values=array([0.]), n_random=None):
+                 random_values=array([0.]), n_random=None, seed=None):
         """Initialization of members of Unc
 
         See the class docstring of Unc for the meaning of the member variables \
@@ -133,7 +238,12 @@ that can be set with __init__().
         store: bool
         random_values: numpy array
         n_random: int
+        seed: non-negative int or None
+            Seed of the quantity. If None, a new seed is reserved (default: None).
         """
+        self.pending_evaluation = None
+        self.pending_random_values = None
+        self.expression = None
         try:
             self.mean_value = mean_value
 
@@ -182,15 +292,24 @@ that can be set with __init__().
         self.round_digits()
 
         # Set unique random number seed as the number of instances of Unc
-        self.seed = Unc.n_instances
-        Unc.n_instances += 1
+        if seed is None:
+            with _SEED_LOCK:
+                self.seed = Unc.n_instances
+                Unc.n_instances += 1
+        else:
+            check_random_seed(seed)
+            self.seed = seed
 
         if not store and len(random_values) > 1:
             warnings.warn("Randomly sampled values initialized, but store set to False. \
 This may lead to unexpected results of calculations, because values \
 will still be sampled from the given mean_value and sigma.")
         self.store = store
+        if len(random_values) > 1:
+            random_values = as_sample_array(random_values)
         self.random_values = random_values
+        self.sorted_random_values = None
+        self.sampled_distribution = None
 
         # Catch the cases when both rand_values and n_random are set.
         # If the number of given random values does not agree with the desired
@@ -207,10 +326,7 @@ given in initialization. Setting n_random to len(random_values)" %
             # Re-evaluate mean_value of sigma_low/sigma_up, if a set of random numbers is
             # given instead of those three characteristics and if store is False.
             if store:
-                eval_result = evaluate(random_values, force_inside_shortest_coverage=True)
-                self.set_mean_value(eval_result[0][0])
-                self.set_sigma_low(eval_result[0][1])
-                self.set_sigma_up(eval_result[0][2])
+                evaluate_random_values(self)
         # If no random values are given to the constructor, initialize
         # n_random with its default value and execute the usual procedure of setting
         # n_random.
@@ -262,6 +378,8 @@ an error will be thrown.
         """
 
         set_mean_value(self, mean_value)
+        self.expression = None
+        OPERATION_CACHE.invalidate(self.seed)
 
     def set_n_random(self, n_random):
         """Set the value of n_random and check whether the new value is valid, \
@@ -274,6 +392,9 @@ i.e. n_random > 1 and isinstance(n_random, int)
         """
 
         set_n_random(self, n_random)
+        self.pending_random_values = None
+        self.expression = None
+        OPERATION_CACHE.invalidate(self.seed)
 
     def set_sigma_low(self, sigma_low):
         """Set the value of sigma_low and check whether the new value is valid, \
@@ -286,6 +407,8 @@ i.e. self.set_sigma_low(x) is safer than self.sigma_low = x.
         """
 
         set_sigma_low(self, sigma_low=sigma_low)
+        self.expression = None
+        OPERATION_CACHE.invalidate(self.seed)
 
     def set_sigma_up(self, sigma_up):
         """Set the value of sigma_up and check whether the new value is valid, \
@@ -298,6 +421,8 @@ i.e. self.set_sigma_up(x) is safer than self.sigma_up = x.
         """
 
         set_sigma_up(self, sigma_up=sigma_up)
+        self.expression = None
+        OPERATION_CACHE.invalidate(self.seed)
 
     def set_lower_limit(self, lower_limit):
         """ Set the value of the lower limit and check whether the new value \
@@ -310,6 +435,8 @@ is valid, i.e. self.set_lower_limit(x) is safer than self.lower_limit = x
         """
 
         set_lower_limit(self, lower_limit=lower_limit)
+        self.expression = None
+        OPERATION_CACHE.invalidate(self.seed)
 
     def set_upper_limit(self, upper_limit):
         """ Set the value of the upper limit and check whether the new value \
@@ -323,6 +450,8 @@ self.upper_limit = x
         """
 
         set_upper_limit(self, upper_limit=upper_limit)
+        self.expression = None
+        OPERATION_CACHE.invalidate(self.seed)
 
     def set_limits(self, limits):
         """ Set the value of the lower and upper limits and check whether the new values \
@@ -336,6 +465,8 @@ self.lower_limit = x and self.upper_limit = y
         """
 
         set_limits(self, limits=limits)
+        self.expression = None
+        OPERATION_CACHE.invalidate(self.seed)
 
     def check_limit_update(self, new_limits):
         """ Check whether the new limits make sense, considering the old ones.
@@ -343,13 +474,10 @@ self.lower_limit = x and self.upper_limit = y
         For example, assume that the previous limits were [-1, 1] for a number \
 Unc(0., 1., 1.) and the new ones are [10, 11]. \
 In order to sample points within the new limits, highly improbable values \
-of the probability distribution would have to be sampled, leading to numerical \
-instabilities.
-Going through the example:
-The value of the CDF of the normal distribution with mean = 0 and sigma == 1 \
-at x == 6 is already 0.9999999990134123, at x == 10, scipy.stats.norm.cdf simply \
-displays 1.0.
-Consequently, using scipy.stats.norm.ppf(1.0) would yield infinity.
+of the probability distribution would have to be sampled. \
+The samplers of mc_statistics (randn_asym_truncated()) handle this case \
+numerically, but stored random values of the old distribution would contain \
+no information about the region inside the new limits.
 
         Parameters
         ----------
@@ -405,10 +533,150 @@ by the Particle Data Group (PDG)
 
         return isinstance(other, Unc)
 
+    def coverage(self, coverage_probability=0.6827):
+        """Get the shortest coverage interval for one or several coverage probabilities
+
+        If the asymmetric normal distribution of the Unc object is known analytically, the \
+intervals are calculated from it (see io.known_distribution() and \
+auxiliary.asym_normal_shortest_coverage()). Otherwise, for an Unc object which stores its \
+random values, all intervals are determined from the sorted random values, which are cached \
+in self.sorted_random_values. Else, self.n_random values are sampled from the asymmetric \
+normal distribution of the Unc object with its seed, and sorted once for all intervals.
+
+        Example
+        -------
+        x = Unc(1., 0.1, 0.2, store=True)
+        one_sigma, two_sigma, three_sigma = x.coverage([0.6827, 0.9545, 0.9973])
+
+        Parameters
+        ----------
+        coverage_probability : float or array_like, optional
+            Coverage probability or probabilities in the interval (0, 1) (default: 0.6827)
+
+        Returns
+        -------
+        interval : ndarray
+            Lower and upper limit [x0, x1] of the shortest coverage interval, or an array of \
+such limits for each coverage probability
+        """
+
+        return coverage(self, coverage_probability)
+
     ###################################################
     # Algebra
     ###################################################
 
+    @classmethod
+    def from_operation(cls, operation_result, store_rand_result, n_random):
+        """Create the result of an operation
+
+        If the result stores its random values, they are evaluated like random values which \
+are given to Unc(), and the evaluation of the operation is not needed. Otherwise, the \
+evaluation of the operation gives mean_value, sigma_low and sigma_up. If the option \
+'lazy_evaluation' is set, it is deferred until one of them is accessed \
+(see Unc.pending_evaluation), and the result keeps its random values until then \
+(see Unc.pending_random_values). Intermediate results are represented by these values \
+in further operations, so that only y is evaluated in
+
+        with option_context(lazy_evaluation=True):
+            y = a*b + c*d - e
+
+        Parameters
+        ----------
+        operation_result : (function or [float, float, float], ndarray)
+            Evaluation and random values of the result, see algebra.evaluate_operation()
+        store_rand_result : bool
+            If True, the result stores its random values
+        n_random : int
+            Number of random values of the result
+
+        Returns
+        -------
+        result : Unc
+        """
+
+        evaluation, rand_result = operation_result
+        if store_rand_result and len(rand_result) > 1:
+            return cls(random_values=rand_result, store=True, n_random=n_random)
+
+        if callable(evaluation):
+            if get_option("lazy_evaluation") and not store_rand_result:
+                result = cls(n_random=n_random)
+                result.pending_evaluation = evaluation
+                if len(rand_result) > 1:
+                    result.pending_random_values = rand_result
+                return result
+            evaluation = evaluation()
+
+        return cls(evaluation[0], evaluation[1], evaluation[2],
+                   random_values=rand_result if store_rand_result else array([0.]),
+                   store=store_rand_result, n_random=n_random)
+
+    @classmethod
+    def from_expression(cls, function, *operands):
+        """Create the result of an operation as a node of an expression graph
+
+        Instead of sampling the operands and evaluating the result of each operation, the \
+operations form a graph, which is sampled and evaluated in a single vectorised pass when the \
+result is accessed (see expression_graph.Expression). Each leaf is sampled only once per \
+seed, so that all correlations of the leaves are kept. For example,
+
+        with option_context(expression_graph=True):
+            z = x/(1 + x)
+
+        samples x once and evaluates only z. If one of the operands stores its random \
+values, the result stores the random values of the graph.
+
+        Parameters
+        ----------
+        function : function
+            Vectorised function of the random values of the operands, for example numpy.add
+        *operands : Unc, int or float
+            Operands of the operation, see Unc.uses_expression_graph()
+
+        Returns
+        -------
+        result : Unc
+        """
+
+        expression = Expression(function, list(operands))
+        n_random = [operand.n_random for operand in operands if isinstance(operand, Unc)][0]
+
+        if any(isinstance(operand, Unc) and operand.store for operand in operands):
+            return cls(random_values=as_sample_array(expression.sample()), store=True,
+                       n_random=n_random)
+
+        result = cls(n_random=n_random)
+        result.expression = expression
+        result.pending_evaluation = with_current_options(
+            lambda: evaluate_expression(expression))
+        return result
+
+    @classmethod
+    def uses_expression_graph(cls, *operands):
+        """Check whether an operation creates a node of an expression graph
+
+        Parameters
+        ----------
+        *operands : anything
+            Operands of the operation
+
+        Returns
+        -------
+        uses_expression_graph : bool
+            True, if the option 'expression_graph' is set, all operands are Unc or built-in \
+numbers, and all Unc which are not replaced by their mean value have the same n_random
+        """
+
+        if not get_option("expression_graph"):
+            return False
+        if not all(isinstance(operand, (cls, int, float)) for operand in operands):
+            return False
+
+        return len({operand.n_random for operand in operands
+                    if not is_graph_leaf_constant(operand)}) == 1
+
+    @cached_operation("add")
     def __add__(self, other):
         """Calculate self + other
 
@@ -422,12 +690,17 @@ by the Particle Data Group (PDG)
         self + other : Unc
         """
 
+        if isinstance(other, Unc.deferred_operand_types):
+            return NotImplemented
+
+        if Unc.uses_expression_graph(self, other):
+            return Unc.from_expression(nadd, self, other)
+
         add_result, store_rand_result = add(self, other)
 
-        return Unc(add_result[0][0], add_result[0][1], add_result[0][2],
-                   random_values=add_result[1] if store_rand_result else array([0.]),
-                   store=store_rand_result, n_random=self.n_random)
+        return Unc.from_operation(add_result, store_rand_result, self.n_random)
 
+    @cached_operation("mul")
     def __mul__(self, other):
         """Calculate self*other
 
@@ -441,12 +714,17 @@ by the Particle Data Group (PDG)
         self*other : Unc
         """
 
+        if isinstance(other, Unc.deferred_operand_types):
+            return NotImplemented
+
+        if Unc.uses_expression_graph(self, other):
+            return Unc.from_expression(multiply, self, other)
+
         mul_result, store_rand_result = mul(self, other)
 
-        return Unc(mul_result[0][0], mul_result[0][1], mul_result[0][2],
-                   random_values=mul_result[1] if store_rand_result else array([0.]),
-                   store=store_rand_result, n_random=self.n_random)
+        return Unc.from_operation(mul_result, store_rand_result, self.n_random)
 
+    @cached_operation("neg")
     def __neg__(self):
         """Switch the sign of Unc using the unary '-' operator
 
@@ -460,10 +738,14 @@ by the Particle Data Group (PDG)
 
         """
 
-        return Unc(-self.mean_value, self.sigma_low, self.sigma_up,
-                   random_values=(-1)*self.random_values if self.store else array([0.]),
-                   store=self.store, n_random=self.n_random)
+        if Unc.uses_expression_graph(self):
+            return Unc.from_expression(negative, self)
 
+        return Unc.from_operation((lambda: [-self.mean_value, self.sigma_low, self.sigma_up],
+                                   (-1)*self.random_values if self.store else array([0.])),
+                                  self.store, self.n_random)
+
+    @cached_operation("pow")
     def __pow__(self, other):
         """Calculate self**other
 
@@ -477,12 +759,17 @@ by the Particle Data Group (PDG)
         self**other: Unc
         """
 
+        if isinstance(other, Unc.deferred_operand_types):
+            return NotImplemented
+
+        if Unc.uses_expression_graph(self, other):
+            return Unc.from_expression(npower, self, other)
+
         pow_result, store_rand_result = power(self, other)
 
-        return Unc(pow_result[0][0], pow_result[0][1], pow_result[0][2],
-                   random_values=pow_result[1] if store_rand_result else array([0.]),
-                   store=store_rand_result, n_random=self.n_random)
+        return Unc.from_operation(pow_result, store_rand_result, self.n_random)
 
+    @cached_operation("radd")
     def __radd__(self, other):
         """Calculate other + self
 
@@ -496,12 +783,17 @@ by the Particle Data Group (PDG)
         other + self : Unc
         """
 
+        if isinstance(other, Unc.deferred_operand_types):
+            return NotImplemented
+
+        if Unc.uses_expression_graph(other, self):
+            return Unc.from_expression(nadd, other, self)
+
         radd_result, store_rand_result = add(self, other)
 
-        return Unc(radd_result[0][0], radd_result[0][1], radd_result[0][2],
-                   random_values=radd_result[1] if store_rand_result else array([0.]),
-                   store=store_rand_result, n_random=self.n_random)
+        return Unc.from_operation(radd_result, store_rand_result, self.n_random)
 
+    @cached_operation("rmul")
     def __rmul__(self, other):
         """Calculate other*self
 
@@ -515,12 +807,17 @@ by the Particle Data Group (PDG)
         self*other : Unc
         """
 
+        if isinstance(other, Unc.deferred_operand_types):
+            return NotImplemented
+
+        if Unc.uses_expression_graph(other, self):
+            return Unc.from_expression(multiply, other, self)
+
         rmul_result, store_rand_result = mul(self, other)
 
-        return Unc(rmul_result[0][0], rmul_result[0][1], rmul_result[0][2],
-                   random_values=rmul_result[1] if store_rand_result else array([0.]),
-                   store=store_rand_result, n_random=self.n_random)
+        return Unc.from_operation(rmul_result, store_rand_result, self.n_random)
 
+    @cached_operation("rpow")
     def __rpow__(self, other):
         """Calculate other**self
 
@@ -534,12 +831,17 @@ by the Particle Data Group (PDG)
         self*other : Unc
         """
 
+        if isinstance(other, Unc.deferred_operand_types):
+            return NotImplemented
+
+        if Unc.uses_expression_graph(other, self):
+            return Unc.from_expression(npower, other, self)
+
         rpow_result, store_rand_result = rpower(self, other)
 
-        return Unc(rpow_result[0][0], rpow_result[0][1], rpow_result[0][2],
-                   random_values=rpow_result[1] if store_rand_result else array([0.]),
-                   store=store_rand_result, n_random=self.n_random)
+        return Unc.from_operation(rpow_result, store_rand_result, self.n_random)
 
+    @cached_operation("rsub")
     def __rsub__(self, other):
         """Calculate other - self
 
@@ -553,12 +855,17 @@ by the Particle Data Group (PDG)
         other - self : Unc
         """
 
+        if isinstance(other, Unc.deferred_operand_types):
+            return NotImplemented
+
+        if Unc.uses_expression_graph(other, self):
+            return Unc.from_expression(subtract, other, self)
+
         rsub_result, store_rand_result = sub(self, other, rsub=True)
 
-        return Unc(rsub_result[0][0], rsub_result[0][1], rsub_result[0][2],
-                   random_values=rsub_result[1] if store_rand_result else array([0.]),
-                   store=store_rand_result, n_random=self.n_random)
+        return Unc.from_operation(rsub_result, store_rand_result, self.n_random)
 
+    @cached_operation("rtruediv")
     def __rtruediv__(self, other):
         """Calculate other/self
 
@@ -572,15 +879,19 @@ by the Particle Data Group (PDG)
         other/self : Unc
         """
 
+        if isinstance(other, Unc.deferred_operand_types):
+            return NotImplemented
+
         check_numeric(self, other)
 
+        if Unc.uses_expression_graph(other, self):
+            return Unc.from_expression(true_divide, other, self)
+
         rtruediv_result, store_rand_result = truediv(Unc(other, 0., 0.), self)
 
-        return Unc(rtruediv_result[0][0], rtruediv_result[0][1], rtruediv_result[0][2],
-                   random_values=rtruediv_result[1] if store_rand_result else array([0.]),
-                   store=store_rand_result,
-                   n_random=self.n_random)
+        return Unc.from_operation(rtruediv_result, store_rand_result, self.n_random)
 
+    @cached_operation("sub")
     def __sub__(self, other):
         """Calculate self - other
 
@@ -594,12 +905,17 @@ by the Particle Data Group (PDG)
         self - other : Unc
         """
 
+        if isinstance(other, Unc.deferred_operand_types):
+            return NotImplemented
+
+        if Unc.uses_expression_graph(self, other):
+            return Unc.from_expression(subtract, self, other)
+
         sub_result, store_rand_result = sub(self, other)
 
-        return Unc(sub_result[0][0], sub_result[0][1], sub_result[0][2],
-                   random_values=sub_result[1] if store_rand_result else array([0.]),
-                   store=store_rand_result, n_random=self.n_random)
+        return Unc.from_operation(sub_result, store_rand_result, self.n_random)
 
+    @cached_operation("truediv")
     def __truediv__(self, other):
         """Calculate self/other
 
@@ -613,9 +929,12 @@ by the Particle Data Group (PDG)
         self/other : Unc
         """
 
+        if isinstance(other, Unc.deferred_operand_types):
+            return NotImplemented
+
+        if Unc.uses_expression_graph(self, other):
+            return Unc.from_expression(true_divide, self, other)
+
         truediv_result, store_rand_result = truediv(self, other)
 
-        return Unc(truediv_result[0][0], truediv_result[0][1], truediv_result[0][2],
-                   random_values=truediv_result[1] if store_rand_result else array([0.]),
-                   store=store_rand_result,
-                   n_random=self.n_random)
+        return Unc.from_operation(truediv_result, store_rand_result, self.n_random)
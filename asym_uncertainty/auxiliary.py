@@ -15,8 +15,13 @@
 #    You should have received a copy of the GNU General Public License
 #    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
 
-from numpy import exp, pi, sqrt
-from scipy.stats import norm
+from numpy import absolute, asarray, clip, errstate, exp, inf, log, log1p, logaddexp, pi, sqrt
+from scipy.optimize import brentq
+from scipy.special import log_ndtr, ndtr, ndtri, ndtri_exp
+from scipy.stats import norm, truncnorm
+
+LOG_SPACE_LIMIT = 30. # Distance from the mean value in units of sigma, beyond which
+# truncated_normal_ppf() inverts the CDF in log space
 
 def auxiliary_a(z, sigma_num, sigma_denom):
     """ Auxiliary function a for the ratio of two normal distributions """
@@ -74,3 +79,294 @@ def gaussian_ratio_pdf(z, mu_num, sigma_num, mu_denom, sigma_denom):
             exp(-auxiliary_c(mu_num, sigma_num, mu_denom, sigma_denom)*0.5)/
             (auxiliary_a(z, sigma_num, sigma_denom)**2*pi*sigma_num*sigma_denom)
            )
+
+def standardized_limit(limit, mean_value, sigma):
+    """ Transform a limit of a normal distribution into units of sigma, i.e. \
+(limit - mean_value)/sigma. For sigma == 0, the result is -inf, 0 or inf, depending on the \
+sign of limit - mean_value."""
+    if sigma == 0.:
+        if limit == mean_value:
+            return 0.
+        return inf if limit > mean_value else -inf
+    return (limit - mean_value)/sigma
+
+def truncated_normal_ppf(u, lower, upper):
+    """ Inverse of the cumulative distribution function (CDF) of the standard normal \
+distribution truncated to [lower, upper]
+
+    Intervals on the positive side are mirrored to the negative side, where the CDF of the \
+normal distribution does not saturate at 1. If the CDF underflows at the upper limit, i.e. \
+if the interval is more than LOG_SPACE_LIMIT standard deviations away from the mean value, \
+the inversion is done in log space with scipy.special.log_ndtr and scipy.special.ndtri_exp. \
+This gives finite and accurate values even for limits far out in a tail.
+
+    Parameters
+    ----------
+    u : float or ndarray
+        Values of the CDF in the interval [0, 1]
+    lower : float
+        Lower limit in units of the standard deviation
+    upper : float
+        Upper limit in units of the standard deviation, upper >= lower
+
+    Returns
+    -------
+    ndarray
+        Quantiles of the truncated distribution
+    """
+    if lower > 0.:
+        return -truncated_normal_ppf(1. - u, -upper, -lower)
+
+    if upper > -LOG_SPACE_LIMIT:
+        cdf_lower = ndtr(lower)
+        return clip(ndtri(cdf_lower + u*(ndtr(upper) - cdf_lower)), lower, upper)
+
+    with errstate(divide='ignore'):
+        log_cdf = logaddexp(log1p(-u) + log_ndtr(lower), log(u) + log_ndtr(upper))
+
+    return clip(ndtri_exp(log_cdf), lower, upper)
+
+def asym_normal_branches(mean_value, sigma, limits, probability_low=0.5):
+    """ Decompose the (truncated) asymmetric normal distribution into its two branches
+
+    Left of mean_value, the distribution is a normal distribution with sigma[0], right of it, \
+with sigma[1]. Without limits, probability_low of the probability is on the left branch.
+
+    Parameters
+    ----------
+    mean_value : float
+        Mode of the untruncated distribution
+    sigma : [float, float]
+        Left- and right-hand standard deviation
+    limits : [float, float]
+        Lower and upper limit of the distribution
+    probability_low : float, optional
+        Probability of the left branch without limits (default: 0.5)
+
+    Returns
+    -------
+    [weight_low, [lower_low, upper_low], [lower_up, upper_up]]
+        weight_low is the probability of the left branch after the truncation. \
+The limits of the two branches are given in units of their standard deviation.
+    """
+    lower_low = standardized_limit(limits[0], mean_value, sigma[0])
+    upper_low = min(standardized_limit(limits[1], mean_value, sigma[0]), 0.)
+    lower_up = max(standardized_limit(limits[0], mean_value, sigma[1]), 0.)
+    upper_up = standardized_limit(limits[1], mean_value, sigma[1])
+
+    if limits[0] >= mean_value:
+        return [0., [lower_low, upper_low], [lower_up, upper_up]]
+    if limits[1] <= mean_value:
+        return [1., [lower_low, upper_low], [lower_up, upper_up]]
+
+    mass_low = probability_low*(ndtr(upper_low) - ndtr(lower_low))
+    mass_up = (1. - probability_low)*(ndtr(upper_up) - ndtr(lower_up))
+
+    return [mass_low/(mass_low + mass_up), [lower_low, upper_low], [lower_up, upper_up]]
+
+def asym_normal_mass(mean_value, sigma, limits, probability_low=0.5):
+    """ Probability of the untruncated asymmetric normal distribution inside the limits
+
+    Parameters
+    ----------
+    mean_value : float
+        Mode of the untruncated distribution
+    sigma : [float, float]
+        Left- and right-hand standard deviation
+    limits : [float, float]
+        Lower and upper limit of the distribution
+    probability_low : float, optional
+        Probability of the left branch without limits (default: 0.5)
+
+    Returns
+    -------
+    float
+        Probability inside the limits
+    """
+    _, branch_low, branch_up = asym_normal_branches(mean_value, sigma, limits,
+                                                    probability_low=probability_low)
+
+    return (probability_low*max(ndtr(branch_low[1]) - ndtr(branch_low[0]), 0.) +
+            (1. - probability_low)*max(ndtr(branch_up[1]) - ndtr(branch_up[0]), 0.))
+
+def asym_normal_mean(mean_value, sigma, limits=None, probability_low=0.5):
+    """ Mean value of the (truncated) asymmetric normal distribution
+
+    Parameters
+    ----------
+    mean_value : float
+        Mode of the untruncated distribution
+    sigma : [float, float]
+        Left- and right-hand standard deviation
+    limits : [float, float], optional
+        Lower and upper limit of the distribution (default: None, i.e. no limits)
+    probability_low : float, optional
+        Probability of the left branch without limits (default: 0.5)
+
+    Returns
+    -------
+    float
+        Mean value of the distribution
+    """
+    if limits is None:
+        limits = [-inf, inf]
+
+    weight_low, branch_low, branch_up = asym_normal_branches(mean_value, sigma, limits,
+                                                             probability_low=probability_low)
+
+    mean = mean_value
+    if weight_low > 0.:
+        mean += weight_low*sigma[0]*truncnorm.mean(branch_low[0], branch_low[1])
+    if weight_low < 1.:
+        mean += (1. - weight_low)*sigma[1]*truncnorm.mean(branch_up[0], branch_up[1])
+
+    return mean
+
+def asym_normal_mode(mean_value, limits=None):
+    """ Mode of the (truncated) asymmetric normal distribution
+
+    Both branches of the distribution decrease monotonically with the distance from \
+mean_value. Therefore, the mode is mean_value, or the closest limit if mean_value is outside \
+of the limits.
+
+    Parameters
+    ----------
+    mean_value : float
+        Mode of the untruncated distribution
+    limits : [float, float], optional
+        Lower and upper limit of the distribution (default: None, i.e. no limits)
+
+    Returns
+    -------
+    float
+        Mode of the distribution
+    """
+    if limits is None:
+        return mean_value
+
+    return min(max(mean_value, limits[0]), limits[1])
+
+def asym_normal_ppf(u, mean_value, sigma, limits=None, probability_low=0.5):
+    """ Inverse of the cumulative distribution function (CDF) of the (truncated) \
+asymmetric normal distribution
+
+    Parameters
+    ----------
+    u : float or ndarray
+        Values of the CDF in the interval [0, 1]
+    mean_value : float
+        Mode of the untruncated distribution
+    sigma : [float, float]
+        Left- and right-hand standard deviation
+    limits : [float, float], optional
+        Lower and upper limit of the distribution (default: None, i.e. no limits)
+    probability_low : float, optional
+        Probability of the left branch without limits (default: 0.5)
+
+    Returns
+    -------
+    ndarray
+        Quantiles of the distribution
+    """
+    if limits is None:
+        limits = [-inf, inf]
+
+    weight_low, branch_low, branch_up = asym_normal_branches(mean_value, sigma, limits,
+                                                             probability_low=probability_low)
+    u = asarray(u, dtype=float)
+
+    if weight_low == 1.:
+        return mean_value + sigma[0]*truncated_normal_ppf(u, branch_low[0], branch_low[1])
+    if weight_low == 0.:
+        return mean_value + sigma[1]*truncated_normal_ppf(u, branch_up[0], branch_up[1])
+
+    # Both branches touch the mode, i.e. the standard normal CDF is 0.5 at u == weight_low.
+    # Left and right of it, it is a linear function of u with different slopes.
+    slope_low = (0.5 - ndtr(branch_low[0]))/weight_low
+    slope_up = (ndtr(branch_up[1]) - 0.5)/(1. - weight_low)
+    u_mode = u - weight_low
+    z = clip(ndtri(0.5 + 0.5*(slope_up + slope_low)*u_mode +
+                   0.5*(slope_up - slope_low)*absolute(u_mode)),
+             branch_low[0], branch_up[1])
+
+    return mean_value + 0.5*(sigma[1] + sigma[0])*z + 0.5*(sigma[1] - sigma[0])*absolute(z)
+
+def asym_normal_shortest_coverage(mean_value, sigma, limits=None, coverage_percent=68.27,
+                                  probability_low=0.5):
+    """ Shortest coverage interval of the (truncated) asymmetric normal distribution
+
+    The shortest coverage interval of a unimodal distribution is the set of values where \
+the probability density is above some level. At a distance of z standard deviations from \
+mean_value, the density of a branch with the standard deviation s and the probability w is \
+proportional to w/s*exp(-z^2/2), so the level set of each branch is |z| <= \
+sqrt(2*(level + log(w/s))) in units of its standard deviation. The level at which the \
+probability inside the level set equals the coverage probability only depends on the \
+standardized limits and the ratio of the standard deviations. Without limits and with equal \
+standard deviations, the interval is symmetric and given in closed form. Otherwise, the level \
+is found with a single root search.
+
+    Parameters
+    ----------
+    mean_value : float
+        Mode of the untruncated distribution
+    sigma : [float, float]
+        Left- and right-hand standard deviation, both > 0
+    limits : [float, float], optional
+        Lower and upper limit of the distribution (default: None, i.e. no limits)
+    coverage_percent : float, optional
+        Coverage probability in the interval (0, 100) in percent (default: 68.27)
+    probability_low : float, optional
+        Probability of the left branch without limits (default: 0.5)
+
+    Returns
+    -------
+    [float, float]
+        Lower and upper limit of the shortest coverage interval
+    """
+    if limits is None:
+        limits = [-inf, inf]
+    probability = 0.01*coverage_percent
+
+    if (sigma[0] == sigma[1] and probability_low == 0.5 and limits[0] == -inf and
+            limits[1] == inf):
+        half_width = sigma[0]*ndtri(0.5 + 0.5*probability)
+        return [mean_value - half_width, mean_value + half_width]
+
+    weight_low, branch_low, branch_up = asym_normal_branches(mean_value, sigma, limits,
+                                                             probability_low=probability_low)
+    mass_low = probability_low*(ndtr(branch_low[1]) - ndtr(branch_low[0]))*(weight_low > 0.)
+    mass_up = (1. - probability_low)*(ndtr(branch_up[1]) - ndtr(branch_up[0]))*(weight_low < 1.)
+    log_weight_low = log(probability_low/sigma[0])
+    log_weight_up = log((1. - probability_low)/sigma[1])
+
+    def half_widths(level):
+        return (sqrt(2.*max(level + log_weight_low, 0.)),
+                sqrt(2.*max(level + log_weight_up, 0.)))
+
+    def excess_coverage(level):
+        half_width_low, half_width_up = half_widths(level)
+        covered = 0.
+        if weight_low > 0.:
+            covered += probability_low*max(
+                ndtr(branch_low[1]) - ndtr(max(-half_width_low, branch_low[0])), 0.)
+        if weight_low < 1.:
+            covered += (1. - probability_low)*max(
+                ndtr(min(half_width_up, branch_up[1])) - ndtr(branch_up[0]), 0.)
+        return covered/(mass_low + mass_up) - probability
+
+    # At the lowest level, both level sets are empty. At the highest one, they extend beyond
+    # LOG_SPACE_LIMIT standard deviations, where the remaining probability is negligible.
+    lowest_level = -max(log_weight_low, log_weight_up)
+    highest_level = 0.5*LOG_SPACE_LIMIT**2 - min(log_weight_low, log_weight_up)
+    half_width_low, half_width_up = half_widths(brentq(excess_coverage, lowest_level,
+                                                       highest_level, xtol=1e-14, rtol=1e-14))
+
+    if weight_low == 0.:
+        return [mean_value + sigma[1]*branch_up[0],
+                mean_value + sigma[1]*min(half_width_up, branch_up[1])]
+    if weight_low == 1.:
+        return [mean_value + sigma[0]*max(-half_width_low, branch_low[0]),
+                mean_value + sigma[0]*branch_low[1]]
+
+    return [mean_value + sigma[0]*max(-half_width_low, branch_low[0]),
+            mean_value + sigma[1]*min(half_width_up, branch_up[1])]
@@ -0,0 +1,150 @@
+"""Pool of scratch buffers for the random values of operands and results of operations"""
+
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+from threading import Lock
+
+from numpy import dtype as ndtype
+from numpy import empty
+
+from .options import get_option
+
+class BufferPool:
+    """Byte-budgeted pool of free arrays, which are reused instead of allocating new ones
+
+    Each operation on Unc which does not store its random values needs arrays of n_random \
+values for its sampled operands and for its result only until the result is evaluated. \
+The operators of algebra and functions.exp sample the operands into buffers from this pool \
+and calculate the result with numpy ufuncs into another one (out=). After the evaluation, \
+the buffers are released to the pool, so that a chain of operations like ((a + b)*c)/d \
+allocates only a few arrays. Results whose evaluation is pending (see the option \
+'lazy_evaluation') hold the buffer of their random values until they are evaluated, so that \
+each of them takes a buffer of n_random values out of the pool until then.
+
+    The maximum number of bytes of the free buffers is given by the option \
+'buffer_pool_size'. Released buffers which would exceed it are discarded. All methods are \
+thread-safe.
+
+    Attributes
+    ----------
+    allocations: int
+        Number of buffers which were allocated, because no free buffer of the requested size \
+and type was available
+    reuses: int
+        Number of buffers which were taken from the pool
+    discards: int
+        Number of released buffers which were not kept to stay within the size limit
+    n_bytes: int
+        Number of bytes occupied by the free buffers
+    """
+
+    def __init__(self):
+        self._buffers = {}
+        self._lock = Lock()
+        self.allocations = 0
+        self.reuses = 0
+        self.discards = 0
+        self.n_bytes = 0
+
+    def acquire(self, n_random, dtype):
+        """Take a free buffer from the pool, or allocate a new one
+
+        Parameters
+        ----------
+        n_random : positive int
+            Length of the buffer
+        dtype : numpy.float64 or numpy.float32
+            Floating-point type of the buffer, see mc_statistics.sample_dtype()
+
+        Returns
+        -------
+        buffer : ndarray
+            Array with undefined values
+        """
+
+        key = (n_random, ndtype(dtype).str)
+        with self._lock:
+            free_buffers = self._buffers.get(key)
+            if free_buffers:
+                buffer = free_buffers.pop()
+                self.n_bytes -= buffer.nbytes
+                self.reuses += 1
+                return buffer
+
+            self.allocations += 1
+
+        return empty(n_random, dtype=dtype)
+
+    def release(self, *buffers):
+        """Return buffers to the pool
+
+        The buffers must have been obtained with acquire(), and they must not be used \
+afterwards.
+
+        Parameters
+        ----------
+        *buffers : ndarray
+        """
+
+        max_bytes = get_option("buffer_pool_size")
+        with self._lock:
+            for buffer in buffers:
+                if self.n_bytes + buffer.nbytes > max_bytes:
+                    self.discards += 1
+                    continue
+
+                self._buffers.setdefault((len(buffer), buffer.dtype.str), []).append(buffer)
+                self.n_bytes += buffer.nbytes
+
+    def clear(self):
+        """Remove all free buffers and reset the counters"""
+
+        with self._lock:
+            self._buffers.clear()
+            self.allocations = 0
+            self.reuses = 0
+            self.discards = 0
+            self.n_bytes = 0
+
+    def info(self):
+        """Get the counters of the pool
+
+        Returns
+        -------
+        info : dict
+            Values of allocations, reuses, discards and n_bytes, as well as the number of free \
+buffers n_buffers and the maximum number of bytes max_bytes
+        """
+
+        with self._lock:
+            return {"allocations": self.allocations, "reuses": self.reuses,
+                    "discards": self.discards, "n_bytes": self.n_bytes,
+                    "n_buffers": sum(len(buffers) for buffers in self._buffers.values()),
+                    "max_bytes": get_option("buffer_pool_size")}
+
+# Scratch buffers of the operators in algebra and functions
+BUFFER_POOL = BufferPool()
+
+def buffer_pool_info():
+    """Get the allocation, reuse and discard counters and the size of the pool of scratch \
+buffers, see BufferPool.info()"""
+
+    return BUFFER_POOL.info()
+
+def clear_buffer_pool():
+    """Remove all free scratch buffers from the pool and reset its counters"""
+
+    BUFFER_POOL.clear()
@@ -0,0 +1,75 @@
+"""Correlated quantities with asymmetric uncertainties, which are sampled jointly"""
+
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+from .asym_uncertainty import Unc
+from .mc_statistics import randn_asym_correlated
+
+def correlate(uncs, correlation, n_random=None, random_seed=None):
+    """Create correlated copies of quantities with asymmetric uncertainties
+
+    The distributions of the quantities are sampled jointly in a single draw with a Gaussian \
+copula (see mc_statistics.randn_asym_correlated()), i.e. each copy has the (truncated) \
+asymmetric normal distribution of the original quantity, and the copies are correlated like \
+normal distributions with the given correlation matrix. The copies store their random \
+values, so that they can be used in all operations of Unc, for example
+
+    x_corr, y_corr = correlate([x, y], [[1., 0.8], [0.8, 1.]])
+    z = x_corr - y_corr
+
+    Stored random values of the original quantities are not used. Like all quantities which \
+are given by random values, the copies are evaluated from them, so their mean_value, \
+sigma_low and sigma_up agree with the original ones up to the Monte Carlo uncertainty.
+
+    Parameters
+    ----------
+    uncs : list of Unc
+        Quantities that are correlated
+    correlation : array_like
+        Symmetric, positive definite correlation matrix of shape (len(uncs), len(uncs)) with \
+ones on the diagonal
+    n_random : positive int or None, optional
+        Number of random values of the copies (default: None, i.e. n_random of uncs[0])
+    random_seed : non-negative int or None, optional
+        Seed of the joint draw, see random_streams.generator() (default: None, i.e. the seed \
+of uncs[0])
+
+    Returns
+    -------
+    correlated_uncs : list of Unc
+        Correlated copies of uncs. Exact quantities are returned unchanged.
+    """
+
+    try:
+        if not uncs or not all(isinstance(unc, Unc) for unc in uncs):
+            raise ValueError("Correlated quantities must be a non-empty list of Unc")
+    except ValueError:
+        print("ValueError")
+        raise
+
+    if n_random is None:
+        n_random = uncs[0].n_random
+    if random_seed is None:
+        random_seed = uncs[0].seed
+
+    rand = randn_asym_correlated([unc.mean_value for unc in uncs],
+                                 [[unc.sigma_low, unc.sigma_up] for unc in uncs], correlation,
+                                 limits=[list(unc.limits) for unc in uncs],
+                                 random_seed=random_seed, n_random=n_random)
+
+    return [unc if unc.is_exact else
+            Unc(limits=list(unc.limits), random_values=rand_unc, store=True, n_random=n_random)
+            for unc, rand_unc in zip(uncs, rand)]
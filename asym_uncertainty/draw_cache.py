@@ -0,0 +1,150 @@
+"""Least-recently-used cache for standardized random draws of each random number seed"""
+
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import OrderedDict
+from threading import Lock
+
+from .options import get_option
+
+class DrawCache:
+    """Byte-budgeted least-recently-used (LRU) cache of arrays
+
+    An untruncated Unc object with the seed s is always sampled from the same standardized \
+draws, i.e. the absolute values |z| of standard normal numbers and the information whether \
+they belong to the lower or the upper side of the mode. Caching them makes it possible to \
+reconstruct the random values of an operand which appears several times in a calculation \
+with a single multiplication and addition.
+
+    The maximum number of bytes is given by the option 'draw_cache_size'. If adding an entry \
+exceeds this number, the least recently used entries are evicted. All methods are \
+thread-safe. The entries are kept until they are evicted or the cache is cleared, also after \
+the Unc objects of their seeds are deleted. Since every new Unc object has a new seed, the \
+cache is disabled by default, and it should only be enabled for calculations which sample \
+the same operands several times.
+
+    Attributes
+    ----------
+    hits: int
+        Number of successful look-ups
+    misses: int
+        Number of look-ups which did not find an entry
+    evictions: int
+        Number of entries that were removed to stay within the size limit
+    n_bytes: int
+        Number of bytes occupied by the cached arrays
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.n_bytes = 0
+
+    def get(self, key):
+        """Look up an entry and mark it as recently used
+
+        Parameters
+        ----------
+        key : hashable
+
+        Returns
+        -------
+        arrays : tuple of ndarray or None
+            The cached arrays, or None if there is no entry for key
+        """
+
+        with self._lock:
+            arrays = self._entries.get(key)
+            if arrays is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return arrays
+
+    def put(self, key, arrays):
+        """Add an entry and evict least recently used entries if necessary
+
+        The arrays are made read-only, since the same objects are handed out to all \
+subsequent look-ups. Entries that are larger than the whole cache are not stored.
+
+        Parameters
+        ----------
+        key : hashable
+        arrays : tuple of ndarray
+        """
+
+        entry_bytes = sum(arr.nbytes for arr in arrays)
+        max_bytes = get_option("draw_cache_size")
+        if entry_bytes > max_bytes:
+            return
+
+        for arr in arrays:
+            arr.setflags(write=False)
+
+        with self._lock:
+            if key in self._entries:
+                self.n_bytes -= sum(arr.nbytes for arr in self._entries.pop(key))
+            self._entries[key] = arrays
+            self.n_bytes += entry_bytes
+
+            while self.n_bytes > max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.n_bytes -= sum(arr.nbytes for arr in evicted)
+                self.evictions += 1
+
+    def clear(self):
+        """Remove all entries and reset the counters"""
+
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.n_bytes = 0
+
+    def info(self):
+        """Get the counters of the cache
+
+        Returns
+        -------
+        info : dict
+            Values of hits, misses, evictions and n_bytes, as well as the number of entries \
+n_entries and the maximum number of bytes max_bytes
+        """
+
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "n_bytes": self.n_bytes, "n_entries": len(self._entries),
+                    "max_bytes": get_option("draw_cache_size")}
+
+# Cache of the standardized draws used by mc_statistics.randn_asym_untruncated()
+DRAW_CACHE = DrawCache()
+
+def draw_cache_info():
+    """Get the hit, miss and eviction counters and the size of the cache of standardized \
+draws, see DrawCache.info()"""
+
+    return DRAW_CACHE.info()
+
+def clear_draw_cache():
+    """Remove all standardized draws from the cache and reset its counters"""
+
+    DRAW_CACHE.clear()
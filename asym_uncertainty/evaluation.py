@@ -16,41 +16,140 @@ values from a distribution"""
 #    You should have received a copy of the GNU General Public License
 #    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
 
-import warnings
+from time import perf_counter
 
-from numpy import argmax, extract, histogram, median
-from scipy.optimize import minimize, minimize_scalar
-from scipy.stats import gaussian_kde
+from numpy import (arange, argmin, array, column_stack, concatenate, count_nonzero, empty,
+                   extract, ndim, searchsorted, shape, size, sort)
 
-from .mc_statistics import cdf, shortest_coverage
+from .auxiliary import asym_normal_mode, asym_normal_shortest_coverage
+from .mc_statistics import (binned_mode, bootstrap_coverage_uncertainties, candidate_ranges,
+                            candidate_shortest_coverage, coverage_endpoint_uncertainties,
+                            coverage_intervals, effective_sample_size, histogram_pass,
+                            shortest_coverage_indices, weighted_cdf,
+                            weighted_coverage_endpoint_uncertainties, weighted_coverage_intervals,
+                            weighted_shortest_coverage_indices)
+from .mode_estimators import MODE_ESTIMATOR_COUNTERS, estimate_batch_mode, estimate_mode
+from .options import get_option
 
-def evaluate(rand_result, force_inside_shortest_coverage=True, use_kde=True):
-    """Implementation of Unc.eval()"""
+BATCH_BLOCK_SIZE = 2**18 # Number of random values which evaluate_batch() evaluates at once
+APPROXIMATE_N_BINS = 2**16 # Default number of bins of the histograms of evaluate_approximate()
+APPROXIMATE_BLOCK_SIZE = 2**16 # Number of random values which evaluate_approximate() bins or
+# compares at once, so that the temporary arrays stay in the cache
+APPROXIMATE_REFINE_SIZE = 2**16 # Number of candidates for the endpoints of the shortest coverage
+# interval below which evaluate_approximate() sorts them instead of narrowing them down further
 
-    s_cov = shortest_coverage(cdf(rand_result))
+def evaluate(rand_result, force_inside_shortest_coverage=True, use_kde=True, weights=None,
+             full_output=False, presorted=False, mode_estimator=None, distribution=None,
+             overwrite_input=False, coverage_probabilities=None, evaluation=None,
+             coverage_uncertainty=None, random_seed=None):
+    """Implementation of Unc.eval()
+
+    If weights are given, for example by mc_statistics.control_variate_weights(), the \
+shortest coverage interval and the most probable value are determined from the weighted \
+random values. If full_output is True, a dictionary with additional information is \
+returned as the third element. At the moment, it contains the effective sample size \
+'effective_sample_size' of the weights (see mc_statistics.effective_sample_size()), the \
+name of the estimator of the most probable value 'mode_estimator' and the time in seconds \
+that it took 'mode_seconds', and the bounds of the errors of the endpoints of the shortest \
+coverage interval 'coverage_errors', which are zero unless the approximate evaluation is \
+used (see below). If coverage_probabilities are given, for example \
+[0.6827, 0.9545, 0.9973], it also contains the shortest coverage interval for each of them \
+'coverage_intervals' (see mc_statistics.coverage_intervals()), which are determined from the \
+same sorted values. If coverage_uncertainty is 'order_statistics' or 'bootstrap', it contains \
+the uncertainties of the endpoints of the shortest coverage interval 'coverage_uncertainties' \
+(see mc_statistics.coverage_endpoint_uncertainties(), \
+mc_statistics.weighted_coverage_endpoint_uncertainties() for weighted random values and \
+mc_statistics.bootstrap_coverage_uncertainties(), which uses random_seed and is only \
+available for unweighted random values). If they are not small compared to sigma_low and \
+sigma_up, n_random is too small. If presorted is True, rand_result is assumed to be sorted in \
+ascending order already, and the unweighted CDF is calculated without sorting it again. \
+Otherwise, the unweighted random values are sorted once, in place if overwrite_input is True. \
+This saves a copy of temporary arrays, but the returned random values are sorted then.
+
+    The most probable value is estimated from the values inside the shortest coverage \
+interval with the registered estimator mode_estimator (see mode_estimators.MODE_ESTIMATORS). \
+By default, the estimator is given by the option 'mode_estimator', which is the maximum of a \
+binned Gaussian kernel density estimate (see mc_statistics.binned_kde_mode()). If use_kde is \
+False and no estimator is given, it is the center of the highest bin of their histogram. \
+If the distribution of the random values is known, it can be passed as distribution \
+(see Unc.sampled_distribution) for the 'analytic' estimator.
+
+    Unweighted random values which are not presorted are evaluated without sorting them if \
+evaluation, which is given by the option 'evaluation' by default, is 'approximate' or \
+'refined' and neither coverage_probabilities nor coverage_uncertainty are requested (see \
+evaluate_approximate()).
+    """
+
+    try:
+        if coverage_uncertainty not in (None, "order_statistics", "bootstrap"):
+            raise ValueError("coverage_uncertainty must be None, 'order_statistics' or \
+'bootstrap'.")
+    except ValueError:
+        print("ValueError")
+        raise
+
+    if evaluation is None:
+        evaluation = get_option("evaluation")
+    if (evaluation != "exact" and weights is None and not presorted and
+            coverage_probabilities is None and coverage_uncertainty is None):
+        return evaluate_approximate(rand_result, use_kde=use_kde, mode_estimator=mode_estimator,
+                                    refine=evaluation == "refined", full_output=full_output)
+
+    if mode_estimator is None:
+        mode_estimator = get_option("mode_estimator") if use_kde else "histogram"
+
+    if weights is None:
+        # Sort once and find the values inside the shortest coverage interval as a slice of
+        # the sorted values
+        if presorted:
+            sorted_values = rand_result
+        elif overwrite_input and rand_result.ndim == 1 and rand_result.flags.writeable:
+            rand_result.sort()
+            sorted_values = rand_result
+        else:
+            sorted_values = sort(rand_result, axis=None)
+        first, last = shortest_coverage_indices(sorted_values)
+        # Include values which are equal to the endpoints
+        first = searchsorted(sorted_values, sorted_values[first], side="left")
+        last = searchsorted(sorted_values, sorted_values[last], side="right")
+        # The limits are double precision, even for single-precision random values
+        s_cov = array([sorted_values[first], sorted_values[last - 1]], dtype=float)
+    else:
+        weighted_cum_dis_fun = weighted_cdf(rand_result, weights)
+        lower, upper = weighted_shortest_coverage_indices(weighted_cum_dis_fun)
+        s_cov = weighted_cum_dis_fun[0][[lower, upper]].astype(float)
+
+    intervals = None
+    if coverage_probabilities is not None:
+        if weights is None:
+            intervals = coverage_intervals(sorted_values, coverage_probabilities)
+        else:
+            intervals = weighted_coverage_intervals(weighted_cum_dis_fun, coverage_probabilities)
+
+    uncertainties = None
+    if weights is None and coverage_uncertainty == "order_statistics":
+        uncertainties = coverage_endpoint_uncertainties(sorted_values, first, last - 1)
+    elif coverage_uncertainty == "order_statistics":
+        uncertainties = weighted_coverage_endpoint_uncertainties(weighted_cum_dis_fun, lower,
+                                                                 upper)
+    elif weights is None and coverage_uncertainty == "bootstrap":
+        uncertainties = bootstrap_coverage_uncertainties(sorted_values, first, last - 1,
+                                                         random_seed=random_seed)
     
     if force_inside_shortest_coverage:
         
-        data_inside     = extract((rand_result >= s_cov[0])*(rand_result <= s_cov[1]), rand_result)    	
-        hist, bins      = histogram(data_inside,bins="sqrt")
-        most_probable   = bins[argmax(hist)]+0.5*(bins[1]-bins[0])
-
-        if use_kde:
-
-            plain_kde   = gaussian_kde(data_inside)
-            inv_kde     = lambda x: (-1)*plain_kde.evaluate(x)
-            min_kde     = minimize_scalar(inv_kde,bounds=((s_cov[0],s_cov[1])), method='bounded')
-
-            if min_kde.success:
-                if isinstance(min_kde.x,(int,float)):
-                    most_probable = min_kde.x
-                else:
-                    most_probable = min_kde.x[0]
-	
-            else:
-                warnings.warn('Minimization of KDE failed due to %s. Use histogram-generated mode instead.'% min_kde.message,
-                    UserWarning)
-            
+        if weights is None:
+            data_inside     = sorted_values[first:last]
+            weights_inside  = None
+        else:
+            inside          = (rand_result >= s_cov[0])*(rand_result <= s_cov[1])
+            data_inside     = extract(inside, rand_result)
+            weights_inside  = extract(inside, weights)
+        start           = perf_counter()
+        most_probable, mode_estimator = estimate_mode(mode_estimator, data_inside, s_cov,
+                                                      weights=weights_inside,
+                                                      distribution=distribution)
+        mode_seconds    = perf_counter() - start
 
 # In the context of asym_uncertainty, this case will never occur.
 # However, it was decided to leave the 'else' statement here as a reminder that
@@ -60,4 +159,213 @@ def evaluate(rand_result, force_inside_shortest_coverage=True, use_kde=True):
 
     
 
+    if full_output:
+        n_effective = len(rand_result) if weights is None else effective_sample_size(weights)
+        return ([most_probable, most_probable - s_cov[0], s_cov[1] - most_probable], rand_result,
+                {"effective_sample_size": n_effective, "mode_estimator": mode_estimator,
+                 "mode_seconds": mode_seconds, "coverage_intervals": intervals,
+                 "coverage_errors": [0., 0.], "coverage_uncertainties": uncertainties})
+
     return ([most_probable, most_probable - s_cov[0], s_cov[1] - most_probable], rand_result)
+
+def evaluate_distribution(distribution, coverage_percent=68.27):
+    """Most probable value and uncertainties of a known (truncated) asymmetric normal \
+distribution
+
+    The result is the limit of evaluate() for infinitely many random values from the \
+distribution, but it is computed analytically (see auxiliary.asym_normal_mode() and \
+auxiliary.asym_normal_shortest_coverage()).
+
+    Parameters
+    ----------
+    distribution : [float, [float, float], [float, float]]
+        Mode, standard deviations and limits of the distribution, as in \
+Unc.sampled_distribution. Both standard deviations must be > 0.
+    coverage_percent : float, optional
+        Coverage probability of the uncertainties in the interval (0, 100) in percent \
+(default: 68.27)
+
+    Returns
+    -------
+    [float, float, float]
+        Most probable value, lower and upper uncertainty
+    """
+
+    mean_value, sigma, limits = distribution
+    most_probable = asym_normal_mode(mean_value, limits=limits)
+    s_cov = asym_normal_shortest_coverage(mean_value, sigma, limits=limits,
+                                          coverage_percent=coverage_percent)
+
+    return [most_probable, most_probable - s_cov[0], s_cov[1] - most_probable]
+
+def evaluate_approximate(rand_result, use_kde=True, mode_estimator=None, refine=False,
+                         full_output=False, n_bins=APPROXIMATE_N_BINS, coverage_percent=68.27):
+    """Evaluate random values without sorting them
+
+    A histogram of the random values with n_bins bins narrows down the endpoints of the \
+shortest coverage interval to a few bins (see mc_statistics.candidate_ranges()). The \
+endpoints are the centers of these candidates, and half of the width of the candidates is a \
+guaranteed bound of their error, which is returned as 'coverage_errors' if full_output is \
+True. If refine is True, histograms of the candidates narrow them down further, until they \
+contain less than APPROXIMATE_REFINE_SIZE values, and only these values are sorted to find \
+the exact endpoints (see mc_statistics.candidate_shortest_coverage()). Either way, the cost \
+is O(N) instead of O(N log N) for N random values. The most probable value is estimated from \
+the values inside the interval like in evaluate(), except for the default estimator \
+'binned_kde', which uses a histogram of them with n_bins bins (see mc_statistics.binned_mode()).
+
+    Parameters
+    ----------
+    rand_result : ndarray
+        Random values
+    use_kde : bool, optional
+        If False and no mode_estimator is given, the histogram estimator is used (default: True)
+    mode_estimator : str, optional
+        Name of the estimator of the most probable value (default: None, i.e. the option \
+'mode_estimator')
+    refine : bool, optional
+        Find the exact endpoints of the shortest coverage interval (default: False)
+    full_output : bool, optional
+        Return a dictionary with additional information like evaluate() (default: False)
+    n_bins : int, optional
+        Number of bins of the histograms, n_bins > 1 (default: APPROXIMATE_N_BINS)
+    coverage_percent : float, optional
+        Coverage of the interval in percent (default: 68.27)
+
+    Returns
+    -------
+    evaluation : [[float, float, float], ndarray] or [[float, float, float], ndarray, dict]
+        Most probable value, lower and upper uncertainty, and the random values, see evaluate()
+    """
+
+    try:
+        if not isinstance(n_bins, int) or n_bins < 2:
+            raise ValueError("n_bins must be an int > 1")
+    except ValueError:
+        print("ValueError")
+        raise
+
+    if mode_estimator is None:
+        mode_estimator = get_option("mode_estimator") if use_kde else "histogram"
+
+    n_random = size(rand_result)
+    blocks = lambda: (rand_result[start:start + APPROXIMATE_BLOCK_SIZE]
+                      for start in range(0, n_random, APPROXIMATE_BLOCK_SIZE))
+    value_range = [float(rand_result.min()), float(rand_result.max())]
+    if value_range[0] == value_range[1]:
+        s_cov = array(value_range)
+        errors = [0., 0.]
+    else:
+        n_coverage = int(coverage_percent*0.01*n_random)
+        histograms = histogram_pass(blocks(), [value_range], n_bins)
+        value_ranges, n_inside = candidate_ranges(2*histograms, 2*[value_range], n_coverage,
+                                                  n_random)
+        if refine:
+            # Like in streaming.streaming_propagation(), stop if the histograms do not narrow
+            # down the candidates any more, for example for discrete values
+            n_inside_previous = n_random + 1
+            while APPROXIMATE_REFINE_SIZE < n_inside < n_inside_previous:
+                n_inside_previous = n_inside
+                value_ranges, n_inside = candidate_ranges(
+                    histogram_pass(blocks(), value_ranges, n_bins), value_ranges, n_coverage,
+                    n_random)
+            s_cov = array(candidate_shortest_coverage(blocks(), value_ranges, n_coverage))
+            errors = [0., 0.]
+        else:
+            s_cov = array([0.5*(lower + upper) for lower, upper in value_ranges])
+            errors = [0.5*(upper - lower) for lower, upper in value_ranges]
+
+    start = perf_counter()
+    if mode_estimator == "binned_kde" and s_cov[0] < s_cov[1]:
+        # The binned KDE only needs a histogram of the values inside the interval
+        most_probable = binned_mode(histogram_pass(blocks(), [s_cov], n_bins)[0][1], s_cov,
+                                    s_cov)
+        MODE_ESTIMATOR_COUNTERS.record(mode_estimator, perf_counter() - start)
+    else:
+        data_inside = concatenate([block[(block >= s_cov[0])*(block <= s_cov[1])]
+                                   for block in blocks()])
+        most_probable, mode_estimator = estimate_mode(mode_estimator, data_inside, s_cov)
+    mode_seconds = perf_counter() - start
+
+    if full_output:
+        return ([most_probable, most_probable - s_cov[0], s_cov[1] - most_probable], rand_result,
+                {"effective_sample_size": n_random, "mode_estimator": mode_estimator,
+                 "mode_seconds": mode_seconds, "coverage_intervals": None,
+                 "coverage_errors": errors, "coverage_uncertainties": None})
+
+    return ([most_probable, most_probable - s_cov[0], s_cov[1] - most_probable], rand_result)
+
+def evaluate_batch(rand_results, use_kde=True, mode_estimator=None, overwrite_input=False,
+                   coverage_percent=68.27):
+    """Evaluate the random values of several independent quantities at once
+
+    Each row of rand_results holds the random values of one quantity. The result for each \
+row is the same as the one of evaluate() without weights, but blocks of rows with a total of \
+about BATCH_BLOCK_SIZE values are evaluated together: the rows are sorted along the axis, the \
+shortest coverage intervals are found by a single argmin of the widths of all candidate \
+intervals, and the most probable values are estimated for all rows of the block at once if the \
+estimator has a vectorized implementation (see mode_estimators.BATCH_MODE_ESTIMATORS). \
+If overwrite_input is True, the rows of rand_results are sorted in place.
+
+    Example
+    -------
+    channels = numpy.exp(numpy.random.default_rng().normal(size=(1000, 100000)))
+    most_probable, sigma_low, sigma_up = evaluate_batch(channels).T
+
+    Parameters
+    ----------
+    rand_results : ndarray
+        (m, n) array of the random values of m quantities
+    use_kde : bool, optional
+        If False and no mode_estimator is given, the histogram estimator is used (default: True)
+    mode_estimator : str, optional
+        Name of the estimator of the most probable value (default: None, i.e. the option \
+'mode_estimator')
+    overwrite_input : bool, optional
+        Sort rand_results in place (default: False)
+    coverage_percent : float, optional
+        Coverage of the interval in percent (default: 68.27)
+
+    Returns
+    -------
+    evaluation : ndarray
+        (m, 3) array of the most probable value, the lower and the upper uncertainty of each \
+quantity
+    """
+
+    try:
+        if ndim(rand_results) != 2 or shape(rand_results)[1] < 2:
+            raise ValueError("rand_results must be an (m, n) array with n > 1.")
+    except ValueError:
+        print("ValueError")
+        raise
+
+    if mode_estimator is None:
+        mode_estimator = get_option("mode_estimator") if use_kde else "histogram"
+
+    n_rows, n_rand = shape(rand_results)
+    coverage_interval = int(coverage_percent*0.01*n_rand)
+    rows_per_block = max(1, BATCH_BLOCK_SIZE//n_rand)
+    most_probable = empty(n_rows)
+    lower = empty(n_rows)
+    upper = empty(n_rows)
+
+    for start in range(0, n_rows, rows_per_block):
+        block = slice(start, start + rows_per_block)
+        if overwrite_input and rand_results.flags.writeable:
+            sorted_values = rand_results[block]
+            sorted_values.sort(axis=1)
+        else:
+            sorted_values = sort(rand_results[block], axis=1)
+
+        rows = arange(len(sorted_values))
+        first = argmin(sorted_values[:, coverage_interval:] -
+                       sorted_values[:, :n_rand - coverage_interval], axis=1)
+        lower[block] = sorted_values[rows, first]
+        upper[block] = sorted_values[rows, first + coverage_interval]
+        # Include values which are equal to the endpoints, like evaluate()
+        first = count_nonzero(sorted_values < lower[block, None], axis=1)
+        last = n_rand - count_nonzero(sorted_values > upper[block, None], axis=1)
+
+        most_probable[block] = estimate_batch_mode(mode_estimator, sorted_values, first, last)
+
+    return column_stack((most_probable, most_probable - lower, upper - most_probable))
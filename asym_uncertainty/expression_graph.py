@@ -0,0 +1,174 @@
+"""Lazy expression graphs of operations on Unc, which are evaluated in a single vectorised pass"""
+
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+from copy import copy
+
+from .algebra import sample_operand
+from .evaluation import evaluate
+from .mc_statistics import as_sample_array
+
+class Expression:
+    """Node of the expression graph of an operation on Unc
+
+    If the option 'expression_graph' is set, operations on Unc which do not store their random \
+values create a node instead of sampling and evaluating their result (see \
+Unc.from_expression()). The operands of a node are the leaves of the graph, i.e. Unc which \
+are not the result of such an operation, built-in numbers, or other nodes. Each leaf is \
+sampled only once per seed when the graph is evaluated, so that correlations like in \
+z = x/(1+x) or z = (a*b)/(a+c) are exact, although the intermediate results are neither \
+stored nor resampled from a fitted asymmetric normal distribution.
+
+    The operands are replaced by snapshots when the node is created (see \
+snapshot_graph_operand()). Like for the other operations on Unc, changing a leaf with the set* \
+methods of Unc afterwards does not change the result.
+
+    Attributes
+    ----------
+    function : function
+        Vectorised function of the random values of the operands, for example numpy.add
+    operands : list of Expression, Unc, int or float
+        Snapshots of the operands of the operation
+    """
+
+    def __init__(self, function, operands):
+        self.function = function
+        self.operands = [snapshot_graph_operand(operand) for operand in operands]
+
+    def sample(self, samples=None):
+        """Random values of the result of the expression
+
+        Parameters
+        ----------
+        samples : dict or None, optional
+            Random values of the leaves and nodes which have already been sampled in the \
+current pass through the graph. If None, a new pass is started. (default: None)
+
+        Returns
+        -------
+        rand_result : ndarray
+        """
+
+        if samples is None:
+            samples = {}
+
+        key = ("node", id(self))
+        if key not in samples:
+            samples[key] = self.function(*[sample_graph_operand(operand, samples)
+                                           for operand in self.operands])
+
+        return samples[key]
+
+def evaluate_expression(expression):
+    """Sample the leaves of an expression graph and evaluate the result
+
+    Parameters
+    ----------
+    expression : Expression
+
+    Returns
+    -------
+    evaluation : [float, float, float]
+        Most probable value, lower and upper uncertainty, see evaluation.evaluate()
+    """
+
+    rand_result = as_sample_array(expression.sample())
+
+    # For example, x - x is exact
+    if rand_result.min() == rand_result.max():
+        return [float(rand_result[0]), 0., 0.]
+
+    return evaluate(rand_result, overwrite_input=True)[0]
+
+def is_graph_leaf_constant(operand):
+    """Check whether an operand of an expression graph is replaced by its mean value
+
+    Parameters
+    ----------
+    operand : Unc, int or float
+
+    Returns
+    -------
+    is_constant : bool
+        True, if operand is a built-in number, or an exact Unc which is neither the result of \
+an expression graph nor stores or keeps its random values (see Unc.pending_random_values)
+    """
+
+    if isinstance(operand, (int, float)):
+        return True
+
+    return (operand.expression is None and not operand.store and
+            operand.pending_random_values is None and operand.is_exact)
+
+def snapshot_graph_operand(operand):
+    """Freeze an operand of an expression graph
+
+    Parameters
+    ----------
+    operand : Unc, int or float
+
+    Returns
+    -------
+    snapshot : Expression, Unc, int or float
+        For the result of an expression graph, its node. For an operand which is replaced by \
+its mean value (see is_graph_leaf_constant()), the mean value. For other leaves, a shallow \
+copy with the same seed, whose limits and pending random values (see \
+Unc.pending_random_values) are copied as well, since they may be changed in place. Built-in \
+numbers are returned unchanged.
+    """
+
+    if isinstance(operand, (int, float)):
+        return operand
+
+    if operand.expression is not None:
+        return operand.expression
+
+    if is_graph_leaf_constant(operand):
+        return float(operand.mean_value)
+
+    leaf = copy(operand)
+    leaf.limits = list(operand.limits)
+    if operand.pending_random_values is not None:
+        leaf.pending_random_values = operand.pending_random_values.copy()
+
+    return leaf
+
+def sample_graph_operand(operand, samples):
+    """Get the random values which represent an operand in a pass through an expression graph
+
+    Parameters
+    ----------
+    operand : Expression, Unc, int or float
+        Snapshot of an operand, see snapshot_graph_operand()
+    samples : dict
+        See Expression.sample()
+
+    Returns
+    -------
+    random_values : ndarray or float
+    """
+
+    if isinstance(operand, (int, float)):
+        return operand
+
+    if isinstance(operand, Expression):
+        return operand.sample(samples)
+
+    key = ("seed", operand.seed)
+    if key not in samples:
+        samples[key] = sample_operand(operand)
+
+    return samples[key]
@@ -16,12 +16,13 @@ Unc class"""
 #    You should have received a copy of the GNU General Public License
 #    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
 
-from numpy import array
 from numpy import exp as nexp
 
-from asym_uncertainty import evaluate, Unc
-from .mc_statistics import randn_asym
+from asym_uncertainty import Unc
+from .algebra import evaluate_operation, is_exact_constant, sample_operand, scratch_buffer
+from .operation_cache import cached_operation
 
+@cached_operation("exp")
 def exp(unc):
     """ Calculate exp(u)
 
@@ -42,22 +43,19 @@ def exp(unc):
         print("ValueError")
         raise
 
-    if unc.is_exact:
+    if Unc.uses_expression_graph(unc):
+        return Unc.from_expression(nexp, unc)
+
+    if is_exact_constant(unc):
         return Unc(nexp(unc.mean_value), 0., 0.,
                    n_random=unc.n_random, random_values=nexp(unc.random_values),
                    store=unc.store)
 
-    if unc.store:
-        rand = unc.random_values
-    else:
-        rand = randn_asym(unc.mean_value, [unc.sigma_low, unc.sigma_up],
-                          limits=unc.limits, random_seed=unc.seed,
-                          n_random=unc.n_random)
-
-    rand_result = nexp(rand)
+    scratch = []
+    rand_unc = sample_operand(unc, scratch)
+    rand_result = nexp(rand_unc, out=scratch_buffer(len(rand_unc), scratch))
 
-    exp_result = evaluate(rand_result, force_inside_shortest_coverage=True)
+    exp_result = evaluate_operation(rand_result, [unc, rand_unc], overwrite_input=not unc.store,
+                                    scratch=scratch)
 
-    return Unc(exp_result[0][0], exp_result[0][1], exp_result[0][2],
-               random_values=exp_result[1] if unc.store else array([0.]),
-               store=unc.store, n_random=unc.n_random)
+    return Unc.from_operation(exp_result, unc.store, unc.n_random)
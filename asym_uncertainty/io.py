@@ -2,16 +2,21 @@
 
 import warnings
 
-from numpy import array, absolute, sort, extract, floor, log10
+from numpy import (array, absolute, atleast_1d, concatenate, sort, extract, floor, linspace, log10,
+                   ndim, searchsorted)
 from numpy import minimum as nminimum
 from numpy import round as nround
-from numpy.random import uniform
 
 from scipy.interpolate import interp1d
 
-from .mc_statistics import cdf, check_num_array_argument, randn_asym
+from .auxiliary import asym_normal_shortest_coverage
+from .mc_statistics import (PREFIX_BLOCK_SIZE, check_coverage_probabilities,
+                            check_num_array_argument, coverage_intervals, merge_sorted,
+                            randn_asym, randn_asym_prefix, sample_prefix)
+from .random_streams import STREAM_RESAMPLING, generator
 
-from .evaluation import evaluate
+from .evaluation import evaluate, evaluate_distribution
+from .options import get_option, with_current_options
 
 #    This file is part of asym_uncertainty.
 #
@@ -55,88 +60,294 @@ def check_numeric(self, other):
         print("ValueError")
         raise
 
-def round_digits(self):
-    """Implementation of Unc.round_digits()"""
-    arr = array([self.mean_value, self.sigma_low, self.sigma_up])
+def coverage(self, coverage_probability):
+    """Implementation of Unc.coverage()"""
 
-    # Safety measure: if the absolute mean value is much smaller than the uncertainty,
-    # simply set it to zero
-    if arr.all() > 0. and absolute(arr[0])/nminimum(arr[1], arr[2]) < 10**-1:
-        arr[0] = 0.
+    probabilities = atleast_1d(coverage_probability)
+    if self.store:
+        distribution = known_distribution(self.sampled_distribution)
+    else:
+        distribution = known_distribution([self.mean_value, [self.sigma_low, self.sigma_up],
+                                           self.limits])
+
+    if self.is_exact:
+        intervals = array([[self.mean_value, self.mean_value]]*len(probabilities))
+    elif distribution is not None:
+        check_coverage_probabilities(probabilities)
+        intervals = array([asym_normal_shortest_coverage(distribution[0], distribution[1],
+                                                         limits=distribution[2],
+                                                         coverage_percent=100.*probability)
+                           for probability in probabilities])
+    elif self.store:
+        intervals = coverage_intervals(get_sorted_random_values(self), probabilities)
+    else:
+        intervals = coverage_intervals(sort(randn_asym(self.mean_value,
+                                                       [self.sigma_low, self.sigma_up],
+                                                       limits=self.limits, random_seed=self.seed,
+                                                       n_random=self.n_random)),
+                                       probabilities)
 
-    # If both the mean value and both uncertainties are zero, treat it as  a special case.
-    # In all other cases, the smallest nonzero value of [mean_value, sigma_low, sigma_up]
-    # determines the digits of the rounded values.
-    arr_sort = sort(arr)
-    nonzero = extract(arr_sort > 0., arr_sort)
-    if len(nonzero) != 0:
-        if self.sigma_low == self.sigma_up == 0.:
-            arr_round = [self.mean_value, 0., 0.]
+    if ndim(coverage_probability) == 0:
+        return intervals[0]
 
-        else:
-            first_digit = floor(log10(absolute(nonzero[0])))
-            # Make a decision on the number of displayed digits based on a recommendation
-            # by the PDG
-            first_three_digits = nround(nonzero[0]*10**(-first_digit+2))
+    return intervals
 
-            if 100 <= first_three_digits <= 354:
-                rounding_digits = 1
-            elif 355 <= first_three_digits <= 949:
-                rounding_digits = 0
-            else:
-                rounding_digits = 1
+def evaluate_random_values(self):
+    """Update mean_value, sigma_low and sigma_up from the sorted random values
 
-            arr_round = (nround(arr*10**(-first_digit+rounding_digits))/
-                         10**(-first_digit+rounding_digits))
+    If the random values were sampled from a distribution which is known analytically (see \
+Unc.sampled_distribution and known_distribution()), they are updated analytically instead \
+(see evaluation.evaluate_distribution()). Otherwise, if the option 'lazy_evaluation' is set, \
+the update is deferred until one of them is accessed (see resolve_pending_evaluation()). The \
+random values are only sorted then.
+    """
 
-            self.rounded = arr_round
+    if known_distribution(self.sampled_distribution) is not None:
+        self.pending_evaluation = None
+        set_evaluation(self, evaluate_distribution(self.sampled_distribution))
+        return
 
-    # Nothing else needed. If mean_value == sigma_low == sigma_up, the default value of
-    # self.rounded will be [0., 0., 0.] anyway.
+    evaluation = with_current_options(
+        lambda: evaluate(get_sorted_random_values(self), force_inside_shortest_coverage=True,
+                         presorted=True, distribution=self.sampled_distribution)[0])
+    if get_option("lazy_evaluation"):
+        self.pending_evaluation = evaluation
+    else:
+        self.pending_evaluation = None
+        set_evaluation(self, evaluation())
+
+def extend_random_values(self):
+    """Append random values until there are n_random of them
+
+    If the stored values were sampled from an asymmetric normal distribution (see \
+Unc.sampled_distribution), the new values continue its prefix-stable stream, i.e. the \
+result is the same as if n_random values had been sampled at once. Otherwise, the new values \
+are resampled from the empirical distribution of the stored ones (see \
+resample_random_values()). The new values are merged into the sorted random values, and \
+the Unc object is evaluated again without sorting all values.
+    """
 
-def sample_random_numbers(self):
-    """Implementation of Unc.sample_random_numbers()"""
+    n_stored = len(self.random_values)
+    if self.sampled_distribution is None:
+        warnings.warn("Requested n_random (%i) is larger than stored number of \
+random values (%i). Appending values which are resampled from the empirical distribution of \
+the stored values." % (self.n_random, n_stored), UserWarning)
+        new_values = resample_random_values(self, n_stored, self.n_random)
+    else:
+        mean_value, sigma, limits = self.sampled_distribution
+        new_values = randn_asym_prefix(mean_value, sigma, limits=limits, random_seed=self.seed,
+                                       start=n_stored, stop=self.n_random)
+
+    self.sorted_random_values = merge_sorted(get_sorted_random_values(self), new_values)
+    self.random_values = concatenate((self.random_values, new_values))
+    evaluate_random_values(self)
+
+def get_sorted_random_values(self):
+    """Get the random values of Unc, sorted in ascending order
+
+    The sorted values are cached in Unc.sorted_random_values until the random values change.
+    """
+
+    if self.sorted_random_values is None:
+        self.sorted_random_values = sort(self.random_values)
+
+    return self.sorted_random_values
+
+def known_distribution(distribution):
+    """Check whether a distribution of Unc is known analytically
+
+    This is the case if the option 'input_evaluation' is 'analytic' and both standard \
+deviations of the distribution are nonzero.
+
+    Parameters
+    ----------
+    distribution : [float, [float, float], [float, float]] or None
+        Mode, standard deviations and limits of an asymmetric normal distribution, for \
+example Unc.sampled_distribution, or None if it is unknown
+
+    Returns
+    -------
+    distribution : [float, [float, float], [float, float]] or None
+        The distribution, or None if it is not known analytically
+    """
+
+    if (distribution is None or get_option("input_evaluation") != "analytic" or
+            0. in distribution[1]):
+        return None
+
+    return distribution
+
+def pdg_rounding_exponent(value):
+    """Get the decimal exponent of the last digit which is displayed for an uncertainty, \
+according to the rounding rules of the Particle Data Group (PDG)
+
+    If the three highest digits of the uncertainty are between 100 and 354, it is rounded to \
+two significant digits. Between 355 and 949, it is rounded to one significant digit. \
+Between 950 and 999, two significant digits are kept.
+
+    Parameters
+    ----------
+    value : float
+        Uncertainty, value > 0
+
+    Returns
+    -------
+    exponent : int
+        The rounded value is round(value*10**(-exponent))*10**exponent
+    """
+
+    first_digit = floor(log10(absolute(value)))
+    first_three_digits = nround(value*10**(-first_digit+2))
+
+    if 100 <= first_three_digits <= 354:
+        rounding_digits = 1
+    elif 355 <= first_three_digits <= 949:
+        rounding_digits = 0
+    else:
+        rounding_digits = 1
 
-    if len(self.random_values) > 1:
-        cdf_generating_random_values = (extract((self.random_values >= self.limits[0])*
-                                                (self.random_values <= self.limits[1]),
-                                                self.random_values))
+    return int(first_digit) - rounding_digits
 
-        random_value_fraction = (float(len(cdf_generating_random_values))/
-                                 float(len(self.random_values)))
+def resample_random_values(self, start, stop):
+    """Resample random values from the empirical distribution of the stored random values
 
-        try:
-            if len(cdf_generating_random_values) < 2:
-                raise ValueError("Trying to re-sample random numbers. \
-    Within the current limits, no CDF can be reconstructed from self.random_values, since \
-    less than two of them are inside the new limits.")
+    The CDF of the stored random values inside the limits is inverted and applied to \
+uniformly distributed random numbers from the prefix-stable resampling stream of the seed \
+(see mc_statistics.sample_prefix()).
 
-        except ValueError:
-            raise
+    If the limits are too strict, it may not be possible to obtain a meaningful CDF from \
+the remaining values. Therefore, this function will issue a warning if less than 1% of \
+the stored values remains, or if the number of remaining values falls below 1000. \
+If less than two values remain, an error will be thrown.
 
-        if len(cdf_generating_random_values) < 1000:
-            warnings.warn("Trying to re-sample random numbers. \
+    Parameters
+    ----------
+    start : non-negative int
+        Index of the first value in the resampling stream
+    stop : positive int
+        Index after the last value in the resampling stream
+
+    Returns
+    -------
+    random_values : ndarray
+        stop - start resampled random values
+    """
+
+    sorted_values = get_sorted_random_values(self)
+    cdf_generating_random_values = sorted_values[
+        searchsorted(sorted_values, self.limits[0], side="left"):
+        searchsorted(sorted_values, self.limits[1], side="right")]
+
+    random_value_fraction = (float(len(cdf_generating_random_values))/
+                             float(len(self.random_values)))
+
+    try:
+        if len(cdf_generating_random_values) < 2:
+            raise ValueError("Trying to re-sample random numbers. \
+Within the current limits, no CDF can be reconstructed from self.random_values, since \
+less than two of them are inside the new limits.")
+
+    except ValueError:
+        raise
+
+    if len(cdf_generating_random_values) < 1000:
+        warnings.warn("Trying to re-sample random numbers. \
 Within the current limits, less than 1000 values will be available to construct a CDF. \
 This may lead to unintended behavior. Check whether the limits make sense or try increasing \
 n_random.", RuntimeWarning)
-        if random_value_fraction < 0.01:
-            warnings.warn("Trying to re-sample random numbers. \
+    if random_value_fraction < 0.01:
+        warnings.warn("Trying to re-sample random numbers. \
 Within the current limits, less than 1 percent of the previous values will be available to \
 construct a CDF. This may lead to unintended behavior. Check whether the limits make sense or \
 try increasing n_random.", RuntimeWarning)
 
-        cdf_discrete = cdf(cdf_generating_random_values)
-        inverse_cdf = interp1d(cdf_discrete[1], cdf_discrete[0])
-        self.random_values = inverse_cdf(uniform(0., 1., size=self.n_random))
+    inverse_cdf = interp1d(linspace(0., 1., len(cdf_generating_random_values)),
+                           cdf_generating_random_values)
+
+    return sample_prefix(lambda block: inverse_cdf(
+        generator(self.seed, stream=STREAM_RESAMPLING, block=block).uniform(
+            0., 1., size=PREFIX_BLOCK_SIZE)), start=start, stop=stop)
+
+def resolve_pending_evaluation(self):
+    """Carry out the pending evaluation of Unc, if there is one
+
+    Reading or setting mean_value, sigma_low, sigma_up, is_exact or rounded calls this \
+function first, so that the pending evaluation never overwrites newer values.
+    """
+
+    if self.pending_evaluation is None:
+        return
+
+    evaluation = self.pending_evaluation
+    self.pending_evaluation = None
+    # The evaluation may sort the pending random values in place
+    self.pending_random_values = None
+    set_evaluation(self, evaluation())
+
+def round_digits(self):
+    """Implementation of Unc.round_digits()"""
+    arr = array([self.mean_value, self.sigma_low, self.sigma_up])
+
+    # Safety measure: if the absolute mean value is much smaller than the uncertainty,
+    # simply set it to zero
+    if arr.all() > 0. and absolute(arr[0])/nminimum(arr[1], arr[2]) < 10**-1:
+        arr[0] = 0.
+
+    # If both the mean value and both uncertainties are zero, treat it as  a special case.
+    # In all other cases, the smallest nonzero value of [mean_value, sigma_low, sigma_up]
+    # determines the digits of the rounded values.
+    arr_sort = sort(arr)
+    nonzero = extract(arr_sort > 0., arr_sort)
+    if len(nonzero) == 0 or self.sigma_low == self.sigma_up == 0.:
+        # Exact values are not rounded. They may replace the values of a pending evaluation
+        # (see resolve_pending_evaluation()).
+        self.rounded = [self.mean_value, 0., 0.]
 
     else:
-        self.random_values = randn_asym(self.mean_value, [self.sigma_low, self.sigma_up],
-                                        limits=self.limits, random_seed=self.seed,
-                                        n_random=self.n_random)
-    eval_result = evaluate(self.random_values, force_inside_shortest_coverage=True)
-    self.set_mean_value(eval_result[0][0])
-    self.set_sigma_low(eval_result[0][1])
-    self.set_sigma_up(eval_result[0][2])
+        # Make a decision on the number of displayed digits based on a recommendation
+        # by the PDG
+        exponent = pdg_rounding_exponent(nonzero[0])
+
+        self.rounded = nround(arr*10.**(-exponent))/10.**(-exponent)
+
+def sample_random_numbers(self):
+    """Implementation of Unc.sample_random_numbers()"""
+
+    if len(self.random_values) > 1 and known_distribution(self.sampled_distribution) is None:
+        self.random_values = resample_random_values(self, 0, self.n_random)
+        self.sampled_distribution = None
+    elif len(self.random_values) > 1:
+        # Sample the known distribution inside the new limits instead of resampling the
+        # empirical distribution of the stored values
+        self.sampled_distribution = [self.sampled_distribution[0], self.sampled_distribution[1],
+                                     list(self.limits)]
+        self.random_values = randn_asym_prefix(self.sampled_distribution[0],
+                                               self.sampled_distribution[1],
+                                               limits=self.limits, random_seed=self.seed,
+                                               stop=self.n_random)
+    else:
+        self.sampled_distribution = [self.mean_value, [self.sigma_low, self.sigma_up],
+                                     list(self.limits)]
+        self.random_values = randn_asym_prefix(self.mean_value,
+                                               [self.sigma_low, self.sigma_up],
+                                               limits=self.limits, random_seed=self.seed,
+                                               stop=self.n_random)
+    self.sorted_random_values = None
+    evaluate_random_values(self)
+
+def set_evaluation(self, evaluation):
+    """Set mean_value, sigma_low and sigma_up of Unc
+
+    Parameters
+    ----------
+    evaluation : [float, float, float]
+        Most probable value, lower and upper uncertainty, for example from \
+evaluation.evaluate()
+    """
+
+    set_mean_value(self, evaluation[0])
+    set_sigma_low(self, evaluation[1])
+    set_sigma_up(self, evaluation[2])
 
 def set_limits(self, limits):
     """Implementation of Unc.set_limits()"""
@@ -176,21 +387,22 @@ def set_n_random(self, n_random):
         self.n_random = n_random
         # If storage of sampled values is desired, update the number
         # of stored random numbers, either by truncating the existing
-        # set, or by sampling anew.
+        # set, or by appending new values (see extend_random_values()).
         if self.store:
-            if len(self.random_values) >= n_random:
+            if len(self.random_values) > n_random:
+                # The values of Unc do not change with the number of stored random values
+                resolve_pending_evaluation(self)
                 self.random_values = self.random_values[0:n_random]
-            else:
-                # This condition is there to ignore calls of set_n_random by the constructor
-                # of Unc. If the constructor is called with store=True and the default value
-                # of random_values, which is a length-1 numpy array, then the resizing of the
-                # array is intentional, and no warning is needed.
+                self.sorted_random_values = None
+            elif len(self.random_values) < n_random:
+                # This condition is there to distinguish calls of set_n_random by the
+                # constructor of Unc. If the constructor is called with store=True and the
+                # default value of random_values, which is a length-1 numpy array, then the
+                # values are sampled for the first time.
                 if len(self.random_values) > 1:
-                    warnings.warn("Requested n_random (%i) is larger than stored number of \
-random values (%i). Sampling new set of random values assuming \
-an asymmetric normal distribution." %
-                                  (n_random, len(self.random_values)), UserWarning)
-                self.sample_random_numbers()
+                    extend_random_values(self)
+                else:
+                    self.sample_random_numbers()
 
     except ValueError:
         print("ValueError")
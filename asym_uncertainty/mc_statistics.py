@@ -15,129 +15,1218 @@
 #    You should have received a copy of the GNU General Public License
 #    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
 
-from numpy import (absolute, argmax, argmin, array, diff, histogram, inf, insert, linspace,
-                   ndarray, roll, shape, size, sort, zeros)
-from numpy.random import normal, seed, uniform
-from scipy.stats import norm
+from numpy import (absolute, add, arange, argmax, argmin, argsort, array, asarray, bincount,
+                   ceil, clip, column_stack, concatenate, count_nonzero, cov, cumsum, diff, divide,
+                   einsum, empty, expm1, flatnonzero, float32, float64, greater, histogram, inf,
+                   int64, less, linspace, log1p, logical_not, maximum, minimum, multiply, ndarray,
+                   nonzero, ones, pi, searchsorted, shape, size, sort, sqrt, subtract, where, zeros)
+from numpy import exp as nexp
+from numpy.fft import irfft, rfft, rfftfreq
+from numpy.linalg import LinAlgError, cholesky, lstsq
+from scipy.fft import next_fast_len
+from scipy.optimize import brentq, minimize_scalar
+from scipy.signal import fftconvolve
+from scipy.special import ndtr, ndtri
+from scipy.stats import binom, gaussian_kde
 
-SC_TOLERANCE = 0.01 # Needed for the estimation of the uncertainty of the shortest coverage interval
-SC_UNCERTAINTY_DEFAULT = 0.05 # Relative uncertainty of the shortest
-# coverage interval if it cannot be determined by the derivative method
+from .auxiliary import asym_normal_branches, asym_normal_mass, asym_normal_ppf
+from .draw_cache import DRAW_CACHE
+from .options import get_option
+from .quasi_random import QMC_POINTS
+from .random_streams import STREAM_BOOTSTRAP, STREAM_BRANCH, STREAM_COPULA, generator
 
-def cdf(rand):
+SC_CONFIDENCE = 0.6827 # Confidence level of the uncertainties of the endpoints of the shortest
+# coverage interval
+BOOTSTRAP_REPLICATES = 100 # Default number of replicates of bootstrap_coverage_uncertainties()
+BOOTSTRAP_MAX_CANDIDATES = 2**14 # Maximum number of candidates for the shortest coverage
+# interval in each replicate of bootstrap_coverage_uncertainties()
+SAMPLING_BLOCK_SIZE = 2**14 # Number of values which the samplers transform at once
+COPULA_MAX_Z = 8. # Absolute value at which the correlated standard normal numbers of
+# randn_asym_correlated() are clipped, since their CDF rounds to 1 above about 8.3
+TAIL_REJECTION_LIMIT = 2. # Distance of a truncated distribution from its mode, in units of
+# sigma, above which randn_normal_tail() is used
+PREFIX_BLOCK_SIZE = 2**14 # Number of random values per block of the prefix-stable streams of
+# sample_prefix()
+SAMPLE_DTYPES = {"float64": float64, "float32": float32} # Floating-point types of the
+# random values for each value of the option 'dtype'
+KDE_BINS_PER_BANDWIDTH = 32 # Number of grid points per bandwidth of binned_kde_mode()
+KDE_KERNEL_CUTOFF = 8. # Distance in units of the bandwidth beyond which the Gaussian kernel of
+# grid_kde_mode() is neglected
+KDE_MAX_GRID_SIZE = 2**20 # Maximum number of grid points of binned_kde_mode()
+KDE_REFINEMENT_POINTS = 64 # Number of intervals of the local grid of grid_kde_mode() between the
+# neighbours of the maximum on the coarse grid
+MODE_SUBSAMPLE_SIZE = 2**11 # Default maximum number of values which subsample_kde_mode() uses
+MODE_SEARCH_POINTS = 64 # Number of points on which subsample_kde_mode() searches the maximum
+COVERAGE_BIN_MARGIN = 3 # Number of bin widths by which the width of a candidate for the
+# shortest coverage interval may exceed the shortest width in the histograms of
+# candidate_ranges(). The histograms overestimate the width by at most two bins, the third one
+# absorbs rounding errors.
+EL_BRACKET_MARGIN = 1e-10 # Relative distance of the search interval of the empirical-likelihood
+# multiplier from the poles of the weights
+
+def sample_dtype():
+    """Get the floating-point type of random values, which is given by the option 'dtype'
+
+    Returns
+    -------
+    dtype : numpy.float64 or numpy.float32
+    """
+
+    return SAMPLE_DTYPES[get_option("dtype")]
+
+def as_sample_array(rand):
+    """Convert random values to the floating-point type given by the option 'dtype'
+
+    Parameters
+    ----------
+    rand : array_like
+        Random values
+
+    Returns
+    -------
+    rand : ndarray
+        The random values, which are only copied if their type differs
+    """
+
+    return asarray(rand, dtype=sample_dtype())
+
+def cdf(rand, weights=None):
     """Calculates the cumulative distribution function (CDF) for \
     unordered samples x_i from a distribution.
     The more random values, the better the approximation of the real continuous CDF will be.
+    If weights are given, for example by randn_asym() with importance_scale, the CDF of \
+    the weighted samples is calculated with weighted_cdf().
+
+    Parameters
+    ----------
+    rand : array_like
+        Array of random numbers
+    weights : ndarray, optional
+        Array of non-negative weights of the random numbers (default: None, i.e. equal weights)
+
+    Returns
+    -------
+    cdf : ndarray
+        cdf[0] are the values CDF(x_i)
+        cdf[1] are the sorted values x_i
+        cdf[x_0] == 0. and cdf[x_N] == 1., where N is the number of random samples
+
+    """
+    if weights is not None:
+        return weighted_cdf(asarray(rand), asarray(weights))
+
+    # Sorting the flattened array makes only one copy
+    return [sort(rand, axis=None), linspace(0., 1., size(rand))]
+
+def merge_sorted(sorted_values, new_values):
+    """Insert unordered values into an array of sorted values
+
+    If only a few values are added, the new values are sorted and merged with the sorted \
+values in linear time. numpy's stable sort (timsort) detects the two ordered runs and merges \
+them. Otherwise, everything is sorted at once, which is faster in this case.
+
+    Parameters
+    ----------
+    sorted_values : ndarray
+        Values sorted in ascending order
+    new_values : ndarray
+        Unordered values
+
+    Returns
+    -------
+    sorted_values : ndarray
+        All values, sorted in ascending order
+    """
+
+    if len(new_values) < len(sorted_values):
+        return sort(concatenate((sorted_values, sort(new_values))), kind="stable")
+
+    return sort(concatenate((sorted_values, new_values)))
+
+def linear_binning(data, grid_start, grid_spacing, n_grid, weights=None):
+    """Distribute data on the points of an equidistant grid
+
+    Each value is split between its two neighbouring grid points, in proportion to its \
+distance from the other one. This conserves the total weight and the mean value of the data.
+
+    Parameters
+    ----------
+    data : ndarray
+        Values in the interval [grid_start, grid_start + (n_grid - 1)*grid_spacing]
+    grid_start : float
+        First grid point
+    grid_spacing : float
+        Distance of the grid points
+    n_grid : int
+        Number of grid points, n_grid > 1
+    weights : ndarray, optional
+        Weights of the values (default: None, i.e. all weights are 1)
+
+    Returns
+    -------
+    grid_weights : ndarray
+        Total weight at each grid point
+    """
+
+    # The position on the grid is overwritten by the fraction of each value which belongs to
+    # the upper grid point, in order to avoid temporary arrays.
+    fraction = subtract(data, grid_start, dtype=float64)
+    fraction /= grid_spacing
+    index = clip(fraction.astype(int64), 0, n_grid - 2)
+    fraction -= index
+    if weights is not None:
+        fraction *= weights
+    total = bincount(index, weights=weights, minlength=n_grid)
+    upper = bincount(index, weights=fraction, minlength=n_grid)
+
+    grid_weights = total - upper
+    grid_weights[1:] += upper[:-1]
+
+    return grid_weights
+
+def grid_kde_mode(grid_weights, grid_start, grid_spacing, bandwidth):
+    """Find the maximum of a Gaussian kernel density estimate (KDE) of weights on an \
+equidistant grid
+
+    The KDE on the grid is the convolution of the weights with the Gaussian kernel, which is \
+calculated with a fast Fourier transform (FFT). The kernel is neglected beyond \
+KDE_KERNEL_CUTOFF bandwidths. Around the maximum on the grid, the KDE is evaluated on a \
+local grid of KDE_REFINEMENT_POINTS intervals between the two neighbouring grid points, and \
+the maximum is interpolated with a parabola through the three highest points of the local grid.
+
+    For M grid points, the cost is O(M log M).
+
+    Parameters
+    ----------
+    grid_weights : ndarray
+        Weights at the grid points, for example from linear_binning()
+    grid_start : float
+        First grid point
+    grid_spacing : float
+        Distance of the grid points
+    bandwidth : float
+        Standard deviation of the Gaussian kernel, bandwidth > 0
+
+    Returns
+    -------
+    mode : float
+        Position of the maximum of the KDE
+    """
+
+    n_grid = len(grid_weights)
+    half_width = min(n_grid - 1, int(ceil(KDE_KERNEL_CUTOFF*bandwidth/grid_spacing)))
+    kernel = nexp(-0.5*(arange(-half_width, half_width + 1)*grid_spacing/bandwidth)**2)
+    peak = argmax(fftconvolve(grid_weights, kernel, mode="same"))
+
+    nearby = slice(max(peak - half_width, 0), min(peak + half_width + 1, n_grid))
+    grid_points = grid_start + arange(n_grid)[nearby]*grid_spacing
+    local_grid = grid_start + (peak + linspace(-1., 1., KDE_REFINEMENT_POINTS + 1))*grid_spacing
+    density = (grid_weights[nearby]*
+               nexp(-0.5*((local_grid[:, None] - grid_points)/bandwidth)**2)).sum(axis=1)
+
+    local_peak = argmax(density)
+    mode = local_grid[local_peak]
+    if 0 < local_peak < KDE_REFINEMENT_POINTS:
+        curvature = density[local_peak - 1] - 2.*density[local_peak] + density[local_peak + 1]
+        if curvature < 0.:
+            mode += (0.5*(local_grid[1] - local_grid[0])*
+                     (density[local_peak - 1] - density[local_peak + 1])/curvature)
+
+    return mode
+
+def binned_kde_mode(data, limits, weights=None):
+    """Find the most probable value of data inside some limits from a binned Gaussian \
+kernel density estimate (KDE)
+
+    The bandwidth is given by Scott's rule, like the default of scipy.stats.gaussian_kde, \
+i.e. the (weighted) standard deviation of the data times n_eff**(-1/5), where n_eff is the \
+effective sample size. The data are distributed on a grid with KDE_BINS_PER_BANDWIDTH points \
+per bandwidth (see linear_binning()), and the maximum of the KDE is found with \
+grid_kde_mode(). For N values and M grid points, the cost is O(N + M log M).
+
+    Parameters
+    ----------
+    data : ndarray
+        Values inside the limits
+    limits : [float, float]
+        Lower and upper limit of the most probable value
+    weights : ndarray, optional
+        Non-negative weights of the values (default: None, i.e. all weights are 1)
+
+    Returns
+    -------
+    mode : float
+        Most probable value
+    """
+
+    n_eff = len(data) if weights is None else effective_sample_size(weights)
+    bandwidth = sqrt(cov(data, aweights=weights))*n_eff**(-0.2)
+    if not bandwidth > 0.:
+        return float(data[0])
+
+    n_grid = min(int(ceil((limits[1] - limits[0])*KDE_BINS_PER_BANDWIDTH/bandwidth)) + 1,
+                 KDE_MAX_GRID_SIZE)
+    grid_spacing = (limits[1] - limits[0])/(n_grid - 1)
+    grid_weights = linear_binning(data, limits[0], grid_spacing, n_grid, weights=weights)
+
+    return min(max(grid_kde_mode(grid_weights, limits[0], grid_spacing, bandwidth), limits[0]),
+               limits[1])
+
+def batch_inside_values(sorted_values, first, last):
+    """Get the values between the indices first and last of each row of an array
+
+    Parameters
+    ----------
+    sorted_values : ndarray
+        (m, n) array
+    first : ndarray
+        Index of the first value for each row
+    last : ndarray
+        Index after the last value for each row
+
+    Returns
+    -------
+    [window, inside, first, last] : [ndarray, ndarray, ndarray, ndarray]
+        View of the columns between the smallest index first and the largest index last, \
+a mask which is True for the values between first and last in each row of the view, and the \
+indices first and last in the view
+    """
+
+    start = int(first.min())
+    window = sorted_values[:, start:int(last.max())]
+    columns = arange(window.shape[1])
+    inside = (columns >= (first - start)[:, None]) & (columns < (last - start)[:, None])
+
+    return [window, inside, first - start, last - start]
+
+def batch_binned_kde_mode(sorted_values, first, last):
+    """Find the most probable values of several samples inside some limits from binned \
+Gaussian kernel density estimates (KDE), see binned_kde_mode()
+
+    Each row of sorted_values is a sample, whose values between the indices first and last \
+are used. The bandwidths are given by Scott's rule for each row. All rows are binned on grids \
+with the same number of points, which is large enough for KDE_BINS_PER_BANDWIDTH points per \
+bandwidth in all rows. The convolution of all rows with their kernels is a single fast \
+Fourier transform (FFT) of the grids, multiplied by the Fourier transform of the Gaussian \
+kernels. The maximum of each KDE is interpolated with a parabola through the three highest \
+points of its grid.
+
+    Parameters
+    ----------
+    sorted_values : ndarray
+        (m, n) array whose rows are sorted in ascending order
+    first : ndarray
+        Index of the first value inside the limits for each row
+    last : ndarray
+        Index after the last value inside the limits for each row
+
+    Returns
+    -------
+    modes : ndarray
+        Most probable value of each row
+    """
+
+    window, inside, first, last = batch_inside_values(sorted_values, first, last)
+    n_rows = len(sorted_values)
+    rows = arange(n_rows)
+    n_inside = last - first
+    lower = window[rows, first].astype(float64)
+    widths = window[rows, last - 1] - lower
+
+    # Values relative to the lower limit, which avoids cancellation in the variance. The
+    # values outside of the limits do not contribute.
+    centered = subtract(window, lower[:, None], dtype=float64)
+    centered *= inside
+    mean = centered.sum(axis=1)/n_inside
+    variance = (einsum("ij,ij->i", centered, centered) - n_inside*mean**2)/(n_inside - 1)
+    bandwidths = sqrt(clip(variance, 0., None))*n_inside**(-0.2)
+
+    modes = lower.copy()
+    valid = (bandwidths > 0.) & (widths > 0.)
+    if not valid.any():
+        return modes
+    n_grid = min(int(ceil((widths[valid]/bandwidths[valid]).max()*KDE_BINS_PER_BANDWIDTH)) + 1,
+                 KDE_MAX_GRID_SIZE)
+    spacings = where(valid, widths, 1.)/(n_grid - 1)
+
+    # Linear binning of all rows at once (see linear_binning()). The values outside of the
+    # limits are assigned to an additional grid point.
+    centered /= spacings[:, None]
+    index = centered.astype(int64)
+    clip(index, 0, n_grid - 2, out=index)
+    centered -= index
+    index += (rows*n_grid)[:, None]
+    index[~inside] = n_rows*n_grid
+    index = index.ravel()
+    total = bincount(index, minlength=n_rows*n_grid + 1)[:-1]
+    upper = bincount(index, weights=centered.ravel(), minlength=n_rows*n_grid + 1)[:-1]
+    grid_weights = (total - upper).reshape(n_rows, n_grid)
+    grid_weights[:, 1:] += upper.reshape(n_rows, n_grid)[:, :-1]
+
+    # The padding prevents that the periodic convolution wraps around within the kernel cutoff
+    kernel_widths = where(valid, bandwidths, 0.)/spacings
+    n_fft = next_fast_len(n_grid + int(ceil(KDE_KERNEL_CUTOFF*kernel_widths.max())))
+    frequencies = 2.*pi*rfftfreq(n_fft)
+    density = irfft(rfft(grid_weights, n_fft, axis=1)*
+                    nexp(-0.5*(kernel_widths[:, None]*frequencies)**2), n_fft, axis=1)[:, :n_grid]
+
+    peaks = clip(argmax(density, axis=1), 1, n_grid - 2)
+    left, center, right = (density[rows, peaks - 1], density[rows, peaks],
+                           density[rows, peaks + 1])
+    curvature = left - 2.*center + right
+    shift = clip(divide(0.5*(left - right), curvature, out=zeros(n_rows), where=curvature < 0.),
+                 -1., 1.)
+    modes[valid] += ((peaks + shift)*spacings)[valid]
+
+    return minimum(maximum(modes, lower), lower + widths)
+
+def half_sample_mode(data, weights=None):
+    """Find the most probable value of data with the half-sample mode (HSM) estimator
+
+    The HSM [Bickel and Fruehwirth, Comput. Stat. Data Anal. 50 (2006) 3500] repeatedly \
+replaces the data by the shortest interval which contains half of them, until at most three \
+values remain. With weights, the intervals contain half of the total weight. After sorting, \
+the cost is O(N), since the number of values is halved in each step.
+
+    Parameters
+    ----------
+    data : ndarray
+        Values, preferably sorted in ascending order, which makes sorting unnecessary
+    weights : ndarray, optional
+        Non-negative weights of the values (default: None, i.e. all weights are 1)
+
+    Returns
+    -------
+    mode : float
+        Most probable value
+    """
+
+    if not (data[1:] >= data[:-1]).all():
+        order = argsort(data, kind="stable")
+        data = data[order]
+        weights = None if weights is None else weights[order]
+
+    while len(data) > 3:
+        n_data = len(data)
+        if weights is None:
+            n_half = (n_data + 1)//2
+            widths = data[n_half - 1:] - data[:n_data - n_half + 1]
+            first = argmin(widths)
+            last = first + n_half - 1
+        else:
+            cumulative_weights = cumsum(weights)
+            # The interval [i, j] contains the values i to j, whose weight is
+            # cumulative_weights[j] - cumulative_weights[i] + weights[i]
+            start_weights = cumulative_weights - weights
+            ends = searchsorted(cumulative_weights, start_weights + 0.5*cumulative_weights[-1])
+            starts = nonzero(ends < n_data)[0]
+            first = starts[argmin(data[ends[starts]] - data[starts])]
+            last = ends[first]
+            if last - first + 1 == n_data:
+                break
+        data = data[first:last + 1]
+        weights = None if weights is None else weights[first:last + 1]
+
+    if len(data) == 3:
+        if data[1] - data[0] < data[2] - data[1]:
+            data, weights = data[:2], None if weights is None else weights[:2]
+        elif data[1] - data[0] > data[2] - data[1]:
+            data, weights = data[1:], None if weights is None else weights[1:]
+    if weights is None or not weights.sum() > 0.:
+        return float(data.mean())
+
+    return float((data*weights).sum()/weights.sum())
+
+def histogram_mode(data, weights=None):
+    """Find the most probable value of data from the center of the highest bin of their \
+histogram
+
+    The number of bins is the square root of the number of values, like numpy's bins="sqrt". \
+The cost is O(N).
+
+    Parameters
+    ----------
+    data : ndarray
+        Values
+    weights : ndarray, optional
+        Weights of the values (default: None, i.e. all weights are 1)
+
+    Returns
+    -------
+    mode : float
+        Most probable value
+    """
+
+    # numpy does not support bins="sqrt" for weights
+    hist, bins = histogram(data, bins=int(ceil(sqrt(len(data)))), weights=weights)
+
+    return float(bins[argmax(hist)] + 0.5*(bins[1] - bins[0]))
+
+def batch_histogram_mode(sorted_values, first, last):
+    """Find the most probable values of several samples inside some limits from the center \
+of the highest bin of their histograms, see histogram_mode()
+
+    Parameters
+    ----------
+    sorted_values : ndarray
+        (m, n) array whose rows are sorted in ascending order
+    first : ndarray
+        Index of the first value inside the limits for each row
+    last : ndarray
+        Index after the last value inside the limits for each row
+
+    Returns
+    -------
+    modes : ndarray
+        Most probable value of each row
+    """
+
+    window, inside, first, last = batch_inside_values(sorted_values, first, last)
+    n_rows = len(sorted_values)
+    rows = arange(n_rows)
+    n_inside = last - first
+    lower = window[rows, first].astype(float64)
+    widths = window[rows, last - 1] - lower
+    n_bins = ceil(sqrt(n_inside)).astype(int64)
+    max_bins = int(n_bins.max())
+
+    # Like numpy.histogram(), the last bin includes the upper limit. The values outside of
+    # the limits are counted in an additional bin.
+    bin_widths = where(widths > 0., widths, 1.)/n_bins
+    index = subtract(window, lower[:, None], dtype=float64)
+    index /= bin_widths[:, None]
+    index = index.astype(int64)
+    minimum(index, (n_bins - 1)[:, None], out=index)
+    index += (rows*max_bins)[:, None]
+    index[~inside] = n_rows*max_bins
+    counts = bincount(index.ravel(), minlength=n_rows*max_bins + 1)[:-1]
+
+    return where(widths > 0.,
+                 lower + (argmax(counts.reshape(n_rows, max_bins), axis=1) + 0.5)*bin_widths, lower)
+
+def subsample_kde_mode(data, limits, weights=None, n_subsample=MODE_SUBSAMPLE_SIZE):
+    """Find the most probable value of data inside some limits from an exact Gaussian \
+kernel density estimate (KDE) of a subsample of the data
+
+    The subsample consists of every k-th value, such that at most n_subsample values are \
+used. The KDE of the subsample (scipy.stats.gaussian_kde with Scott's rule) is evaluated on \
+MODE_SEARCH_POINTS equidistant points, and the maximum is refined between the neighbours of \
+the highest point. The cost does not depend on the number of values, but the result \
+fluctuates more than for binned_kde_mode(), since the bandwidth is larger and fewer values \
+are used.
+
+    Parameters
+    ----------
+    data : ndarray
+        Values inside the limits
+    limits : [float, float]
+        Lower and upper limit of the most probable value
+    weights : ndarray, optional
+        Non-negative weights of the values (default: None, i.e. all weights are 1)
+    n_subsample : int, optional
+        Maximum number of values in the subsample, n_subsample > 1 \
+(default: MODE_SUBSAMPLE_SIZE)
+
+    Returns
+    -------
+    mode : float
+        Most probable value
+    """
+
+    step = int(ceil(len(data)/n_subsample))
+    subsample = data[::step]
+    if not subsample.max() > subsample.min():
+        return float(subsample[0])
+
+    kde = gaussian_kde(subsample, weights=None if weights is None else weights[::step])
+    search_points = linspace(limits[0], limits[1], MODE_SEARCH_POINTS)
+    peak = argmax(kde(search_points))
+    search_interval = (search_points[max(peak - 1, 0)],
+                       search_points[min(peak + 1, MODE_SEARCH_POINTS - 1)])
+    refined = minimize_scalar(lambda x: -kde(x)[0], bounds=search_interval, method="bounded")
+
+    return float(refined.x) if refined.success else float(search_points[peak])
+
+def shortest_coverage_indices(sorted_values, coverage_percent=68.27, out=None):
+    """Find the indices of the endpoints of the shortest coverage interval of sorted values
+
+    The widths of all intervals which contain the same number of values are the difference \
+of two views of the sorted values, so only a single array of widths is allocated.
+
+    Parameters
+    ----------
+    sorted_values : ndarray
+        Values sorted in ascending order
+    coverage_percent : float
+        Coverage interval with a value in the interval (0,100) in percent
+    out : ndarray, optional
+        Array with at least as many elements as sorted_values, which is used for the widths \
+instead of a new one (default: None)
+
+    Returns
+    -------
+    [first, last] : [int, int]
+        The shortest coverage interval is [sorted_values[first], sorted_values[last]]
+    """
+
+    n_rand = len(sorted_values)
+    coverage_interval = int(coverage_percent*0.01*n_rand)
+
+    widths = subtract(sorted_values[coverage_interval:], sorted_values[:n_rand - coverage_interval],
+                      out=None if out is None else out[:n_rand - coverage_interval])
+    first = int(argmin(absolute(widths, out=widths)))
+
+    return [first, first + coverage_interval]
+
+def check_coverage_probabilities(coverage_probabilities):
+    """Check whether all coverage probabilities are in the interval (0, 1)"""
+
+    try:
+        if not all(0. < probability < 1. for probability in coverage_probabilities):
+            raise ValueError("Coverage probabilities must be in the interval (0, 1).")
+    except ValueError:
+        print("ValueError")
+        raise
+
+def coverage_intervals(sorted_values, coverage_probabilities):
+    """Find the shortest coverage intervals of sorted values for several coverage probabilities
+
+    All intervals are determined from the same sorted values, and the same array is used \
+for the widths of the candidate intervals (see shortest_coverage_indices()).
+
+    Parameters
+    ----------
+    sorted_values : ndarray
+        Values sorted in ascending order
+    coverage_probabilities : array_like
+        Coverage probabilities in the interval (0, 1), for example [0.6827, 0.9545, 0.9973]
+
+    Returns
+    -------
+    intervals : ndarray
+        intervals[i] are the lower and upper limit [x0, x1] of the shortest coverage \
+interval for coverage_probabilities[i]
+    """
+
+    check_coverage_probabilities(coverage_probabilities)
+
+    widths = empty(len(sorted_values), dtype=sorted_values.dtype)
+    intervals = empty((len(coverage_probabilities), 2))
+    for i, probability in enumerate(coverage_probabilities):
+        indices = shortest_coverage_indices(sorted_values, coverage_percent=100.*probability,
+                                            out=widths)
+        intervals[i] = sorted_values[indices]
+
+    return intervals
+
+def shortest_coverage(cum_dis_fun, coverage_percent=68.27, uncertainty_estimate=False,
+                      weighted=False):
+    """Calculates the shortest interval |x1 - x0| that covers coverage_percent of \
+            a probability distribution function PDF, \
+            i.e. min(|x1 - x0|) : |CDF(x1) - CDF(x0)| == coverage_percent
+
+    Parameters
+    ----------
+    cum_dis_fun : array_like
+        Cumulative distribution function CDF of the PDF as returned by cdf()
+    coverage_percent : float
+        Coverage interval with a value in the interval (0,100) in percent
+    uncertainty_estimate : bool, optional
+        Estimate the uncertainty dx1 and dx0 of x1 and x0 that is caused \
+        by the discrete sampling of the CDF, i.e. take into account the finite bin width.
+    weighted : bool, optional
+        If True, cum_dis_fun is the CDF of weighted samples as returned by cdf() with weights, \
+        and weighted_shortest_coverage_indices() is used (default: False)
+
+    Returns
+    -------
+    shortest_coverage : ndarray
+        [x0, x1], where x0 < x1 or
+        [x0, x1, dx0, dx1] if uncertainty_estimate == True
+
+    """
+    if weighted:
+        lower, upper = weighted_shortest_coverage_indices(cum_dis_fun,
+                                                          coverage_percent=coverage_percent)
+        if uncertainty_estimate:
+            return concatenate((cum_dis_fun[0][[lower, upper]],
+                                weighted_coverage_endpoint_uncertainties(cum_dis_fun, lower,
+                                                                         upper)))
+
+        return array([cum_dis_fun[0][lower], cum_dis_fun[0][upper]])
+
+    n_rand = shape(cum_dis_fun)[1]
+
+    coverage_interval = int(coverage_percent*0.01*n_rand)
+
+    s_cov = shortest_coverage_indices(cum_dis_fun[0], coverage_percent=coverage_percent)[0]
+
+    if uncertainty_estimate:
+        # Estimate the uncertainties of x0 and x1 from the order statistics, which do not
+        # depend on the distribution of the values (see coverage_endpoint_uncertainties())
+        endpoints = cum_dis_fun[0][[s_cov, s_cov + coverage_interval]]
+        uncertainties = coverage_endpoint_uncertainties(cum_dis_fun[0], s_cov,
+                                                        s_cov + coverage_interval)
+        if endpoints[0] > endpoints[1]:
+            return concatenate((endpoints[::-1], uncertainties[::-1]))
+
+        return concatenate((endpoints, uncertainties))
+
+    return array([cum_dis_fun[0][s_cov], cum_dis_fun[0][s_cov + coverage_interval]])
+
+def order_statistic_bounds(n_rand, indices, confidence=SC_CONFIDENCE):
+    """Find the order statistics which bracket the quantiles that are estimated by others
+
+    The order statistic with the index k of n_rand values estimates the quantile q of the \
+probability p = (k + 0.5)/n_rand. The number of values below q follows a binomial \
+distribution B(n_rand, p), independent of the distribution of the values. Therefore, q lies \
+between the order statistics with the indices of the (1 - confidence)/2 and \
+(1 + confidence)/2 quantiles of this binomial distribution with a probability of at least \
+confidence.
+
+    Parameters
+    ----------
+    n_rand : int
+        Number of values
+    indices : array_like
+        Indices of the order statistics, i.e. of the values sorted in ascending order
+    confidence : float, optional
+        Confidence level in the interval (0, 1) (default: SC_CONFIDENCE)
+
+    Returns
+    -------
+    (lower, upper) : (ndarray, ndarray)
+        Indices of the order statistics which bracket the quantiles
+    """
+
+    probabilities = (asarray(indices) + 0.5)/n_rand
+    lower = binom.ppf(0.5*(1. - confidence), n_rand, probabilities) - 1.
+    upper = binom.ppf(0.5*(1. + confidence), n_rand, probabilities)
+
+    return (clip(lower, 0, n_rand - 1).astype(int64), clip(upper, 0, n_rand - 1).astype(int64))
+
+def coverage_endpoint_uncertainties(sorted_values, first, last, confidence=SC_CONFIDENCE):
+    """Estimate the uncertainties of the endpoints of the shortest coverage interval of \
+sorted values
+
+    Each endpoint is an order statistic, whose distance to the order statistics that bracket \
+its quantile with the given confidence (see order_statistic_bounds()) gives its uncertainty. \
+If the distribution is flat, the position of the shortest coverage interval is ambiguous in \
+addition. Therefore, the uncertainties are at least the distances to the endpoints of all \
+other intervals which contain as many values and whose width exceeds the shortest one by less \
+than the uncertainty of the width, i.e. the uncertainties of both endpoints added in \
+quadrature. The result is a conservative bound, which is cheap compared to \
+bootstrap_coverage_uncertainties().
+
+    Parameters
+    ----------
+    sorted_values : ndarray
+        Values sorted in ascending or descending order
+    first, last : int
+        The shortest coverage interval is [sorted_values[first], sorted_values[last]], for \
+example from shortest_coverage_indices()
+    confidence : float, optional
+        Confidence level in the interval (0, 1) (default: SC_CONFIDENCE)
+
+    Returns
+    -------
+    uncertainties : ndarray
+        Uncertainties [dx0, dx1] of the endpoints
+    """
+
+    n_rand = len(sorted_values)
+    n_coverage = last - first
+    lower, upper = order_statistic_bounds(n_rand, [first, last], confidence=confidence)
+    endpoints = sorted_values[[first, last]]
+    uncertainties = maximum(absolute(sorted_values[upper] - endpoints),
+                            absolute(endpoints - sorted_values[lower]))
+
+    widths = absolute(sorted_values[n_coverage:] - sorted_values[:n_rand - n_coverage])
+    candidates = flatnonzero(widths <= absolute(endpoints[1] - endpoints[0]) +
+                             sqrt(uncertainties[0]**2 + uncertainties[1]**2))
+    # The values are sorted, so the outermost candidates are the most distant ones
+    ambiguities = [maximum.reduce(absolute(sorted_values[candidates[[0, -1]] + shift] -
+                                           endpoint))
+                   for shift, endpoint in zip((0, n_coverage), endpoints)]
+
+    return maximum(uncertainties, ambiguities).astype(float)
+
+def bootstrap_coverage_uncertainties(sorted_values, first, last, n_bootstrap=BOOTSTRAP_REPLICATES,
+                                     random_seed=None):
+    """Estimate the uncertainties of the endpoints of the shortest coverage interval of sorted \
+values with the bootstrap method
+
+    A bootstrap replicate of n values is a sample of n values from their empirical \
+distribution. Its order statistics are the values sorted_values[floor(n*u)], where u are the \
+order statistics of n uniformly distributed random numbers. Only the order statistics of the \
+intervals around the shortest coverage interval, at most BOOTSTRAP_MAX_CANDIDATES of them, are \
+needed to find the shortest coverage interval of a replicate. They are sampled directly from \
+the spacings of the uniform order statistics, which are independent, exponentially \
+distributed random numbers, instead of sampling and sorting n values per replicate. All \
+replicates are processed at once.
+
+    Parameters
+    ----------
+    sorted_values : ndarray
+        Values sorted in ascending order
+    first, last : int
+        The shortest coverage interval is [sorted_values[first], sorted_values[last]], for \
+example from shortest_coverage_indices()
+    n_bootstrap : int, optional
+        Number of bootstrap replicates (default: BOOTSTRAP_REPLICATES)
+    random_seed : non-negative int or None, optional
+        Random number seed (default: None)
+
+    Returns
+    -------
+    uncertainties : ndarray
+        Standard deviations [dx0, dx1] of the endpoints of the replicates
+    """
+
+    n_rand = len(sorted_values)
+    n_coverage = last - first
+    n_candidates = min(BOOTSTRAP_MAX_CANDIDATES, n_rand - n_coverage)
+    start = min(max(first - n_candidates//2, 0), n_rand - n_coverage - n_candidates)
+
+    # The order statistic with the index k is the sum of the first k + 1 of n + 1 spacings,
+    # divided by the sum of all spacings. Spacings between the needed order statistics are
+    # summed up as a single gamma-distributed random number.
+    candidates = arange(start, start + n_candidates)
+    positions = concatenate(([0], sort(concatenate((candidates, candidates + n_coverage))) + 1,
+                             [n_rand + 1]))
+    positions = positions[concatenate(([True], diff(positions) > 0))]
+    rng = generator(random_seed, stream=STREAM_BOOTSTRAP)
+    spacing_sums = cumsum(rng.gamma(diff(positions), size=(n_bootstrap, len(positions) - 1)),
+                          axis=1)
+    uniform = spacing_sums[:, :-1]/spacing_sums[:, -1:]
+    replicates = sorted_values[minimum((n_rand*uniform).astype(int64), n_rand - 1)]
+
+    lower = replicates[:, searchsorted(positions, candidates + 1) - 1]
+    upper = replicates[:, searchsorted(positions, candidates + n_coverage + 1) - 1]
+    shortest = argmin(upper - lower, axis=1)
+    replicate_rows = arange(n_bootstrap)
+    endpoints = column_stack((lower[replicate_rows, shortest], upper[replicate_rows, shortest]))
+
+    return endpoints.std(axis=0, ddof=1).astype(float)
+
+def weighted_cdf(rand, weights):
+    """Calculates the cumulative distribution function (CDF) for \
+    unordered samples x_i with weights w_i
+
+    Parameters
+    ----------
+    rand : ndarray
+        Array of random numbers
+    weights : ndarray
+        Array of non-negative weights of the random numbers
+
+    Returns
+    -------
+    cdf : ndarray
+        Like cdf(), cdf[0] are the sorted values x_i and cdf[1] are the values CDF(x_i), \
+which increase in proportion to the weights from 0 at x_0 to 1 at x_N
+    """
+
+    order = argsort(rand, kind="stable")
+    probabilities = cumsum(weights[order])
+    subtract(probabilities, probabilities[0], out=probabilities)
+    multiply(probabilities, 1./probabilities[-1], out=probabilities)
+
+    return [rand[order], probabilities]
+
+def weighted_shortest_coverage_indices(cum_dis_fun, coverage_percent=68.27):
+    """Find the indices of the endpoints of the shortest coverage interval of weighted samples
+
+    In contrast to shortest_coverage_indices(), the CDF may increase by different amounts \
+from one sample to the next.
+
+    Parameters
+    ----------
+    cum_dis_fun : array_like
+        Cumulative distribution function CDF of the PDF as returned by weighted_cdf()
+    coverage_percent : float
+        Coverage interval with a value in the interval (0,100) in percent
+
+    Returns
+    -------
+    [lower, upper] : [int, int]
+        The shortest coverage interval is [cum_dis_fun[0][lower], cum_dis_fun[0][upper]]
+    """
+
+    upper = searchsorted(cum_dis_fun[1], cum_dis_fun[1] + coverage_percent*0.01)
+    lower = nonzero(upper < len(cum_dis_fun[1]))[0]
+    upper = upper[lower]
+
+    s_cov = argmin(cum_dis_fun[0][upper] - cum_dis_fun[0][lower])
+
+    return [int(lower[s_cov]), int(upper[s_cov])]
+
+def weighted_shortest_coverage(cum_dis_fun, coverage_percent=68.27):
+    """Calculates the shortest interval |x1 - x0| that covers coverage_percent of \
+    a probability distribution function PDF, given by weighted samples
+
+    In contrast to shortest_coverage(), the CDF may increase by different amounts from one \
+sample to the next.
+
+    Parameters
+    ----------
+    cum_dis_fun : array_like
+        Cumulative distribution function CDF of the PDF as returned by weighted_cdf()
+    coverage_percent : float
+        Coverage interval with a value in the interval (0,100) in percent
+
+    Returns
+    -------
+    shortest_coverage : ndarray
+        [x0, x1], where x0 < x1
+    """
+
+    return cum_dis_fun[0][weighted_shortest_coverage_indices(cum_dis_fun,
+                                                              coverage_percent=coverage_percent)]
+
+def weighted_coverage_endpoint_uncertainties(cum_dis_fun, lower, upper,
+                                             confidence=SC_CONFIDENCE):
+    """Estimate the uncertainties of the endpoints of the shortest coverage interval of \
+weighted samples
+
+    Like coverage_endpoint_uncertainties(), but the number of samples below the quantile of \
+each endpoint is approximated by a normal distribution with the variance p*(1 - p)/n of a \
+binomial distribution, where n is the effective sample size of the weights (see \
+effective_sample_size()) and p the value of the CDF at the endpoint. The uncertainties are \
+the distances to the samples where the CDF differs from p by the half width of the \
+confidence interval of this distribution.
+
+    Parameters
+    ----------
+    cum_dis_fun : array_like
+        Cumulative distribution function CDF of the PDF as returned by weighted_cdf()
+    lower, upper : int
+        The shortest coverage interval is [cum_dis_fun[0][lower], cum_dis_fun[0][upper]], for \
+example from weighted_shortest_coverage_indices()
+    confidence : float, optional
+        Confidence level in the interval (0, 1) (default: SC_CONFIDENCE)
+
+    Returns
+    -------
+    uncertainties : ndarray
+        Uncertainties [dx0, dx1] of the endpoints
+    """
+
+    # The increments of the CDF are the normalized weights, except for the first one
+    n_effective = effective_sample_size(diff(cum_dis_fun[1]))
+    probabilities = cum_dis_fun[1][[lower, upper]]
+    half_widths = ndtri(0.5*(1. + confidence))*sqrt(probabilities*(1. - probabilities)/
+                                                    n_effective)
+    n_rand = len(cum_dis_fun[1])
+    below = clip(searchsorted(cum_dis_fun[1], probabilities - half_widths), 0, n_rand - 1)
+    above = clip(searchsorted(cum_dis_fun[1], probabilities + half_widths), 0, n_rand - 1)
+    endpoints = cum_dis_fun[0][[lower, upper]]
+
+    return maximum(absolute(cum_dis_fun[0][above] - endpoints),
+                   absolute(endpoints - cum_dis_fun[0][below])).astype(float)
+
+def weighted_coverage_intervals(cum_dis_fun, coverage_probabilities):
+    """Find the shortest coverage intervals of weighted samples for several coverage \
+probabilities, see weighted_shortest_coverage()
+
+    Parameters
+    ----------
+    cum_dis_fun : array_like
+        Cumulative distribution function CDF of the PDF as returned by weighted_cdf()
+    coverage_probabilities : array_like
+        Coverage probabilities in the interval (0, 1)
+
+    Returns
+    -------
+    intervals : ndarray
+        intervals[i] are the lower and upper limit [x0, x1] of the shortest coverage \
+interval for coverage_probabilities[i]
+    """
+
+    check_coverage_probabilities(coverage_probabilities)
+
+    return array([weighted_shortest_coverage(cum_dis_fun, coverage_percent=100.*probability)
+                  for probability in coverage_probabilities], dtype=float)
+
+def bin_indices(rand, value_range, n_bins):
+    """Get the indices of the bins of a histogram with equal bin widths for random values
+
+    The index is a non-decreasing function of the value.
+
+    Parameters
+    ----------
+    rand : ndarray
+        Random values inside value_range
+    value_range : [float, float]
+        Lower and upper limit of the histogram
+    n_bins : positive int
+        Number of bins
+
+    Returns
+    -------
+    indices : ndarray
+        Bin indices in the interval [0, n_bins - 1]
+    """
+
+    indices = subtract(rand, value_range[0])
+    multiply(indices, n_bins/(value_range[1] - value_range[0]), out=indices)
+    indices = indices.astype(int64)
+    return clip(indices, 0, n_bins - 1, out=indices)
+
+def histogram_pass(chunks, value_ranges, n_bins):
+    """Fill histograms of the random values inside some intervals
+
+    Parameters
+    ----------
+    chunks : iterable of ndarray
+        Random values in one or more arrays, for example \
+streaming.sample_chunks()
+    value_ranges : list of [float, float]
+        Lower and upper limit of each histogram. Both limits belong to the histogram.
+    n_bins : positive int
+        Number of bins of each histogram
+
+    Returns
+    -------
+    histograms : list of [int, ndarray]
+        For each histogram, the number of values below its lower limit, i.e. the rank of its \
+first value among all values, and the number of values in each bin
+    """
+
+    histograms = [[0, zeros(n_bins, dtype=int64)] for _ in value_ranges]
+    for rand_result in chunks:
+        for value_range, histogram in zip(value_ranges, histograms):
+            below = rand_result < value_range[0]
+            histogram[0] += int(count_nonzero(below))
+            inside = rand_result[~below & (rand_result <= value_range[1])]
+            histogram[1] += bincount(bin_indices(inside, value_range, n_bins),
+                                     minlength=n_bins)
+
+    return histograms
+
+def candidate_ranges(histograms, value_ranges, n_coverage, n_total,
+                     bin_margin=COVERAGE_BIN_MARGIN):
+    """Narrow down the intervals which contain the endpoints of the shortest coverage interval
+
+    The first histogram contains the lower endpoint of the shortest coverage interval, and \
+the second one the upper endpoint. For each bin j of the first histogram, the \
+histograms give an upper limit for the width of the shortest interval which starts at the \
+first value in j and contains n_coverage more values. The true shortest interval starts in \
+one of the bins whose upper limit exceeds the smallest one by at most the sum of the bin \
+widths of both histograms.
+
+    Parameters
+    ----------
+    histograms : [[int, ndarray], [int, ndarray]]
+        Histograms of the lower and upper endpoint as returned by histogram_pass(). \
+Both may be the same histogram.
+    value_ranges : [[float, float], [float, float]]
+        Lower and upper limit of the histograms
+    n_coverage : non-negative int
+        Difference of the ranks of the endpoints of the interval, see \
+mc_statistics.shortest_coverage()
+    n_total : positive int
+        Total number of random values
+    bin_margin : float, optional
+        Tolerance for the width of the candidates in units of the larger bin width \
+(default: COVERAGE_BIN_MARGIN)
+
+    Returns
+    -------
+    [value_ranges, n_inside] : [[[float, float], [float, float]], int]
+        Lower and upper limit of the candidates for the lower and upper endpoint, padded by \
+one bin on each side, and the number of values inside these intervals
+    """
+
+    n_bins = len(histograms[0][1])
+    bin_widths = [(value_range[1] - value_range[0])/n_bins for value_range in value_ranges]
+    rank_cum = [histogram[0] + cumsum(histogram[1]) for histogram in histograms]
+    rank_start = rank_cum[0] - histograms[0][1]
+
+    lower_bins = nonzero((histograms[0][1] > 0)*
+                         (rank_start + n_coverage >= histograms[1][0])*
+                         (rank_start + n_coverage < rank_cum[1][-1]))[0]
+    upper_bins = searchsorted(rank_cum[1], rank_start[lower_bins] + n_coverage, side="right")
+    widths = ((value_ranges[1][0] + (upper_bins + 1)*bin_widths[1]) -
+              (value_ranges[0][0] + lower_bins*bin_widths[0]))
+
+    candidates = lower_bins[widths <= widths.min() + bin_margin*max(bin_widths)]
+    bins = [[candidates.min(), candidates.max()],
+            searchsorted(rank_cum[1],
+                         [rank_start[candidates.min()] + n_coverage,
+                          min(rank_cum[0][candidates.max()] - 1 + n_coverage, n_total - 1)],
+                         side="right")]
+
+    ranges = []
+    n_inside = 0
+    for value_range, bin_width, histogram, (first, last) in zip(value_ranges, bin_widths,
+                                                                histograms, bins):
+        ranges.append([max(value_range[0] + (first - 1)*bin_width, value_range[0]),
+                       min(value_range[0] + (last + 2)*bin_width, value_range[1])])
+        n_inside += int(histogram[1][max(first - 1, 0):last + 2].sum())
+
+    return [ranges, n_inside]
+
+def candidate_shortest_coverage(chunks, value_ranges, n_coverage):
+    """Find the exact shortest coverage interval among the candidates for its endpoints
+
+    Only the values inside the candidates are collected and sorted, so that their number, \
+and not the total number of values, determines the cost of the sort.
+
+    Parameters
+    ----------
+    chunks : iterable of ndarray
+        Random values in one or more arrays, for example streaming.sample_chunks()
+    value_ranges : [[float, float], [float, float]]
+        Lower and upper limit of the candidates for the lower and upper endpoint, as \
+returned by candidate_ranges()
+    n_coverage : non-negative int
+        Difference of the ranks of the endpoints of the interval, see shortest_coverage()
+
+    Returns
+    -------
+    shortest_coverage : [float, float]
+        [x0, x1], the same interval that shortest_coverage() finds for all values
+    """
+
+    rank_offsets = [0, 0]
+    values = [[], []]
+    for rand_result in chunks:
+        for i, value_range in enumerate(value_ranges):
+            rank_offsets[i] += int((rand_result < value_range[0]).sum())
+            values[i].append(rand_result[(rand_result >= value_range[0])*
+                                         (rand_result <= value_range[1])])
+    lower_values, upper_values = [sort(concatenate(value_list)) for value_list in values]
+
+    # Indices of the lower endpoints whose upper endpoint was collected as well
+    upper_offset = rank_offsets[0] + n_coverage - rank_offsets[1]
+    lower_indices = arange(len(lower_values))
+    lower_indices = lower_indices[(lower_indices + upper_offset >= 0)*
+                                  (lower_indices + upper_offset < len(upper_values))]
+    s_cov_index = lower_indices[argmin(upper_values[lower_indices + upper_offset] -
+                                       lower_values[lower_indices])]
+
+    return [float(lower_values[s_cov_index]), float(upper_values[s_cov_index + upper_offset])]
+
+def binned_mode(counts, value_range, s_cov):
+    """Find the most probable value from a fine histogram
+
+    Like the estimator 'binned_kde' of evaluation.evaluate(), the mode is the maximum of a \
+Gaussian kernel density estimate (KDE) of the values inside the shortest coverage interval, \
+with the bandwidth of Scott's rule. The counts of the bins are the weights of the grid of the \
+binned KDE at the bin centers (see grid_kde_mode()).
+
+    Parameters
+    ----------
+    counts : ndarray
+        Number of values in each bin of a histogram with equal bin widths
+    value_range : [float, float]
+        Lower and upper limit of the histogram
+    s_cov : [float, float]
+        Shortest coverage interval
+
+    Returns
+    -------
+    mode : float
+        Most probable value inside s_cov
+    """
+
+    n_bins = len(counts)
+    bin_width = (value_range[1] - value_range[0])/n_bins
+    first, last = bin_indices(array(s_cov), value_range, n_bins)
+    centers = value_range[0] + (arange(first, last + 1) + 0.5)*bin_width
+
+    counts_inside = counts[first:last + 1].astype(float)
+    n_inside = counts_inside.sum()
+    mean = (counts_inside*centers).sum()/n_inside
+    std = sqrt((counts_inside*(centers - mean)**2).sum()/n_inside)
+
+    bandwidth = std*n_inside**(-0.2)
+    if not bandwidth > 0.:
+        return float(centers[argmax(counts_inside)])
+
+    # The bin centers are the grid of the binned KDE, unless they are finer than the grid of
+    # binned_kde_mode(). Then they are distributed on that grid like the data.
+    grid_start = centers[0]
+    grid_spacing = bin_width
+    grid_weights = counts_inside
+    n_grid = int(ceil((centers[-1] - centers[0])*KDE_BINS_PER_BANDWIDTH/bandwidth)) + 1
+    if 1 < n_grid < len(centers):
+        grid_spacing = (centers[-1] - centers[0])/(n_grid - 1)
+        grid_weights = linear_binning(centers, grid_start, grid_spacing, n_grid,
+                                      weights=counts_inside)
+    most_probable = grid_kde_mode(grid_weights, grid_start, grid_spacing, bandwidth)
+
+    return min(max(most_probable, s_cov[0]), s_cov[1])
+
+def effective_sample_size(weights):
+    """Calculates Kish's effective sample size (sum(w))**2/sum(w**2) of weighted samples
 
     Parameters
     ----------
-    rand : array_like
-        Array of random numbers
+    weights : ndarray
+        Array of non-negative weights
 
     Returns
     -------
-    cdf : ndarray
-        cdf[0] are the values CDF(x_i)
-        cdf[1] are the sorted values x_i
-        cdf[x_0] == 0. and cdf[x_N] == 1., where N is the number of random samples
-
+    n_effective : float
+        Number of unweighted samples which would give the same variance of a mean value
     """
-    return [sort(rand.flatten()), linspace(0., 1., size(rand))]
 
-def shortest_coverage(cum_dis_fun, coverage_percent=68.27, uncertainty_estimate=False):
-    """Calculates the shortest interval |x1 - x0| that covers coverage_percent of \
-            a probability distribution function PDF, \
-            i.e. min(|x1 - x0|) : |CDF(x1) - CDF(x0)| == coverage_percent
+    return weights.sum()**2/(weights*weights).sum()
+
+def control_variate_weights(rand_result, controls):
+    """Calculates weights for the random values of a result, which use the inputs of a \
+calculation as control variates
+
+    The controls are the deviations of the random values of the inputs from their exact \
+mean values. A least-squares fit of the result as a linear function of the controls gives \
+the linearised model of the calculation. Its deviation from its exact mean value, which is \
+zero, is the control c_i of each random value. The weights are the empirical-likelihood \
+weights w_i = 1/(1 + l*c_i) (A. B. Owen, Empirical Likelihood, 2001), where l is chosen \
+such that the weighted mean of the controls is zero. In contrast to the usual linear \
+control variate estimator, the weights are always positive, so that they define a \
+CDF of the result. For smooth models, this reduces the statistical uncertainty of the \
+shortest coverage interval.
 
     Parameters
     ----------
-    cum_dis_fun : array_like
-        Cumulative distribution function CDF of the PDF as returned by cdf()
-    coverage_percent : float
-        Coverage interval with a value in the interval (0,100) in percent
-    uncertainty_estimate : bool, optional
-        Estimate the uncertainty dx1 and dx0 of x1 and x0 that is caused \
-        by the discrete sampling of the CDF, i.e. take into account the finite bin width.
+    rand_result : ndarray
+        Random values of the result
+    controls : list of ndarray
+        Deviations of the random values of the inputs from their exact mean values, each \
+with the same length as rand_result
 
     Returns
     -------
-    shortest_coverage : ndarray
-        [x0, x1], where x0 < x1 or
-        [x0, x1, dx0, dx1] if uncertainty_estimate == True
-
+    weights : ndarray or None
+        Weights normalized to a sum of len(rand_result), or None if no weights can be found
     """
-    n_rand = shape(cum_dis_fun)[1]
 
-    coverage_interval = int(coverage_percent*0.01*n_rand)
+    design = column_stack([ones(len(rand_result))] + list(controls))
+    coefficients = lstsq(design, rand_result, rcond=None)[0]
+    control = design[:, 1:] @ coefficients[1:]
 
-    dist = absolute(cum_dis_fun[0] - roll(cum_dis_fun[0], coverage_interval))
+    scale = control.std()
+    if not scale > 0.:
+        return None
+    multiply(control, 1./scale, out=control)
 
-    s_cov = argmin(dist[coverage_interval:])
+    # The weights are positive if -1/max(c) < l < -1/min(c)
+    lower, upper = -1./control.max(), -1./control.min()
+    if not lower < 0. < upper:
+        return None
 
-    if uncertainty_estimate:
-        # Estimate the uncertainty of the shortest coverage interval based
-        # on the first derivative of the CDF
-        # The first derivative d(coverage_interval)/d(x) indicates how much small
-        # variations of the shortest coverage interval influence
-        # the covered area of the probability distribution.
-        # Define the uncertainty limits as the maximum variation in coverage_percent
-        # that is acceptable when x is varied
-        # The maximum relative variation of coverage_percent is given by SC_TOLERANCE
-
-        # Calculate the lower and upper derivative if possible
-        if s_cov == 0:
-            derivative = (absolute((dist[s_cov] - dist[s_cov + 1])/
-                                   (cum_dis_fun[0][s_cov + 1] - cum_dis_fun[0][s_cov])))
-        elif s_cov == n_rand - coverage_interval - 1:
-            derivative = (absolute((dist[s_cov] - dist[s_cov - 1])/
-                                   (cum_dis_fun[0][s_cov] - cum_dis_fun[0][s_cov - 1])))
-        else:
-            derivative_low = (absolute(dist[s_cov] - dist[s_cov - 1])/
-                              (cum_dis_fun[0][s_cov] - cum_dis_fun[0][s_cov - 1]))
-
-            derivative_up = (absolute(dist[s_cov + 1] - dist[s_cov])/
-                             (cum_dis_fun[0][s_cov + 1] - cum_dis_fun[0][s_cov]))
-
-            derivative = absolute(0.5*(derivative_low + derivative_up))
-
-        if derivative == 0.:
-            # Simply return an uncertainty of SC_UNCERTAINTY_DEFAULT*(sc[1] - sc[0])
-            if cum_dis_fun[0][s_cov] > cum_dis_fun[0][s_cov + coverage_interval]:
-                return array([cum_dis_fun[0][s_cov + coverage_interval],
-                              cum_dis_fun[0][s_cov],
-                              0.10*absolute(cum_dis_fun[0][s_cov + coverage_interval] -
-                                            cum_dis_fun[0][s_cov]),
-                              0.10*absolute(cum_dis_fun[0][s_cov + coverage_interval] -
-                                            cum_dis_fun[0][s_cov])
-                             ])
-
-            return array([cum_dis_fun[0][s_cov],
-                          cum_dis_fun[0][s_cov + coverage_interval],
-                          0.10*absolute(cum_dis_fun[0][s_cov + coverage_interval] -
-                                        cum_dis_fun[0][s_cov]),
-                          0.10*absolute(cum_dis_fun[0][s_cov + coverage_interval] -
-                                        cum_dis_fun[0][s_cov])
-                         ])
-
-        if cum_dis_fun[0][s_cov] > cum_dis_fun[0][s_cov + coverage_interval]:
-            return array([cum_dis_fun[0][s_cov + coverage_interval],
-                          cum_dis_fun[0][s_cov],
-                          SC_TOLERANCE/derivative, SC_TOLERANCE/derivative])
-
-        return array([cum_dis_fun[0][s_cov],
-                      cum_dis_fun[0][s_cov + coverage_interval],
-                      SC_TOLERANCE/derivative, SC_TOLERANCE/derivative])
-
-# Old calculation of uncertainty which is simply based on the distance of the sampled points
-# This estimate can be misleading, because for a very flat CDF,
-# increasing the number of points would make the result seem more and more precise,
-# although, actually, the position of the shortest coverage interval is very ambiguous
-#        return array([cum_dis_fun[0][s_cov], cum_dis_fun[0][s_cov + coverage_interval],
-#                      cum_dis_fun[0][s_cov + 1] -
-#                      cum_dis_fun[0][s_cov], cum_dis_fun[0][s_cov + coverage_interval] -
-#                      cum_dis_fun[0][s_cov + coverage_interval - 1]])
+    def mean_control(multiplier):
+        return (control/(1. + multiplier*control)).sum()
 
-    return array([cum_dis_fun[0][s_cov], cum_dis_fun[0][s_cov + coverage_interval]])
+    multiplier = brentq(mean_control, lower*(1. - EL_BRACKET_MARGIN),
+                        upper*(1. - EL_BRACKET_MARGIN))
+
+    weights = 1. + multiplier*control
+    divide(len(rand_result)/(1./weights).sum(), weights, out=weights)
+
+    return weights
 
 def chi2(data, uncertainties, fit, degrees_of_freedom=1):
     """Calculates the (reduced) chi square of theoretical values 'fit' \
@@ -162,8 +1251,437 @@ def chi2(data, uncertainties, fit, degrees_of_freedom=1):
     """
     return (1./degrees_of_freedom)*ndarray.sum((data - fit)**2/uncertainties**2)
 
+def antithetic_split(n_random):
+    """Split a number of random values into independent and antithetic ones
+
+    If the option 'antithetic' is set, only the first half of the values is drawn \
+independently, and each value i + n_random//2 of the second half is the antithetic partner \
+of the value i. Since all quantities use the same positions for the partners, the \
+antithetic pairs are kept in calculations.
+
+    Parameters
+    ----------
+    n_random : positive int
+        Total number of random values
+
+    Returns
+    -------
+    [n_independent, n_mirrored] : [int, int]
+        Number of independent and antithetic values
+    """
+
+    if not get_option("antithetic"):
+        return [n_random, 0]
+
+    return [n_random - n_random//2, n_random//2]
+
+def stratified_uniform(rng, n_random):
+    """Create stratified uniform random numbers
+
+    Each of the n_random intervals [k/n_random, (k + 1)/n_random) contains exactly one \
+number at a uniformly distributed position. The order of the intervals is random.
+
+    Parameters
+    ----------
+    rng : numpy.random.Generator
+        Source of the random numbers
+    n_random : positive int
+        Number of random values
+
+    Returns
+    -------
+    uniform : ndarray
+        Array of random numbers in [0, 1)
+    """
+
+    uniform = rng.permutation(n_random).astype(float)
+    add(uniform, rng.random(n_random), out=uniform)
+    multiply(uniform, 1./n_random, out=uniform)
+
+    return uniform
+
+def randn_standard_draws(probability_low=0.5, random_seed=None, n_random=int(1e6), block=None,
+                         out=None):
+    """Create the standardized draws from which randn_asym_untruncated() constructs its values
+
+    The draws are the absolute values |z| of standard normal random numbers z, and a boolean \
+array which indicates whether a value belongs to the lower side of the mode. If both sides \
+have the same weight (probability_low == 0.5), the side is given by the sign of z. \
+Otherwise, it is chosen by a single-precision uniform number from an independent stream of \
+the same seed.
+
+    If the option 'stratified' is set, the side is always chosen by a stratified uniform \
+number (see stratified_uniform()), i.e. the number of values on the lower side is \
+probability_low*n_random up to rounding. If the option 'antithetic' is set, the second half \
+of the draws mirrors the first one, i.e. the value i + n_random//2 has the same |z| as the \
+value i, but is on the other side of the mode for probability_low == 0.5 (or uses the \
+antithetic uniform number 1 - u otherwise).
+
+    Parameters
+    ----------
+    probability_low : float, optional
+        Probability that a value is sampled left of the mode (default: 0.5)
+    random_seed : positive int
+        Seed of the random number stream, see random_streams.generator()
+    n_random : positive int
+        Determines how many random numbers should be generated
+        (default: 1e6)
+    block : non-negative int or None, optional
+        Index of an independent block of the stream of random_seed, \
+see random_streams.seed_sequence()
+    out : ndarray, optional
+        Contiguous array of length n_random and of the type sample_dtype(), into which |z| \
+is written
+
+    Returns
+    -------
+    [abs_z, low] : [ndarray, ndarray]
+        Absolute values of the standard normal numbers and boolean mask of the lower side
+    """
+
+    stratified = get_option("stratified")
+    n_independent, n_mirrored = antithetic_split(n_random)
+
+    abs_z = empty(n_random, dtype=sample_dtype()) if out is None else out
+    rng = generator(random_seed, block=block)
+    if abs_z.dtype == float64:
+        rng.standard_normal(size=n_independent, out=abs_z[:n_independent])
+    else:
+        # Single-precision values are rounded from the double-precision stream in blocks, so
+        # that a seed gives the same sample for both types up to rounding.
+        for start in range(0, n_independent, SAMPLING_BLOCK_SIZE):
+            stop = min(start + SAMPLING_BLOCK_SIZE, n_independent)
+            abs_z[start:stop] = rng.standard_normal(size=stop - start)
+
+    low = empty(n_random, dtype=bool)
+    if probability_low == 0.5 and not stratified:
+        less(abs_z[:n_independent], 0., out=low[:n_independent])
+        logical_not(low[:n_mirrored], out=low[n_independent:])
+    else:
+        branch_generator = generator(random_seed, stream=STREAM_BRANCH, block=block)
+        if stratified:
+            branch_uniform = stratified_uniform(branch_generator, n_independent)
+        for start in range(0, n_independent, SAMPLING_BLOCK_SIZE):
+            stop = min(start + SAMPLING_BLOCK_SIZE, n_independent)
+            if stratified:
+                uniform_block = branch_uniform[start:stop]
+            else:
+                uniform_block = branch_generator.random(size=stop - start, dtype=float32)
+            less(uniform_block, probability_low, out=low[start:stop])
+            # The antithetic value 1 - u is on the lower side if u > 1 - probability_low
+            if start < n_mirrored:
+                stop_mirrored = min(stop, n_mirrored)
+                greater(uniform_block[:stop_mirrored - start], 1. - probability_low,
+                        out=low[n_independent + start:n_independent + stop_mirrored])
+
+    absolute(abs_z[:n_independent], out=abs_z[:n_independent])
+    abs_z[n_independent:] = abs_z[:n_mirrored]
+
+    return [abs_z, low]
+
+def randn_asym_untruncated(mean_value, sigma, probability_low=0.5, random_seed=None,
+                           n_random=int(1e6), block=None, out=None):
+    """Create an array of random numbers from an asymmetric normal distribution without limits.
+
+    The sampler is fused, i.e. it uses a single standard normal number z per value, \
+which is scaled by sigma[0] or sigma[1] according to its side (see randn_standard_draws()): \
+
+    randn = mean_value + |z|*(sigma[1] if up else -sigma[0])
+
+    The scaling is done in blocks of SAMPLING_BLOCK_SIZE values, so that the only temporary \
+arrays are small block buffers. \
+If the option 'draw_cache_size' is larger than zero, the standardized draws of a given seed \
+are kept in the cache draw_cache.DRAW_CACHE, so that an operand which appears several times \
+in a calculation is sampled only once.
+
+    Parameters
+    ----------
+    mean_value : float
+        Mode of the distribution
+    sigma : [float, float]
+        Left- and right-hand standard deviation
+    probability_low : float, optional
+        Probability that a value is sampled left of mean_value (default: 0.5)
+    random_seed : positive int
+        Seed of the random number stream, see random_streams.generator()
+    n_random : positive int
+        Determines how many random numbers should be generated
+        (default: 1e6)
+    block : non-negative int or None, optional
+        Index of an independent block of the stream of random_seed, \
+see random_streams.seed_sequence()
+    out : ndarray, optional
+        Contiguous array of length n_random and of the type sample_dtype(), into which the \
+result is written
+
+    Returns
+    -------
+    randn : ndarray
+        Array of random numbers (identical to out, if out was given)
+    """
+
+    if random_seed is None or get_option("draw_cache_size") == 0:
+        abs_z, low = randn_standard_draws(probability_low=probability_low,
+                                          random_seed=random_seed, n_random=n_random,
+                                          block=block, out=out)
+        rand = abs_z
+    else:
+        key = (random_seed, block, n_random, probability_low, get_option("antithetic"),
+               get_option("stratified"), get_option("dtype"), get_option("bit_generator"),
+               get_option("stream_entropy"))
+        draws = DRAW_CACHE.get(key)
+        if draws is None:
+            draws = randn_standard_draws(probability_low=probability_low,
+                                         random_seed=random_seed, n_random=n_random,
+                                         block=block)
+            DRAW_CACHE.put(key, draws)
+        abs_z, low = draws
+        rand = empty(n_random, dtype=abs_z.dtype) if out is None else out
+
+    block_size = min(n_random, SAMPLING_BLOCK_SIZE)
+    scale = empty(block_size, dtype=rand.dtype)
+
+    for start in range(0, n_random, block_size):
+        rand_block = rand[start:start + block_size]
+        scale_block = scale[:len(rand_block)]
+
+        multiply(low[start:start + block_size], -(sigma[0] + sigma[1]), out=scale_block)
+        add(scale_block, sigma[1], out=scale_block)
+        multiply(abs_z[start:start + block_size], scale_block, out=rand_block)
+        add(rand_block, mean_value, out=rand_block)
+
+    return rand
+
+def randn_normal_tail(rng, lower, upper, n_random, out=None):
+    """Create an array of random numbers from a standard normal distribution truncated to \
+[lower, upper], where lower > 0 is far in the tail of the distribution.
+
+    The values are sampled with the rejection algorithm of C. P. Robert, Statistics and \
+Computing 5 (1995) 121, which uses a translated exponential distribution with the rate \
+(lower + sqrt(lower**2 + 4))/2 as a proposal. The acceptance probability increases with lower, \
+from about 0.9 at lower == 2 to > 0.98 at lower == 10.
+
+    Parameters
+    ----------
+    rng : numpy.random.Generator
+        Source of the random numbers
+    lower : float
+        Lower limit in units of the standard deviation, lower > 0
+    upper : float
+        Upper limit in units of the standard deviation, upper > lower
+    n_random : positive int
+        Determines how many random numbers should be generated
+    out : ndarray, optional
+        Contiguous array of length n_random and of the type sample_dtype(), into which the \
+result is written
+
+    Returns
+    -------
+    randn : ndarray
+        Array of random numbers
+    """
+
+    rand = empty(n_random, dtype=sample_dtype()) if out is None else out
+    rate = 0.5*(lower + sqrt(lower*lower + 4.))
+    # Probability of the exponential proposal to be inside [lower, upper]
+    proposal_probability = -expm1(-rate*(upper - lower))
+
+    n_filled = 0
+    while n_filled < n_random:
+        n_proposed = min(SAMPLING_BLOCK_SIZE, int(1.1*(n_random - n_filled)) + 16)
+
+        proposal = lower - log1p(-proposal_probability*rng.random(n_proposed))/rate
+        accepted = proposal[rng.random(n_proposed) <= nexp(-0.5*(proposal - rate)**2)]
+        accepted = accepted[:n_random - n_filled]
+
+        rand[n_filled:n_filled + len(accepted)] = accepted
+        n_filled += len(accepted)
+
+    return rand
+
+def randn_asym_truncated(mean_value, sigma, limits, probability_low=0.5, random_seed=None,
+                         n_random=int(1e6), block=None, out=None):
+    """Create an array of random numbers from a truncated asymmetric normal distribution.
+
+    The values are obtained by inverting the CDF of the truncated distribution \
+(see auxiliary.asym_normal_ppf()), which needs only a single uniform random number per \
+value and is computed in log space. If the whole distribution is more than \
+TAIL_REJECTION_LIMIT standard deviations away from mean_value, the faster rejection \
+algorithm of randn_normal_tail() is used instead, unless the options 'antithetic' or \
+'stratified' are set. With these options, the uniform numbers are stratified \
+(see stratified_uniform()) or come in antithetic pairs u and 1 - u (see antithetic_split()).
+
+    Parameters
+    ----------
+    mean_value : float
+        Mode of the untruncated distribution
+    sigma : [float, float]
+        Left- and right-hand standard deviation
+    limits : [float, float]
+        Lower and upper limit of the distribution
+    probability_low : float, optional
+        Probability that a value is sampled left of mean_value without limits (default: 0.5)
+    random_seed : positive int
+        Seed of the random number stream, see random_streams.generator()
+    n_random : positive int
+        Determines how many random numbers should be generated
+        (default: 1e6)
+    block : non-negative int or None, optional
+        Index of an independent block of the stream of random_seed, \
+see random_streams.seed_sequence()
+    out : ndarray, optional
+        Contiguous array of length n_random and of the type sample_dtype(), into which the \
+result is written
+
+    Returns
+    -------
+    randn : ndarray
+        Array of random numbers (identical to out, if out was given)
+    """
+
+    rng = generator(random_seed, block=block)
+
+    weight_low, branch_low, branch_up = asym_normal_branches(mean_value, sigma, limits,
+                                                             probability_low=probability_low)
+
+    n_independent, n_mirrored = antithetic_split(n_random)
+    # Antithetic and stratified values need the inverse CDF
+    use_rejection = n_mirrored == 0 and not get_option("stratified")
+
+    if use_rejection and weight_low == 0. and branch_up[0] >= TAIL_REJECTION_LIMIT:
+        rand = randn_normal_tail(rng, branch_up[0], branch_up[1], n_random, out=out)
+        multiply(rand, sigma[1], out=rand)
+        add(rand, mean_value, out=rand)
+        return rand
+
+    if use_rejection and weight_low == 1. and branch_low[1] <= -TAIL_REJECTION_LIMIT:
+        rand = randn_normal_tail(rng, -branch_low[1], -branch_low[0], n_random, out=out)
+        multiply(rand, -sigma[0], out=rand)
+        add(rand, mean_value, out=rand)
+        return rand
+
+    rand = empty(n_random, dtype=sample_dtype()) if out is None else out
+    # The uniform numbers are always double precision, since single precision would cut off
+    # the tails of the distribution at about 5 sigma.
+    uniform = rand if rand.dtype == float64 else empty(n_random)
+    if get_option("stratified"):
+        uniform[:n_independent] = stratified_uniform(rng, n_independent)
+    else:
+        rng.random(size=n_independent, out=uniform[:n_independent])
+    subtract(1., uniform[:n_mirrored], out=uniform[n_independent:])
+
+    for start in range(0, n_random, SAMPLING_BLOCK_SIZE):
+        rand[start:start + SAMPLING_BLOCK_SIZE] = asym_normal_ppf(
+            uniform[start:start + SAMPLING_BLOCK_SIZE], mean_value, sigma, limits,
+            probability_low=probability_low)
+
+    return rand
+
+def randn_asym_qmc(mean_value, sigma, limits, probability_low=0.5, random_seed=None,
+                   n_random=int(1e6), sampling="sobol", block=None, out=None):
+    """Create an array of random numbers from a (truncated) asymmetric normal distribution \
+with randomized quasi-Monte Carlo points.
+
+    The points in (0, 1) are transformed by the inverse CDF auxiliary.asym_normal_ppf(). \
+Each seed has its own Sobol' dimension or Latin hypercube permutation \
+(see quasi_random.sobol_points() and quasi_random.latin_hypercube_points()), i.e. \
+different quantities are independent, while a quantity with a given seed always gets the \
+same values. The points of a seed are kept in the cache draw_cache.DRAW_CACHE.
+
+    Parameters
+    ----------
+    mean_value : float
+        Mode of the untruncated distribution
+    sigma : [float, float]
+        Left- and right-hand standard deviation
+    limits : [float, float]
+        Lower and upper limit of the distribution
+    probability_low : float, optional
+        Probability that a value is sampled left of mean_value without limits (default: 0.5)
+    random_seed : positive int
+        Seed of the random number stream and dimension of the quasi-random points
+    n_random : positive int
+        Determines how many random numbers should be generated
+        (default: 1e6)
+    sampling : str, optional
+        Type of the points, "sobol" or "lhs" (default: "sobol")
+    block : non-negative int or None, optional
+        Index of an independent randomization of the points of random_seed, \
+see random_streams.seed_sequence()
+    out : ndarray, optional
+        Contiguous array of length n_random and of the type sample_dtype(), into which the \
+result is written
+
+    Returns
+    -------
+    randn : ndarray
+        Array of random numbers (identical to out, if out was given)
+    """
+
+    if random_seed is None or get_option("draw_cache_size") == 0:
+        points = QMC_POINTS[sampling](random_seed=random_seed, n_random=n_random, block=block)
+    else:
+        key = (sampling, random_seed, block, n_random, get_option("bit_generator"),
+               get_option("stream_entropy"))
+        cached = DRAW_CACHE.get(key)
+        if cached is None:
+            cached = (QMC_POINTS[sampling](random_seed=random_seed, n_random=n_random,
+                                           block=block),)
+            DRAW_CACHE.put(key, cached)
+        points = cached[0]
+
+    rand = empty(n_random, dtype=sample_dtype()) if out is None else out
+
+    for start in range(0, n_random, SAMPLING_BLOCK_SIZE):
+        rand[start:start + SAMPLING_BLOCK_SIZE] = asym_normal_ppf(
+            points[start:start + SAMPLING_BLOCK_SIZE], mean_value, sigma, limits,
+            probability_low=probability_low)
+
+    return rand
+
+def importance_weights(rand, mean_value, sigma, limits, importance_scale, probability_low=0.5):
+    """Calculate the weights of values from a widened (truncated) asymmetric normal distribution
+
+    The values are assumed to be sampled from the distribution with the standard deviations \
+importance_scale*sigma. Both distributions have the same shape in units of the standard \
+deviation of each branch, so the ratio of their probability densities at the distance z of \
+a value from mean_value, in units of the standard deviation of the target distribution, is \
+importance_scale*exp(-z^2/2*(1 - 1/importance_scale^2)), up to the ratio of the \
+probabilities inside the limits. Therefore, the weights are bounded.
+
+    Parameters
+    ----------
+    rand : ndarray
+        Values from the widened distribution
+    mean_value : float
+        Mode of the untruncated distribution
+    sigma : [float, float]
+        Left- and right-hand standard deviation of the target distribution
+    limits : [float, float]
+        Lower and upper limit of both distributions
+    importance_scale : float > 1
+        Factor of the standard deviations of the widened distribution
+    probability_low : float, optional
+        Probability of the left branch without limits (default: 0.5)
+
+    Returns
+    -------
+    weights : ndarray
+        Ratio of the probability density of the target distribution and the widened \
+distribution at the values, whose expectation value is 1
+    """
+
+    z = (rand - mean_value)/where(rand < mean_value, sigma[0], sigma[1])
+    mass_ratio = (asym_normal_mass(mean_value, [importance_scale*sigma[0],
+                                                importance_scale*sigma[1]], limits,
+                                   probability_low=probability_low)/
+                  asym_normal_mass(mean_value, sigma, limits, probability_low=probability_low))
+
+    return importance_scale*mass_ratio*nexp(-0.5*(1. - 1./importance_scale**2)*z*z)
+
 def randn_asym(mean_value, sigma, limits=None, conserve_mean_value=False,
-               random_seed=None, n_random=int(1e6)):
+               random_seed=None, n_random=int(1e6), block=None, out=None,
+               importance_scale=None):
     """Create an array of random numbers from a generalized normal distribution \
     that may be asymmetric or truncated.
     Asymmetric here means that left of the maximum mean_value, \
@@ -173,8 +1691,18 @@ def randn_asym(mean_value, sigma, limits=None, conserve_mean_value=False,
     are weighted correctly, which can be controlled via the conserve_mean_value option.
     If conserve_mean_value is set to False, 50% of the values will be on the left \
     and 50% on the right of the maximum for large numbers.
-    Truncated means that the sampling does not give negative numbers.
+    Truncated means that the sampling does not give numbers outside the given limits.
     In this case, the mean value can not be mean_value any more, of course.
+    Truncated distributions are sampled with randn_asym_truncated(), which stays accurate \
+    if the limits are far out in a tail of the distribution.
+    If the option 'sampling' is "sobol" or "lhs", the values are obtained from \
+    quasi-random points with randn_asym_qmc() instead.
+    The floating-point type of the values is given by the option 'dtype' \
+    (see sample_dtype()).
+    If importance_scale is given, the values are sampled from the distribution with both \
+    standard deviations multiplied by importance_scale, which oversamples both tails, and \
+    returned together with the weights that make them represent the requested distribution \
+    (see importance_weights()). The weights can be passed to cdf() and evaluate().
 
     Parameters
     ----------
@@ -192,15 +1720,29 @@ def randn_asym(mean_value, sigma, limits=None, conserve_mean_value=False,
         Cannot be activated at the same time as force_positive.
         Do not use this option if randn is going to be used in further calculations.
     random_seed : positive int
-        Set the seed of numpy's random number generator
+        Seed of the random number stream, see random_streams.generator(). \
+The same seed always gives the same random numbers. If None, fresh entropy is used.
     n_random : positive int
         Determines how many random numbers should be generated
         (default: 1e6)
+    block : non-negative int or None, optional
+        Index of an independent block of the stream of random_seed, which gives a new set \
+of values for the same seed, see random_streams.seed_sequence() (default: None)
+    out : ndarray, optional
+        Contiguous array of length n_random and of the type sample_dtype(), into which the \
+result is written. \
+This avoids the allocation of a new array if randn_asym is called repeatedly.
+    importance_scale : float > 1, optional
+        Factor of the standard deviations of the importance-sampling distribution \
+(default: None, i.e. no importance sampling)
 
     Returns
     -------
     randn : ndarray
         Array of random numbers
+    weights : ndarray
+        Only returned if importance_scale is given. Weights of the random numbers, whose \
+expectation value is 1
     """
 
     try:
@@ -221,74 +1763,191 @@ def randn_asym(mean_value, sigma, limits=None, conserve_mean_value=False,
     check_num_array_argument(limits, 2, argument_name="Limits", is_increasing=True)
     check_num_array_argument(sigma, 2, argument_name="Sigma", is_positive=True)
 
-    try:
-        if random_seed is not None:
-            if isinstance(random_seed, int) and random_seed >= 0:
-                seed(random_seed)
-            else:
-                raise ValueError("Random number seed must be positive integer")
-    except ValueError:
-        print("ValueError")
-        raise
+    if importance_scale is not None:
+        try:
+            if importance_scale <= 1.:
+                raise ValueError("importance_scale must be > 1.")
+        except ValueError:
+            print("ValueError")
+            raise
 
-    rand = zeros(n_random)
-    plusminus = uniform(size=n_random)
+        rand = randn_asym(mean_value, [importance_scale*sigma[0], importance_scale*sigma[1]],
+                          limits=limits, conserve_mean_value=conserve_mean_value,
+                          random_seed=random_seed, n_random=n_random, block=block, out=out)
 
-    if limits[0] == -inf and limits[1] == inf:
-        plus = (plusminus >= lim)*1.
-        minus = (plusminus < lim)*1.
+        return rand, importance_weights(rand, mean_value, sigma, limits, importance_scale,
+                                        probability_low=lim)
 
-        rand += (mean_value + absolute(normal(size=n_random))*sigma[1])*plus
-        rand += (mean_value - absolute(normal(size=n_random))*sigma[0])*minus
+    sampling = get_option("sampling")
+    if sampling != "pseudo":
+        rand = randn_asym_qmc(mean_value, sigma, limits, probability_low=lim,
+                              random_seed=random_seed, n_random=n_random, sampling=sampling,
+                              block=block, out=out)
 
         if n_random == 1:
             return rand[0]
         else:
             return rand
 
-    if mean_value <= limits[0]:
-        y_min = norm.cdf(limits[0], loc=mean_value, scale=sigma[1])
-        y_max = norm.cdf(limits[1], loc=mean_value, scale=sigma[1])
+    if limits[0] == -inf and limits[1] == inf:
+        rand = randn_asym_untruncated(mean_value, sigma, probability_low=lim,
+                                      random_seed=random_seed, n_random=n_random, block=block,
+                                      out=out)
 
-        rand = norm.ppf(uniform(y_min, y_max, size=n_random), loc=mean_value, scale=sigma[1])
         if n_random == 1:
             return rand[0]
         else:
             return rand
 
-    if mean_value >= limits[1]:
-        y_min = norm.cdf(limits[0], loc=mean_value, scale=sigma[0])
-        y_max = norm.cdf(limits[1], loc=mean_value, scale=sigma[0])
+    rand = randn_asym_truncated(mean_value, sigma, limits, probability_low=lim,
+                                random_seed=random_seed, n_random=n_random, block=block,
+                                out=out)
 
-        rand = norm.ppf(uniform(y_min, y_max, size=n_random), loc=mean_value, scale=sigma[0])
-        if n_random == 1:
-            return rand[0]
+    if n_random == 1:
+        return rand[0]
+    else:
+        return rand
+
+def randn_asym_correlated(mean_values, sigmas, correlation, limits=None, random_seed=None,
+                          n_random=int(1e6)):
+    """Create arrays of random numbers from correlated (truncated) asymmetric normal \
+distributions
+
+    The values are sampled jointly with a Gaussian copula: standard normal numbers z are \
+correlated with the Cholesky factor L of the correlation matrix, and transformed to uniform \
+numbers u = Phi(L z), where Phi is the standard normal CDF. The i-th row of u is transformed \
+to the i-th distribution with its inverse CDF (see auxiliary.asym_normal_ppf()). Therefore, \
+each row follows the distribution that randn_asym() would sample, and the rank correlation \
+of the rows i and j is 6/pi*arcsin(correlation[i][j]/2). \
+The floating-point type of the values is given by the option 'dtype' (see sample_dtype()).
+
+    Parameters
+    ----------
+    mean_values : list of float
+        Modes of the distributions
+    sigmas : list of [float, float]
+        Left- and right-hand standard deviations of the distributions. If both are zero, \
+all values of a row are equal to its mode.
+    correlation : array_like
+        Symmetric, positive definite matrix with ones on the diagonal
+    limits : list of [float, float] or None, optional
+        Lower and upper limits of the distributions (default: None, i.e. no limits)
+    random_seed : positive int
+        Seed of the random number stream, see random_streams.generator(). \
+The same seed always gives the same random numbers. If None, fresh entropy is used.
+    n_random : positive int
+        Number of random numbers of each distribution (default: 1e6)
+
+    Returns
+    -------
+    randn : ndarray
+        Array of shape (len(mean_values), n_random), whose rows are the random numbers of \
+the distributions
+    """
+
+    n_inputs = len(mean_values)
+    if limits is None:
+        limits = [[-inf, inf]]*n_inputs
+    correlation = asarray(correlation, dtype=float64)
+
+    try:
+        if len(sigmas) != n_inputs or len(limits) != n_inputs:
+            raise ValueError("mean_values, sigmas and limits must have the same length")
+        if shape(correlation) != (n_inputs, n_inputs):
+            raise ValueError("The correlation matrix must have the shape (%i, %i)" %
+                             (n_inputs, n_inputs))
+        if (correlation != correlation.T).any() or (correlation.diagonal() != 1.).any():
+            raise ValueError("The correlation matrix must be symmetric with ones on the \
+diagonal")
+        try:
+            cholesky_factor = cholesky(correlation)
+        except LinAlgError:
+            raise ValueError("The correlation matrix must be positive definite")
+    except ValueError:
+        print("ValueError")
+        raise
+
+    for sigma, limit in zip(sigmas, limits):
+        check_num_array_argument(limit, 2, argument_name="Limits", is_increasing=True)
+        check_num_array_argument(sigma, 2, argument_name="Sigma", is_positive=True)
+
+    z = generator(random_seed, stream=STREAM_COPULA).standard_normal((n_inputs, n_random))
+    uniform = ndtr(clip(cholesky_factor @ z, -COPULA_MAX_Z, COPULA_MAX_Z))
+
+    rand = empty((n_inputs, n_random), dtype=sample_dtype())
+    for i, (mean_value, sigma, limit) in enumerate(zip(mean_values, sigmas, limits)):
+        if sigma[0] == 0. and sigma[1] == 0.:
+            rand[i] = mean_value
         else:
-            return rand
+            rand[i] = asym_normal_ppf(uniform[i], mean_value, sigma, limits=limit)
 
-    # Relative amount of numbers that will be sampled from
-    # a normal distribution with sigma[0]
-    weight_low = (norm.cdf(mean_value, loc=mean_value, scale=sigma[0]) -
-                  norm.cdf(limits[0], loc=mean_value, scale=sigma[0]))
-    weight_up = (norm.cdf(limits[1], loc=mean_value, scale=sigma[1]) -
-                 norm.cdf(mean_value, loc=mean_value, scale=sigma[1]))
-    lim = weight_low/(weight_low + weight_up)
+    return rand
 
-    plus = (plusminus >= lim)*1.
-    minus = (plusminus < lim)*1.
+def sample_prefix(sample_block, start=0, stop=int(1e6)):
+    """Get the values with the indices start, ..., stop - 1 of a prefix-stable stream
 
-    y_min = norm.cdf(limits[0], loc=mean_value, scale=sigma[0])
-    y_max = norm.cdf(limits[1], loc=mean_value, scale=sigma[1])
+    The i-th value of a prefix-stable stream does not depend on the number of values \
+that are requested. This is achieved by sampling the value i in the block \
+i//PREFIX_BLOCK_SIZE, which is an independent block of the stream of the random number seed \
+(see random_streams.seed_sequence()). Therefore, more values can be appended to a sample \
+at any time, and only the new ones have to be sampled.
+
+    Parameters
+    ----------
+    sample_block : function
+        Function of the index of a block which returns its PREFIX_BLOCK_SIZE random values
+    start : non-negative int, optional
+        Index of the first value (default: 0)
+    stop : positive int, optional
+        Index after the last value (default: 1e6)
 
-    rand += (norm.ppf(uniform(y_min, 0.5, size=n_random),
-                      loc=mean_value, scale=sigma[0])*minus)
-    rand += (norm.ppf(uniform(0.5, y_max, size=n_random),
-                      loc=mean_value, scale=sigma[1])*plus)
+    Returns
+    -------
+    rand : ndarray
+        Array of stop - start random numbers
+    """
 
-    if n_random == 1:
-        return rand[0]
-    else:
-        return rand
+    rand = empty(stop - start, dtype=sample_dtype())
+
+    for block in range(start//PREFIX_BLOCK_SIZE, (stop - 1)//PREFIX_BLOCK_SIZE + 1):
+        block_start = block*PREFIX_BLOCK_SIZE
+        first = max(start, block_start)
+        last = min(stop, block_start + PREFIX_BLOCK_SIZE)
+        rand[first - start:last - start] = sample_block(block)[first - block_start:
+                                                               last - block_start]
+
+    return rand
+
+def randn_asym_prefix(mean_value, sigma, limits=None, random_seed=None, start=0,
+                      stop=int(1e6)):
+    """Create random numbers from the prefix-stable stream of an asymmetric normal \
+distribution, see sample_prefix() and randn_asym()
+
+    Parameters
+    ----------
+    mean_value : float
+        Mode of the distribution
+    sigma : [float, float]
+        Left- and right-hand standard deviation
+    limits : [float, float], optional
+        Lower and upper limit of the distribution (default: None, i.e. no limits)
+    random_seed : positive int
+        Seed of the random number stream, see random_streams.generator()
+    start : non-negative int, optional
+        Index of the first value (default: 0)
+    stop : positive int, optional
+        Index after the last value (default: 1e6)
+
+    Returns
+    -------
+    randn : ndarray
+        Array of stop - start random numbers
+    """
+
+    return sample_prefix(lambda block: randn_asym(mean_value, sigma, limits=limits,
+                                                  random_seed=random_seed,
+                                                  n_random=PREFIX_BLOCK_SIZE, block=block),
+                         start=start, stop=stop)
 
 def check_num_array_argument(input_array, array_length, argument_name="Input",
                              is_positive=False, is_increasing=False):
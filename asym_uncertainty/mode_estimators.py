@@ -0,0 +1,257 @@
+"""Registry of the estimators of the most probable value of a sample"""
+
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+from threading import Lock
+from time import perf_counter
+
+from numpy import arange, array, clip
+
+from .auxiliary import asym_normal_mode
+from .mc_statistics import (batch_binned_kde_mode, batch_histogram_mode, binned_kde_mode,
+                            half_sample_mode, histogram_mode, subsample_kde_mode)
+
+MODE_ESTIMATOR_FALLBACK = "binned_kde" # Estimator which is used if the selected one is not
+# applicable, for example the analytic mode of an unknown distribution
+
+def analytic_mode(data, limits, weights=None, distribution=None):
+    """Mode of the known asymmetric normal distribution of the data
+
+    Parameters
+    ----------
+    data, limits, weights
+        Ignored
+    distribution : [float, [float, float], [float, float]] or None, optional
+        Mode, standard deviations and limits of the distribution, as in \
+Unc.sampled_distribution (default: None, i.e. unknown)
+
+    Returns
+    -------
+    mode : float or None
+        Mode of the distribution, or None if it is unknown
+    """
+
+    if distribution is None:
+        return None
+
+    return asym_normal_mode(distribution[0], limits=distribution[2])
+
+# Registered estimators. Each entry maps the name of an estimator to a function
+# f(data, limits, weights=None, distribution=None), which returns the most probable value of
+# the data inside the shortest coverage interval limits, and to a description of its cost
+# for N values.
+MODE_ESTIMATORS = {
+    "analytic": (analytic_mode, "O(1)"),
+    "binned_kde": (lambda data, limits, weights=None, distribution=None:
+                   binned_kde_mode(data, limits, weights=weights), "O(N + M log M)"),
+    "half_sample": (lambda data, limits, weights=None, distribution=None:
+                    half_sample_mode(data, weights=weights), "O(N), O(N log N) if unsorted"),
+    "histogram": (lambda data, limits, weights=None, distribution=None:
+                  histogram_mode(data, weights=weights), "O(N)"),
+    "subsample_kde": (lambda data, limits, weights=None, distribution=None:
+                      subsample_kde_mode(data, limits, weights=weights), "O(1)"),
+}
+
+# Vectorized implementations of registered estimators for several samples. Each entry maps
+# the name of an estimator to a function f(sorted_values, first, last) of an (m, n) array
+# whose rows are sorted, which returns the most probable value of the values between the
+# indices first and last of each row. Other estimators are called for each row.
+BATCH_MODE_ESTIMATORS = {
+    "binned_kde": batch_binned_kde_mode,
+    "histogram": batch_histogram_mode,
+}
+
+def is_mode_estimator(name):
+    """Check whether name is the name of a registered mode estimator"""
+    return isinstance(name, str) and name in MODE_ESTIMATORS
+
+def register_mode_estimator(name, estimator, cost):
+    """Add an estimator of the most probable value to the registry, or replace one
+
+    Example
+    -------
+    register_mode_estimator("median", lambda data, limits, weights=None, distribution=None:
+                            numpy.median(data), "O(N)")
+    with option_context(mode_estimator="median"):
+        c = a*b
+
+    Parameters
+    ----------
+    name : str
+        Name of the estimator
+    estimator : function
+        Function f(data, limits, weights=None, distribution=None) of the values data inside \
+the shortest coverage interval limits, their weights and the distribution of an Unc object \
+which is known analytically (see Unc.sampled_distribution). It returns the most probable \
+value, or None if the estimator is not applicable.
+    cost : str
+        Description of the cost for N values, for example "O(N)"
+    """
+
+    try:
+        if not isinstance(name, str):
+            raise ValueError("The name of a mode estimator must be a string.")
+        if not callable(estimator):
+            raise ValueError("Mode estimator must be a function.")
+    except ValueError:
+        print("ValueError")
+        raise
+
+    MODE_ESTIMATORS[name] = (estimator, cost)
+    BATCH_MODE_ESTIMATORS.pop(name, None)
+
+class ModeEstimatorCounters:
+    """Counters of the calls of each mode estimator and the time spent in them
+
+    All methods are thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls = {}
+        self._seconds = {}
+
+    def record(self, name, seconds, calls=1):
+        """Count a call of an estimator
+
+        Parameters
+        ----------
+        name : str
+            Name of the estimator
+        seconds : float
+            Duration of the call in seconds
+        calls : int, optional
+            Number of samples which were evaluated by the call (default: 1)
+        """
+
+        with self._lock:
+            self._calls[name] = self._calls.get(name, 0) + calls
+            self._seconds[name] = self._seconds.get(name, 0.) + seconds
+
+    def clear(self):
+        """Reset all counters"""
+
+        with self._lock:
+            self._calls.clear()
+            self._seconds.clear()
+
+    def info(self):
+        """Get the counters
+
+        Returns
+        -------
+        info : dict
+            Maps the name of each estimator which ran to a dictionary with the number of \
+calls 'calls', the total time in seconds 'seconds' and the cost 'cost'
+        """
+
+        with self._lock:
+            return {name: {"calls": calls, "seconds": self._seconds[name],
+                           "cost": MODE_ESTIMATORS[name][1] if name in MODE_ESTIMATORS else None}
+                    for name, calls in self._calls.items()}
+
+# Counters of estimate_mode()
+MODE_ESTIMATOR_COUNTERS = ModeEstimatorCounters()
+
+def estimate_mode(name, data, limits, weights=None, distribution=None):
+    """Find the most probable value with a registered estimator
+
+    If the estimator is not applicable, MODE_ESTIMATOR_FALLBACK is used instead. The call is \
+counted for the estimator which gave the result (see mode_estimator_info()). The result is \
+restricted to the shortest coverage interval, which may not contain the analytic mode of a \
+truncated distribution, for example.
+
+    Parameters
+    ----------
+    name : str
+        Name of the estimator, see MODE_ESTIMATORS
+    data : ndarray
+        Values inside the shortest coverage interval
+    limits : [float, float]
+        Shortest coverage interval
+    weights : ndarray, optional
+        Weights of the values (default: None, i.e. all weights are 1)
+    distribution : [float, [float, float], [float, float]], optional
+        Known distribution of the values, as in Unc.sampled_distribution (default: None)
+
+    Returns
+    -------
+    [mode, name] : [float, str]
+        Most probable value and the name of the estimator which gave it
+    """
+
+    try:
+        if not is_mode_estimator(name):
+            raise ValueError("Unknown mode estimator '%s'" % name)
+    except ValueError:
+        print("ValueError")
+        raise
+
+    start = perf_counter()
+    mode = MODE_ESTIMATORS[name][0](data, limits, weights=weights, distribution=distribution)
+    if mode is None and name != MODE_ESTIMATOR_FALLBACK:
+        return estimate_mode(MODE_ESTIMATOR_FALLBACK, data, limits, weights=weights,
+                             distribution=distribution)
+    MODE_ESTIMATOR_COUNTERS.record(name, perf_counter() - start)
+
+    return [min(max(mode, limits[0]), limits[1]), name]
+
+def estimate_batch_mode(name, sorted_values, first, last):
+    """Find the most probable values of several samples with a registered estimator
+
+    If there is a vectorized implementation of the estimator in BATCH_MODE_ESTIMATORS, all \
+samples are evaluated at once. Otherwise, estimate_mode() is called for each sample. Each \
+sample is counted as a call of the estimator (see mode_estimator_info()). Like for \
+estimate_mode(), the results are restricted to the shortest coverage intervals.
+
+    Parameters
+    ----------
+    name : str
+        Name of the estimator, see MODE_ESTIMATORS
+    sorted_values : ndarray
+        (m, n) array whose rows are samples sorted in ascending order
+    first : ndarray
+        Index of the first value inside the shortest coverage interval for each row
+    last : ndarray
+        Index after the last value inside the shortest coverage interval for each row
+
+    Returns
+    -------
+    modes : ndarray
+        Most probable value of each row
+    """
+
+    if name not in BATCH_MODE_ESTIMATORS:
+        return array([estimate_mode(name, row[start:stop], [row[start], row[stop - 1]])[0]
+                      for row, start, stop in zip(sorted_values, first, last)], dtype=float)
+
+    start = perf_counter()
+    modes = BATCH_MODE_ESTIMATORS[name](sorted_values, first, last)
+    MODE_ESTIMATOR_COUNTERS.record(name, perf_counter() - start, calls=len(sorted_values))
+
+    rows = arange(len(sorted_values))
+    return clip(modes, sorted_values[rows, first], sorted_values[rows, last - 1])
+
+def mode_estimator_info():
+    """Get the number of calls of each mode estimator and the time spent in it, see \
+ModeEstimatorCounters.info()"""
+
+    return MODE_ESTIMATOR_COUNTERS.info()
+
+def clear_mode_estimator_info():
+    """Reset the counters of the mode estimators"""
+
+    MODE_ESTIMATOR_COUNTERS.clear()
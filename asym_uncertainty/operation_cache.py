@@ -0,0 +1,293 @@
+"""Cache of the results of operations on Unc, which are reused if an operation is repeated"""
+
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import OrderedDict
+from functools import wraps
+from threading import Lock
+from zlib import crc32
+
+from numpy import ascontiguousarray
+
+from .options import get_option, get_options
+
+OPERATION_CACHE_ENTRY_BYTES = 1024 # Number of bytes which are counted for each entry in addition
+# to the random values that the result keeps, an estimate of the size of the key and of the Unc
+
+class OperationCache:
+    """Byte-budgeted least-recently-used (LRU) cache of the results of operations on Unc
+
+    Scripts often repeat the same operation on the same operands, for example a ratio which \
+enters several formulas. If the option 'operation_cache_size' is larger than zero, the \
+operators of Unc and functions.exp return the cached result of such an operation instead of \
+sampling and evaluating it again (see cached_operation()). Therefore, the repeated result is \
+the same quantity, and it is fully correlated with the first one.
+
+    An entry is identified by the name of the operation, the seeds and numbers of random values \
+of the operands, checksums of all stored random values of the operands, and the values of \
+all options. It is invalidated if the set* methods of Unc change one of the operands or the \
+result. The size of an entry is OPERATION_CACHE_ENTRY_BYTES plus the number of bytes of the \
+random values which the result keeps, i.e. its stored random values or the random values of a \
+pending lazy evaluation (see entry_bytes()). If adding an entry exceeds the size given by \
+'operation_cache_size', the least recently used entries are evicted. All methods are \
+thread-safe.
+
+    Attributes
+    ----------
+    hits: int
+        Number of successful look-ups
+    misses: int
+        Number of look-ups which did not find an entry
+    evictions: int
+        Number of entries that were removed to stay within the size limit
+    invalidations: int
+        Number of entries that were removed because an operand or the result was changed
+    n_bytes: int
+        Number of bytes counted for the cached results
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._keys_of_seed = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.n_bytes = 0
+
+    def get(self, key):
+        """Look up the result of an operation and mark it as recently used
+
+        Parameters
+        ----------
+        key : hashable
+            See operation_key()
+
+        Returns
+        -------
+        result : Unc or None
+            The cached result, or None if there is no entry for key
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, result, seeds):
+        """Add the result of an operation and evict least recently used entries if necessary
+
+        Results which are larger than the whole cache are not stored.
+
+        Parameters
+        ----------
+        key : hashable
+            See operation_key()
+        result : Unc
+        seeds : list of int
+            Seeds of the operands which are Unc
+        """
+
+        result_bytes = entry_bytes(result)
+        max_bytes = get_option("operation_cache_size")
+        if result_bytes > max_bytes:
+            return
+
+        seeds = set(seeds) | {result.seed}
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (result, seeds, result_bytes)
+            self.n_bytes += result_bytes
+            for seed in seeds:
+                self._keys_of_seed.setdefault(seed, set()).add(key)
+
+            while self.n_bytes > max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, seed):
+        """Remove all entries whose operands or result have the given seed
+
+        Parameters
+        ----------
+        seed : int
+            Seed of a Unc which was changed
+        """
+
+        with self._lock:
+            for key in list(self._keys_of_seed.get(seed, ())):
+                self._remove(key)
+                self.invalidations += 1
+
+    def _remove(self, key):
+        """Remove an entry, the lock must be held by the caller"""
+
+        _, seeds, result_bytes = self._entries.pop(key)
+        self.n_bytes -= result_bytes
+        for seed in seeds:
+            keys = self._keys_of_seed[seed]
+            keys.discard(key)
+            if not keys:
+                del self._keys_of_seed[seed]
+
+    def clear(self):
+        """Remove all entries and reset the counters"""
+
+        with self._lock:
+            self._entries.clear()
+            self._keys_of_seed.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.invalidations = 0
+            self.n_bytes = 0
+
+    def info(self):
+        """Get the counters of the cache
+
+        Returns
+        -------
+        info : dict
+            Values of hits, misses, evictions, invalidations and n_bytes, as well as the \
+fraction of successful look-ups hit_rate (0 if there were none), the number of entries \
+n_entries and the maximum number of bytes max_bytes
+        """
+
+        with self._lock:
+            n_lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "invalidations": self.invalidations, "n_bytes": self.n_bytes,
+                    "hit_rate": self.hits/n_lookups if n_lookups > 0 else 0.,
+                    "n_entries": len(self._entries),
+                    "max_bytes": get_option("operation_cache_size")}
+
+# Cache of the results of the operators of Unc and of functions.exp
+OPERATION_CACHE = OperationCache()
+
+def operation_cache_info():
+    """Get the hit, miss, eviction and invalidation counters, the hit rate and the size of the \
+cache of results of operations, see OperationCache.info()"""
+
+    return OPERATION_CACHE.info()
+
+def clear_operation_cache():
+    """Remove all results of operations from the cache and reset its counters"""
+
+    OPERATION_CACHE.clear()
+
+def entry_bytes(result):
+    """Get the number of bytes which an entry of OPERATION_CACHE is counted with
+
+    Parameters
+    ----------
+    result : Unc
+        Result of an operation
+
+    Returns
+    -------
+    n_bytes : int
+        OPERATION_CACHE_ENTRY_BYTES plus the number of bytes of the stored random values of \
+result and of the random values of its pending lazy evaluation (see Unc.pending_random_values)
+    """
+
+    n_bytes = OPERATION_CACHE_ENTRY_BYTES
+    if result.store:
+        n_bytes += result.random_values.nbytes
+    if result.pending_random_values is not None:
+        n_bytes += result.pending_random_values.nbytes
+
+    return n_bytes
+
+def operand_key(operand):
+    """Identify an operand of an operation
+
+    Parameters
+    ----------
+    operand : anything
+
+    Returns
+    -------
+    key : tuple or None
+        For a built-in number, its type and value. For a Unc, its seed and n_random, and, if \
+it stores its random values, their number and a CRC-32 checksum of all of them, so that \
+also changes of single values in place are detected. None for all other operands, whose \
+operations are not cached.
+    """
+
+    if isinstance(operand, (int, float)):
+        return (type(operand).__name__, operand)
+
+    seed = getattr(operand, "seed", None)
+    if seed is None:
+        return None
+
+    if not operand.store:
+        return ("Unc", seed, operand.n_random)
+
+    rand = ascontiguousarray(operand.random_values)
+    return ("Unc", seed, operand.n_random, len(rand), str(rand.dtype), crc32(rand.data))
+
+def cached_operation(name):
+    """Decorator which looks up the result of an operation in OPERATION_CACHE
+
+    Example
+    -------
+    @cached_operation("exp")
+    def exp(unc):
+        ...
+
+    Parameters
+    ----------
+    name : str
+        Name of the operation
+
+    Returns
+    -------
+    decorator : function
+        Function which wraps an operation on Unc. If the option 'operation_cache_size' is \
+zero, or if an operand is neither a Unc nor a built-in number, the wrapped operation is \
+always carried out.
+    """
+
+    def decorator(operation):
+
+        @wraps(operation)
+        def cached(*operands):
+            if get_option("operation_cache_size") == 0:
+                return operation(*operands)
+
+            operand_keys = tuple(operand_key(operand) for operand in operands)
+            if None in operand_keys:
+                return operation(*operands)
+
+            key = (name, operand_keys, tuple(sorted(get_options().items())))
+            result = OPERATION_CACHE.get(key)
+            if result is None:
+                result = operation(*operands)
+                OPERATION_CACHE.put(key, result, [operand.seed for operand in operands
+                                                  if not isinstance(operand, (int, float))])
+            return result
+
+        return cached
+
+    return decorator
@@ -0,0 +1,186 @@
+"""Global options which control the Monte Carlo sampling and the evaluation of results"""
+
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+from contextlib import contextmanager
+
+def is_non_negative_int(value):
+    """Check whether value is an int >= 0"""
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+def is_registered_mode_estimator(value):
+    """Check whether value is the name of an estimator in mode_estimators.MODE_ESTIMATORS"""
+    # Imported here, since the mode estimators depend on the options
+    from .mode_estimators import is_mode_estimator
+    return is_mode_estimator(value)
+
+# Default values of all options. Each entry maps the name of an option to its default
+# value and to the tuple of allowed values, or to a function which returns True for
+# allowed values.
+OPTION_DEFAULTS = {
+    "antithetic": (False, (False, True)),
+    "bit_generator": ("PCG64", ("PCG64", "Philox")),
+    "buffer_pool_size": (2**27, is_non_negative_int),
+    "control_variates": (False, (False, True)),
+    # Maximum number of bytes of the cache of standardized draws (see draw_cache.DrawCache).
+    # It costs 9 bytes per random value of each cached seed (5 for float32), which are kept
+    # until they are evicted or the cache is cleared, also after the Unc objects are deleted.
+    # It only pays off if the same seeds are sampled repeatedly, therefore it is 0, i.e.
+    # disabled, by default.
+    "draw_cache_size": (0, is_non_negative_int),
+    "dtype": ("float64", ("float64", "float32")),
+    "evaluation": ("exact", ("exact", "approximate", "refined")),
+    "expression_graph": (False, (False, True)),
+    # Evaluation of quantities whose random values are sampled from a known asymmetric normal
+    # distribution (see io.known_distribution()). With "analytic", Unc(1., 0.1, 0.2, store=True)
+    # keeps mean_value, sigma_low and sigma_up of the distribution, or gets the exact mode and
+    # shortest coverage interval if it is truncated. Previously, these values were always
+    # estimated from the random values, which is still done with "sampled".
+    "input_evaluation": ("analytic", ("analytic", "sampled")),
+    "lazy_evaluation": (False, (False, True)),
+    "mode_estimator": ("binned_kde", is_registered_mode_estimator),
+    "operation_cache_size": (0, is_non_negative_int),
+    # Random numbers of the sampling (see quasi_random.QMC_POINTS). Each seed that is sampled
+    # with Sobol' points gets its own dimension of the sequence, and direction numbers are
+    # only known for quasi_random.SOBOL_MAX_DIMENSION = 21201 dimensions. Seeds which are
+    # sampled after all of them are in use get Latin hypercube points instead, which is
+    # reported once per seed.
+    "sampling": ("pseudo", ("pseudo", "sobol", "lhs")),
+    "stratified": (False, (False, True)),
+    "stream_entropy": (20180607, is_non_negative_int),
+}
+
+_options = {name: default for name, (default, _) in OPTION_DEFAULTS.items()}
+
+def get_option(name):
+    """Get the current value of a global option
+
+    Parameters
+    ----------
+    name : str
+        Name of the option, see OPTION_DEFAULTS for a list of all options
+
+    Returns
+    -------
+    value : anything
+        Current value of the option
+    """
+
+    try:
+        if name not in _options:
+            raise ValueError("Unknown option '%s'" % name)
+    except ValueError:
+        print("ValueError")
+        raise
+
+    return _options[name]
+
+def get_options():
+    """Get the current values of all global options
+
+    Returns
+    -------
+    options : dict
+        Maps the name of each option to its current value
+    """
+
+    return dict(_options)
+
+def set_option(name, value):
+    """Set the value of a global option and check whether the new value is valid
+
+    Parameters
+    ----------
+    name : str
+        Name of the option, see OPTION_DEFAULTS for a list of all options
+    value : anything
+        New value of the option
+    """
+
+    try:
+        if name not in OPTION_DEFAULTS:
+            raise ValueError("Unknown option '%s'" % name)
+        allowed_values = OPTION_DEFAULTS[name][1]
+        if callable(allowed_values):
+            if not allowed_values(value):
+                raise ValueError("Invalid value for option '%s':" % name, value)
+        elif value not in allowed_values:
+            raise ValueError("Option '%s' must be one of" % name, allowed_values)
+    except ValueError:
+        print("ValueError")
+        raise
+
+    _options[name] = value
+
+def reset_options():
+    """Reset all global options to their default values"""
+
+    for name, (default, _) in OPTION_DEFAULTS.items():
+        _options[name] = default
+
+@contextmanager
+def option_context(**options):
+    """Temporarily set global options inside a with-block
+
+    Example
+    -------
+    with option_context(bit_generator="Philox"):
+        c = a*b
+
+    Parameters
+    ----------
+    **options
+        Names and values of the options
+    """
+
+    previous = {name: get_option(name) for name in options}
+    try:
+        for name, value in options.items():
+            set_option(name, value)
+        yield
+    finally:
+        for name, value in previous.items():
+            _options[name] = value
+
+def with_current_options(function):
+    """Bind a function to the current values of the global options
+
+    Example
+    -------
+    with option_context(mode_estimator="histogram"):
+        evaluation = with_current_options(lambda: evaluate(rand_result)[0])
+    # Uses the histogram estimator
+    evaluation()
+
+    Parameters
+    ----------
+    function : function
+        Function without arguments
+
+    Returns
+    -------
+    bound_function : function
+        Function without arguments which calls function inside option_context() with the \
+values of all options at the time of the call of with_current_options()
+    """
+
+    options = get_options()
+
+    def bound_function():
+        with option_context(**options):
+            return function()
+
+    return bound_function
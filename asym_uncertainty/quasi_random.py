@@ -0,0 +1,245 @@
+"""Randomized quasi-Monte Carlo points for the sampling of quantities"""
+
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+import warnings
+from threading import Lock
+
+from numpy import (add, arange, bitwise_and, bitwise_xor, full, int64, minimum, multiply,
+                   nextafter, right_shift, rint, tril, uint64, zeros)
+from scipy.stats import qmc
+
+from .random_streams import STREAM_QMC, generator
+
+SOBOL_BITS = 30 # Number of bits of the Sobol' points, i.e. at most 2**30 points per quantity
+SOBOL_MAX_DIMENSION = qmc.Sobol.MAXDIM # Number of dimensions with known direction numbers
+
+# Dimensions of the Sobol' sequence which belong to the seeds that have been sampled so far
+SOBOL_DIMENSIONS = {}
+# Direction numbers of the dimensions 0, 1, ... which have been determined so far
+SOBOL_TABLE = [zeros((0, 0), dtype=int64)]
+# Seeds for which the fallback to Latin hypercube sampling has already been reported
+FALLBACK_SEEDS = set()
+SOBOL_LOCK = Lock()
+
+def sobol_dimension(random_seed):
+    """Get the dimension of the Sobol' sequence which belongs to a random number seed
+
+    The dimensions are assigned in the order in which the seeds are sampled for the first \
+time, so that the dimensions in use are dense although seeds are reserved for every \
+result of an operation. Therefore, the points of a script that samples its quantities in \
+the same order are reproducible.
+
+    Parameters
+    ----------
+    random_seed : non-negative int
+
+    Returns
+    -------
+    dimension : int or None
+        Index of the dimension, or None if all SOBOL_MAX_DIMENSION dimensions are in use
+    """
+
+    with SOBOL_LOCK:
+        dimension = SOBOL_DIMENSIONS.get(random_seed)
+        if dimension is None and len(SOBOL_DIMENSIONS) < SOBOL_MAX_DIMENSION:
+            dimension = len(SOBOL_DIMENSIONS)
+            SOBOL_DIMENSIONS[random_seed] = dimension
+
+    return dimension
+
+def draw_sobol_direction_numbers(n_dimensions, n_numbers):
+    """Determine direction numbers from the points of scipy.stats.qmc.Sobol
+
+    The direction numbers of scipy.stats.qmc.Sobol are the ones of Joe and Kuo \
+(SIAM J. Sci. Comput. 30 (2008) 2635). Due to the Gray code order, the unscrambled point \
+with the index 2**k is the XOR of the direction numbers k and k - 1. This takes \
+O(n_dimensions*2**n_numbers) operations.
+
+    Parameters
+    ----------
+    n_dimensions : positive int
+        Number of dimensions, n_dimensions <= SOBOL_MAX_DIMENSION
+    n_numbers : positive int
+        Number of direction numbers per dimension, n_numbers <= SOBOL_BITS
+
+    Returns
+    -------
+    direction_numbers : ndarray
+        Array of shape (n_dimensions, n_numbers)
+    """
+
+    engine = qmc.Sobol(d=n_dimensions, scramble=False, bits=SOBOL_BITS)
+    direction_numbers = zeros((n_dimensions, n_numbers), dtype=int64)
+    previous = zeros(n_dimensions, dtype=int64)
+    index = 0
+    for k in range(n_numbers):
+        engine.fast_forward(2**k - index)
+        point = rint(engine.random(1)[0]*2.**SOBOL_BITS).astype(int64)
+        index = 2**k + 1
+        direction_numbers[:, k] = point ^ previous
+        previous = direction_numbers[:, k]
+
+    return direction_numbers
+
+def sobol_direction_numbers(dimension, n_numbers):
+    """Get the first direction numbers of a single dimension of the Sobol' sequence
+
+    The direction numbers of all dimensions up to the requested one are determined at once \
+(see draw_sobol_direction_numbers()) and kept in SOBOL_TABLE. The number of dimensions in \
+the table is at least doubled each time it grows, so that the cost per dimension is \
+O(2**n_numbers).
+
+    Parameters
+    ----------
+    dimension : int
+        Index of the dimension, 0 <= dimension < SOBOL_MAX_DIMENSION
+    n_numbers : positive int
+        Number of direction numbers, n_numbers <= SOBOL_BITS. The points 0, ..., \
+2**n_numbers - 1 only depend on them.
+
+    Returns
+    -------
+    direction_numbers : ndarray
+        n_numbers integers with SOBOL_BITS bits, the first of which is used for the points \
+1, 3, 5, ...
+    """
+
+    with SOBOL_LOCK:
+        table = SOBOL_TABLE[0]
+        if dimension >= table.shape[0] or n_numbers > table.shape[1]:
+            table = draw_sobol_direction_numbers(
+                min(max(2*table.shape[0], dimension + 1), SOBOL_MAX_DIMENSION),
+                max(table.shape[1], n_numbers))
+            SOBOL_TABLE[0] = table
+
+    return table[dimension, :n_numbers]
+
+def warn_sobol_fallback(random_seed):
+    """Warn once per seed that Latin hypercube points replace the Sobol' points
+
+    Parameters
+    ----------
+    random_seed : int
+        Random number seed for which no dimension is left
+    """
+
+    with SOBOL_LOCK:
+        if random_seed in FALLBACK_SEEDS:
+            return
+        FALLBACK_SEEDS.add(random_seed)
+
+    warnings.warn("No Sobol' dimension left for random number seed %i. Use Latin hypercube \
+sampling instead." % random_seed, UserWarning)
+
+def sobol_points(random_seed=None, n_random=int(1e6), block=None):
+    """Create scrambled Sobol' points in (0, 1) for a quantity
+
+    The points of a seed are a dimension of a Sobol' sequence (see sobol_dimension()), i.e. \
+quantities with different seeds are jointly low-discrepancy and independent in the sense of \
+randomized quasi-Monte Carlo. Each dimension is randomized by a linear matrix scrambling and \
+a digital shift (J. Matousek, J. Complexity 14 (1998) 527) from the stream STREAM_QMC of the seed, \
+and by a uniform jitter within the finest resolution of SOBOL_BITS bits, which makes each \
+point uniformly distributed and excludes 0 and 1. \
+The balance properties of the sequence hold best if n_random is a power of 2.
+
+    If all SOBOL_MAX_DIMENSION dimensions are in use, Latin hypercube points are returned \
+instead, and a warning is issued the first time this happens for the seed. If the \
+seed is None, the dimension 0 with a fresh scrambling is used.
+
+    Parameters
+    ----------
+    random_seed : non-negative int or None
+        Random number seed, which selects the dimension of the Sobol' sequence
+    n_random : positive int
+        Number of points, n_random <= 2**SOBOL_BITS
+    block : non-negative int or None, optional
+        Index of an independent randomization, see random_streams.seed_sequence()
+
+    Returns
+    -------
+    points : ndarray
+        Array of n_random points
+    """
+
+    dimension = 0 if random_seed is None else sobol_dimension(random_seed)
+    if dimension is None:
+        warn_sobol_fallback(random_seed)
+        return latin_hypercube_points(random_seed=random_seed, n_random=n_random, block=block)
+
+    rng = generator(random_seed, stream=STREAM_QMC, block=block)
+
+    # Linear matrix scrambling of the direction numbers: each binary digit becomes a random
+    # combination of itself and the more significant digits.
+    n_bits = max(int(n_random - 1).bit_length(), 1)
+    shifts = arange(SOBOL_BITS - 1, -1, -1)
+    digits = (sobol_direction_numbers(dimension, n_bits)[:, None] >> shifts) & 1
+    scrambling_matrix = tril(rng.integers(0, 2, size=(SOBOL_BITS, SOBOL_BITS)), k=-1)
+    scrambling_matrix[arange(SOBOL_BITS), arange(SOBOL_BITS)] = 1
+    direction_numbers = (((digits @ scrambling_matrix.T) & 1) << shifts).sum(axis=1)
+
+    # Gray code construction: the point i is the XOR of the direction numbers that belong
+    # to the bits of i^(i >> 1)
+    index = arange(n_random, dtype=uint64)
+    gray_code = bitwise_xor(index, right_shift(index, uint64(1)))
+    points_int = full(n_random, rng.integers(0, 2**SOBOL_BITS), dtype=uint64)
+    bit = index.copy()
+    for i in range(n_bits):
+        bitwise_and(right_shift(gray_code, uint64(i)), uint64(1), out=bit)
+        multiply(bit, uint64(direction_numbers[i]), out=bit)
+        bitwise_xor(points_int, bit, out=points_int)
+
+    points = rng.random(n_random)
+    add(points, points_int, out=points)
+    multiply(points, 2.**-SOBOL_BITS, out=points)
+    # The jitter may round up to 1 in the last interval
+    minimum(points, nextafter(1., 0.), out=points)
+
+    return points
+
+def latin_hypercube_points(random_seed=None, n_random=int(1e6), block=None):
+    """Create Latin hypercube points in (0, 1) for a quantity
+
+    Each of the n_random intervals [k/n_random, (k + 1)/n_random) contains exactly one \
+point at a uniformly distributed position. The order of the intervals is a random \
+permutation from the stream STREAM_QMC of the seed, so that quantities with different \
+seeds are independent.
+
+    Parameters
+    ----------
+    random_seed : non-negative int or None
+        Random number seed
+    n_random : positive int
+        Number of points
+    block : non-negative int or None, optional
+        Index of an independent randomization, see random_streams.seed_sequence()
+
+    Returns
+    -------
+    points : ndarray
+        Array of n_random points
+    """
+
+    rng = generator(random_seed, stream=STREAM_QMC, block=block)
+
+    points = rng.permutation(n_random).astype(float)
+    add(points, rng.random(n_random), out=points)
+    multiply(points, 1./n_random, out=points)
+
+    return points
+
+# Functions which create the points in (0, 1) for each value of the option 'sampling'
+QMC_POINTS = {"sobol": sobol_points, "lhs": latin_hypercube_points}
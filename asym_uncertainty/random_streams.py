@@ -0,0 +1,112 @@
+"""Independent and reproducible random number streams for each quantity"""
+
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+from numpy.random import Generator, PCG64, Philox, SeedSequence
+
+from .options import get_option
+
+BIT_GENERATORS = {"PCG64": PCG64, "Philox": Philox}
+
+# Keys which distinguish the different streams that belong to the same random number seed.
+# Each key gives a statistically independent stream, so that, for example, re-sampling
+# stored values does not re-use the numbers from which they were sampled.
+STREAM_SAMPLING = 0
+STREAM_RESAMPLING = 1
+STREAM_BRANCH = 2
+STREAM_QMC = 3
+STREAM_BOOTSTRAP = 4
+STREAM_COPULA = 5
+
+def check_random_seed(random_seed):
+    """Check whether a random number seed is a non-negative integer or None.
+    If not, raise a ValueError
+
+    Parameters
+    ----------
+    random_seed : anything
+
+    Returns
+    -------
+    Nothing
+    """
+
+    try:
+        if random_seed is not None:
+            if not isinstance(random_seed, int) or random_seed < 0:
+                raise ValueError("Random number seed must be positive integer")
+    except ValueError:
+        print("ValueError")
+        raise
+
+def seed_sequence(random_seed=None, stream=STREAM_SAMPLING, block=None):
+    """Create the numpy SeedSequence which belongs to a random number seed
+
+    All seeded sequences are spawned from the same root entropy, given by the option \
+'stream_entropy'. The random number seed (usually Unc.seed) and the stream key become the \
+spawn key of the sequence, which makes the streams of different seeds independent of \
+each other. An optional block index appends a further independent sub-stream, for example \
+for the batches of adaptive.adaptive_propagation().
+
+    Parameters
+    ----------
+    random_seed : non-negative int or None
+        Random number seed. If None, a SeedSequence with fresh entropy from the operating \
+system is returned.
+    stream : non-negative int, optional
+        Key of the stream, for example STREAM_SAMPLING or STREAM_BRANCH
+    block : non-negative int or None, optional
+        Index of the block within the stream (default: None, i.e. the stream itself)
+
+    Returns
+    -------
+    seed_sequence : numpy.random.SeedSequence
+    """
+
+    check_random_seed(random_seed)
+
+    if random_seed is None:
+        return SeedSequence()
+
+    spawn_key = (random_seed, stream) if block is None else (random_seed, stream, block)
+
+    return SeedSequence(get_option("stream_entropy"), spawn_key=spawn_key)
+
+def generator(random_seed=None, stream=STREAM_SAMPLING, block=None):
+    """Create a numpy Generator for a random number seed
+
+    Each call returns a new Generator, which is not shared with any other caller. \
+Therefore, quantities can be sampled in parallel threads, and a given seed always \
+reproduces the same random numbers. The bit generator is given by the option \
+'bit_generator'.
+
+    Parameters
+    ----------
+    random_seed : non-negative int or None
+        Random number seed
+    stream : non-negative int, optional
+        Key of the stream, for example STREAM_SAMPLING or STREAM_BRANCH
+    block : non-negative int or None, optional
+        Index of the block within the stream, see seed_sequence()
+
+    Returns
+    -------
+    generator : numpy.random.Generator
+    """
+
+    bit_generator = BIT_GENERATORS[get_option("bit_generator")]
+
+    return Generator(bit_generator(seed_sequence(random_seed, stream=stream, block=block)))
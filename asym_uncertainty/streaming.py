@@ -0,0 +1,148 @@
+"""Monte-Carlo propagation in chunks of random values with a constant memory footprint"""
+
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+from .adaptive import sample_inputs
+from .asym_uncertainty import Unc
+from .mc_statistics import (as_sample_array, binned_mode, candidate_ranges,
+                            candidate_shortest_coverage, histogram_pass)
+
+STREAMING_CHUNK_SIZE = 2**20 # Default number of random values per chunk
+STREAMING_N_BINS = 2**16 # Default number of bins of the histograms of the result
+
+def sample_chunks(model, inputs, n_random, chunk_size):
+    """Generator which yields the random values of the result of a model chunk by chunk
+
+    The inputs of the i-th chunk are sampled from the i-th block of the streams of their \
+seeds, and stored inputs are re-sampled jointly (see adaptive.sample_inputs()). Therefore, \
+each call gives the same chunks, and correlations between stored inputs are preserved.
+
+    Parameters
+    ----------
+    model : function
+        Function of the inputs, see streaming_propagation()
+    inputs : list of Unc, int or float
+        Inputs of the model
+    n_random : positive int
+        Total number of random values
+    chunk_size : positive int
+        Number of random values per chunk. The last chunk may be smaller.
+
+    Yields
+    ------
+    rand_result : ndarray
+        Random values of the result for a chunk
+    """
+
+    for block, start in enumerate(range(0, n_random, chunk_size)):
+        size = min(chunk_size, n_random - start)
+        yield as_sample_array(model(*sample_inputs(inputs, size, block)))
+
+def streaming_propagation(model, *inputs, n_random=int(1e6), chunk_size=STREAMING_CHUNK_SIZE,
+                          n_bins=STREAMING_N_BINS, coverage_percent=68.27):
+    """Propagate uncertainties through a model in chunks of random values
+
+    The inputs are sampled, the model is applied and the result is reduced chunk by chunk \
+(see sample_chunks()). Since the chunks are reproducible, they are simply generated again \
+for each pass over the random values:
+
+    1. Find the range of the result.
+    2. Fill a histogram with n_bins bins and find the candidates for the endpoints of the \
+shortest coverage interval (see mc_statistics.candidate_ranges()).
+    3. As long as the candidates contain more than chunk_size values, fill histograms of \
+the candidates for the lower and upper endpoint, and narrow them down further.
+    4. Collect all values of the candidates, and find the exact shortest coverage interval \
+among them (see mc_statistics.candidate_shortest_coverage()).
+
+    Therefore, the memory footprint is given by chunk_size, n_bins and the size of the \
+cache of standardized draws (see the option 'draw_cache_size'), and does not depend \
+on n_random. The shortest coverage interval is the same that \
+mc_statistics.shortest_coverage() would find for all random values at once. The most \
+probable value is determined from the histogram of the second pass (see \
+mc_statistics.binned_mode()).
+
+    Example
+    -------
+    x = Unc(1., 0.1, 0.2)
+    y = Unc(2., 0.3, 0.3, limits=[0., inf])
+    z = streaming_propagation(lambda x, y: x*numpy.exp(-y), x, y, n_random=int(1e9))
+
+    Parameters
+    ----------
+    model : function
+        Function of the inputs, which must accept numpy arrays and scalars as arguments \
+and return a numpy array of the same length as the input arrays
+    *inputs : Unc, int or float
+        Inputs of the model
+    n_random : int, optional
+        Total number of random values, n_random > 1 (default: 1e6)
+    chunk_size : positive int, optional
+        Number of random values per chunk (default: STREAMING_CHUNK_SIZE)
+    n_bins : int, optional
+        Number of bins of the histograms, n_bins > 1 (default: STREAMING_N_BINS)
+    coverage_percent : float, optional
+        Coverage of the interval in percent (default: 68.27)
+
+    Returns
+    -------
+    result : Unc
+        Result of the model. Its n_random is the total number of random values, which may \
+have to be reduced with Unc.set_n_random() before the result is used in further calculations.
+    """
+
+    try:
+        if not isinstance(n_random, int) or n_random < 2:
+            raise ValueError("n_random must be an int > 1")
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError("chunk_size must be a positive int")
+        if not isinstance(n_bins, int) or n_bins < 2:
+            raise ValueError("n_bins must be an int > 1")
+        for operand in inputs:
+            if not isinstance(operand, (int, float, Unc)):
+                raise ValueError("Inputs must be either a built-in numerical type or Unc")
+    except ValueError:
+        print("ValueError")
+        raise
+
+    chunks = lambda: sample_chunks(model, inputs, n_random, chunk_size)
+
+    full_range = [float("inf"), -float("inf")]
+    for rand_result in chunks():
+        full_range = [min(full_range[0], float(rand_result.min())),
+                      max(full_range[1], float(rand_result.max()))]
+
+    if full_range[0] == full_range[1]:
+        return Unc(full_range[0], 0., 0., n_random=n_random)
+
+    n_coverage = int(coverage_percent*0.01*n_random)
+    counts = histogram_pass(chunks(), [full_range], n_bins)[0]
+    value_ranges, n_inside = candidate_ranges([counts, counts], [full_range, full_range],
+                                              n_coverage, n_random)
+
+    # Each histogram pass narrows down the candidates by a factor of the order of
+    # sqrt(n_bins). Stop if it does not help any more, for example for discrete values.
+    n_inside_previous = n_random + 1
+    while chunk_size < n_inside < n_inside_previous:
+        n_inside_previous = n_inside
+        value_ranges, n_inside = candidate_ranges(histogram_pass(chunks(), value_ranges, n_bins),
+                                                  value_ranges, n_coverage, n_random)
+
+    s_cov = candidate_shortest_coverage(chunks(), value_ranges, n_coverage)
+
+    most_probable = binned_mode(counts[1], full_range, s_cov)
+
+    return Unc(most_probable, most_probable - s_cov[0], s_cov[1] - most_probable,
+               n_random=n_random)
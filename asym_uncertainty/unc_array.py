@@ -0,0 +1,472 @@
+"""Arrays of many quantities with asymmetric uncertainties, stored as arrays of their attributes"""
+
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+import warnings
+
+from math import inf
+
+from numpy import add as nadd
+from numpy import power as npower
+from numpy import (asarray, atleast_1d, broadcast_to, column_stack, empty, float64,
+                   flatnonzero, integer, multiply, ndim, shape, subtract, true_divide, zeros)
+
+from .algebra import is_exact_constant, sample_operand
+from .asym_uncertainty import Unc, reserve_seeds
+from .evaluation import evaluate_batch, evaluate_distribution
+from .io import known_distribution
+from .mc_statistics import (SAMPLING_BLOCK_SIZE, as_sample_array, randn_asym,
+                            randn_standard_draws, sample_dtype)
+from .options import get_option
+
+class UncArray:
+    """Container of m quantities with asymmetric uncertainties
+
+    An UncArray x represents the quantities x[0], ..., x[m - 1], which behave like Unc \
+objects, but their attributes are stored as arrays instead of m Unc objects. Therefore, \
+creating and propagating thousands of quantities does not need thousands of constructors of \
+Unc and of Monte Carlo evaluations. The operators +, -, *, / and ** work elementwise like the \
+ones of Unc. Their operands are sampled as an (m, n_random) matrix, where each row is \
+sampled with the seed of its quantity, and all rows of the result are evaluated at once with \
+evaluation.evaluate_batch(). The other operand may be an UncArray of the same length, a \
+single Unc or a built-in number, which applies to all quantities.
+
+    Indexing with an int gives the quantity as Unc, which has the same seed and is therefore \
+fully correlated with it. Slices give an UncArray whose attributes are views of the ones of \
+the original array.
+
+    Example
+    -------
+    x = UncArray(numpy.linspace(1., 2., 1000), 0.1, 0.2, n_random=100000)
+    y = x/(1. + x)
+    print(y[10])
+
+    Attributes
+    ----------
+    mean_value: ndarray
+        Most probable values of the quantities
+    sigma_low: ndarray
+        Lower uncertainties of the quantities
+    sigma_up: ndarray
+        Upper uncertainties of the quantities
+    limits: ndarray
+        (m, 2) array of the lower and upper limits of the distributions of the quantities
+    seeds: ndarray
+        Seeds of the quantities, see Unc.seed
+    store: bool
+        If True, random_values holds the random values of all quantities, and the result of \
+an operation stores its random values as well, see Unc.store
+    random_values: ndarray or None
+        (m, n_random) array of the random values of the quantities if store is True, \
+otherwise None
+    n_random: int
+        Number of random values of each quantity, see Unc.n_random
+    """
+
+    def __init__(self, mean_value, sigma_low=None, sigma_up=None, limits=None, store=False,
+                 n_random=None):
+        """Initialization of members of UncArray
+
+        The arguments have the same meaning as for Unc(), but each of mean_value, sigma_low, \
+sigma_up and limits may be given for all quantities at once or for each quantity.
+
+        Parameters
+        ----------
+        mean_value: float or array_like
+        sigma_low: float, array_like or None
+        sigma_up: float, array_like or None
+        limits: [float, float], array_like of shape (m, 2) or None
+        store: bool
+        n_random: int or None
+        """
+
+        mean_value = atleast_1d(asarray(mean_value, dtype=float64))
+        if sigma_low is None:
+            sigma_low = 0. if sigma_up is None else sigma_up
+        if sigma_up is None:
+            sigma_up = sigma_low
+        if limits is None:
+            limits = [-inf, inf]
+        if n_random is None:
+            n_random = int(1e6)
+
+        try:
+            if ndim(mean_value) != 1:
+                raise ValueError("mean_value must be a number or a one-dimensional array")
+            self.sigma_low = broadcast_to(asarray(sigma_low, dtype=float64), shape(mean_value))
+            self.sigma_up = broadcast_to(asarray(sigma_up, dtype=float64), shape(mean_value))
+            self.limits = broadcast_to(asarray(limits, dtype=float64), (len(mean_value), 2))
+            if (self.sigma_low < 0.).any() or (self.sigma_up < 0.).any():
+                raise ValueError("sigma_low and sigma_up must be >= 0.")
+            if (self.limits[:, 0] > self.limits[:, 1]).any():
+                raise ValueError("Limits must be increasing.")
+            if not isinstance(n_random, int) or n_random < 2:
+                raise ValueError("n_random must be an integer > 1.")
+        except ValueError:
+            print("ValueError")
+            raise
+
+        self.mean_value = mean_value
+        self.n_random = n_random
+        self.seeds = reserve_seeds(len(mean_value))
+        self.store = False
+        self.random_values = None
+
+        if store:
+            self.random_values = self.sample()
+            self.store = True
+            self.evaluate_inputs()
+
+    @classmethod
+    def from_random_values(cls, random_values):
+        """Create an UncArray which stores the given random values
+
+        All quantities are evaluated at once (see evaluation.evaluate_batch()), like the \
+random values that are given to Unc().
+
+        Parameters
+        ----------
+        random_values : array_like
+            (m, n) array, whose rows are the random values of the quantities
+
+        Returns
+        -------
+        result : UncArray
+        """
+
+        random_values = as_sample_array(random_values)
+        try:
+            if ndim(random_values) != 2 or shape(random_values)[1] < 2:
+                raise ValueError("random_values must be an (m, n) array with n > 1.")
+        except ValueError:
+            print("ValueError")
+            raise
+
+        result = cls(zeros(len(random_values)), n_random=shape(random_values)[1])
+        result.store = True
+        result.random_values = random_values
+        result.set_evaluation(evaluate_rows(random_values, overwrite_input=False))
+        return result
+
+    def evaluate_inputs(self):
+        """Update mean_value, sigma_low and sigma_up from the freshly sampled random values
+
+        Like for Unc, the distributions of the quantities are evaluated analytically if the \
+option 'input_evaluation' is 'analytic' (see io.known_distribution()), and the random values \
+are evaluated otherwise.
+        """
+
+        evaluation = column_stack((self.mean_value, self.sigma_low, self.sigma_up))
+        sampled = []
+        for i in range(len(self)):
+            distribution = [self.mean_value[i], [self.sigma_low[i], self.sigma_up[i]],
+                            list(self.limits[i])]
+            if known_distribution(distribution) is not None:
+                evaluation[i] = evaluate_distribution(distribution)
+            elif self.sigma_low[i] > 0. or self.sigma_up[i] > 0.:
+                sampled.append(i)
+
+        if sampled:
+            evaluation[sampled] = evaluate_rows(self.random_values[sampled])
+        self.set_evaluation(evaluation)
+
+    def sample(self):
+        """Get the random values which represent the quantities in a calculation
+
+        Like for the operands of Unc (see algebra.sample_operand()), stored random values are \
+returned directly. Otherwise, the i-th row is sampled from the asymmetric normal distribution \
+of the i-th quantity with its seed, and exact quantities are replaced by their mean values. \
+Each row is the same as randn_asym() gives for the quantity. For pseudo-random sampling \
+without limits, only the standardized draws are created row by row from the stream of each \
+seed (see mc_statistics.randn_standard_draws()), and they are scaled to the distributions \
+of all quantities at once in blocks of rows. Other rows are sampled with randn_asym().
+
+        Returns
+        -------
+        random_values : ndarray
+            (m, n_random) array
+        """
+
+        if self.store:
+            return self.random_values
+
+        rand = empty((len(self), self.n_random), dtype=sample_dtype())
+        exact = self.is_exact
+        rand[exact] = self.mean_value[exact, None]
+
+        untruncated = ~exact & (self.limits[:, 0] == -inf) & (self.limits[:, 1] == inf)
+        if get_option("sampling") != "pseudo":
+            untruncated[:] = False
+
+        for i in flatnonzero(~exact & ~untruncated):
+            randn_asym(self.mean_value[i], [self.sigma_low[i], self.sigma_up[i]],
+                       limits=list(self.limits[i]), random_seed=int(self.seeds[i]),
+                       n_random=self.n_random, out=rand[i])
+
+        # The same operations as in mc_statistics.randn_asym_untruncated(), applied to
+        # blocks of rows
+        rows = flatnonzero(untruncated)
+        block_size = max(1, SAMPLING_BLOCK_SIZE//self.n_random)
+        low = empty((min(block_size, len(rows)), self.n_random), dtype=bool)
+        scale = empty(low.shape, dtype=rand.dtype)
+        for start in range(0, len(rows), block_size):
+            block = rows[start:start + block_size]
+            low_block, scale_block = low[:len(block)], scale[:len(block)]
+            for i, row in enumerate(block):
+                low_block[i] = randn_standard_draws(random_seed=int(self.seeds[row]),
+                                                    n_random=self.n_random, out=rand[row])[1]
+            rand_block = rand[block]
+            multiply(low_block, -(self.sigma_low[block] + self.sigma_up[block])[:, None],
+                     out=scale_block)
+            nadd(scale_block, self.sigma_up[block, None], out=scale_block)
+            multiply(rand_block, scale_block, out=rand_block)
+            nadd(rand_block, self.mean_value[block, None], out=rand_block)
+            rand[block] = rand_block
+
+        return rand
+
+    def set_evaluation(self, evaluation):
+        """Set mean_value, sigma_low and sigma_up of all quantities
+
+        Parameters
+        ----------
+        evaluation : ndarray
+            (m, 3) array of the most probable values, lower and upper uncertainties
+        """
+
+        self.mean_value = evaluation[:, 0].copy()
+        self.sigma_low = evaluation[:, 1].copy()
+        self.sigma_up = evaluation[:, 2].copy()
+
+    @property
+    def is_exact(self):
+        """Array which is True for the quantities with sigma_low = sigma_up = 0"""
+        return (self.sigma_low == 0.) & (self.sigma_up == 0.)
+
+    def __len__(self):
+        return len(self.mean_value)
+
+    def __getitem__(self, key):
+        """Get a quantity as Unc, or a slice of the quantities as UncArray
+
+        Parameters
+        ----------
+        key : int, slice or array_like
+            Index of a quantity, or indices of several quantities. Slices give views of the \
+attributes, other arrays of indices give copies.
+
+        Returns
+        -------
+        item : Unc or UncArray
+        """
+
+        if isinstance(key, (int, integer)):
+            unc = Unc(self.mean_value[key], self.sigma_low[key], self.sigma_up[key],
+                      limits=list(self.limits[key]), n_random=self.n_random,
+                      seed=int(self.seeds[key]))
+            if self.store:
+                unc.store = True
+                unc.random_values = self.random_values[key]
+            return unc
+
+        item = UncArray.__new__(UncArray)
+        item.mean_value = self.mean_value[key]
+        item.sigma_low = self.sigma_low[key]
+        item.sigma_up = self.sigma_up[key]
+        item.limits = self.limits[key]
+        item.seeds = self.seeds[key]
+        item.n_random = self.n_random
+        item.store = self.store
+        item.random_values = self.random_values[key] if self.store else None
+        return item
+
+    def __repr__(self):
+        return "UncArray(%r, %r, %r)" % (self.mean_value, self.sigma_low, self.sigma_up)
+
+    def __str__(self):
+        return "[" + ", ".join(str(self[i]) for i in range(len(self))) + "]"
+
+    ###################################################
+    # Algebra
+    ###################################################
+
+    def __add__(self, other):
+        if isinstance(other, (int, float)):
+            return self.shifted(other, 1.)
+        return array_operation(nadd, self, other)
+
+    def __mul__(self, other):
+        if isinstance(other, (int, float)):
+            return self.shifted(0., other)
+        return array_operation(multiply, self, other)
+
+    def __neg__(self):
+        return self.shifted(0., -1.)
+
+    def __pow__(self, other):
+        return array_operation(npower, self, other)
+
+    def __radd__(self, other):
+        return self.__add__(other)
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __rpow__(self, other):
+        return array_operation(npower, other, self)
+
+    def __rsub__(self, other):
+        if isinstance(other, (int, float)):
+            return self.shifted(other, -1.)
+        return array_operation(subtract, other, self)
+
+    def __rtruediv__(self, other):
+        return array_operation(true_divide, other, self)
+
+    def __sub__(self, other):
+        if isinstance(other, (int, float)):
+            return self.shifted(-other, 1.)
+        return array_operation(subtract, self, other)
+
+    def __truediv__(self, other):
+        if isinstance(other, (int, float)):
+            return self.shifted(0., 1./other)
+        return array_operation(true_divide, self, other)
+
+    def shifted(self, offset, factor):
+        """Calculate offset + factor*self without sampling, like the operations of Unc with \
+built-in numbers, which scale sigma_low and sigma_up with abs(factor)
+
+        Parameters
+        ----------
+        offset : float
+        factor : float
+
+        Returns
+        -------
+        offset + factor*self : UncArray
+        """
+
+        if self.store:
+            return UncArray.from_random_values(offset + factor*self.random_values)
+
+        return UncArray(offset + factor*self.mean_value, abs(factor)*self.sigma_low,
+                        abs(factor)*self.sigma_up, n_random=self.n_random)
+
+Unc.deferred_operand_types += (UncArray,)
+
+def array_operation(function, *operands):
+    """Apply an operation to the rows of the random values of UncArray, Unc and numbers
+
+    Parameters
+    ----------
+    function : function
+        Vectorised function of the random values of the operands, for example numpy.add
+    *operands : UncArray, Unc, int or float
+        Operands of the operation, of which at least one is an UncArray. Unc and numbers \
+apply to all quantities.
+
+    Returns
+    -------
+    result : UncArray
+        The result, which stores its random values if one of the operands does
+    """
+
+    try:
+        lengths = {len(operand) for operand in operands if isinstance(operand, UncArray)}
+        if len(lengths) != 1:
+            raise ValueError("UncArray operands must have the same length")
+        if not all(isinstance(operand, (UncArray, Unc, int, float)) for operand in operands):
+            raise ValueError("Operands must be either built-in numerical types, Unc or "
+                             "UncArray")
+    except ValueError:
+        print("ValueError")
+        raise
+
+    rand_operands = [sample_array_operand(operand) for operand in operands]
+    n_randoms = {shape(rand)[-1] for rand in rand_operands if ndim(rand) > 0}
+    common_array_size = min(n_randoms)
+    if len(n_randoms) > 1:
+        warnings.warn("Truncated one array of random numbers due to array size mismatch.",
+                      UserWarning)
+    rand_operands = [rand[..., :common_array_size] if ndim(rand) > 0 else rand
+                     for rand in rand_operands]
+
+    rand_result = as_sample_array(function(*rand_operands))
+    result_shape = (lengths.pop(), common_array_size)
+    if shape(rand_result) != result_shape:
+        # For example, all rows of an UncArray of exact quantities times a Unc are equal
+        rand_result = broadcast_to(rand_result, result_shape).copy()
+
+    if any(not isinstance(operand, (int, float)) and operand.store for operand in operands):
+        return UncArray.from_random_values(rand_result)
+
+    result = UncArray(zeros(len(rand_result)), n_random=common_array_size)
+    result.set_evaluation(evaluate_rows(rand_result, overwrite_input=True))
+    return result
+
+def evaluate_rows(rand_results, overwrite_input=False):
+    """Evaluate the rows of random values of several quantities at once
+
+    Rows with equal values, for example of x - x, are exact. All other rows are evaluated with \
+evaluation.evaluate_batch().
+
+    Parameters
+    ----------
+    rand_results : ndarray
+        (m, n) array of the random values of m quantities
+    overwrite_input : bool, optional
+        Sort rand_results in place (default: False)
+
+    Returns
+    -------
+    evaluation : ndarray
+        (m, 3) array of the most probable value, the lower and the upper uncertainty of each \
+quantity
+    """
+
+    exact = rand_results.min(axis=1) == rand_results.max(axis=1)
+    if not exact.any():
+        return evaluate_batch(rand_results, overwrite_input=overwrite_input)
+
+    evaluation = zeros((len(rand_results), 3))
+    evaluation[exact, 0] = rand_results[exact, 0]
+    if not exact.all():
+        evaluation[~exact] = evaluate_batch(rand_results[~exact], overwrite_input=True)
+    return evaluation
+
+def sample_array_operand(operand):
+    """Get the random values which represent an operand of array_operation()
+
+    Parameters
+    ----------
+    operand : UncArray, Unc, int or float
+
+    Returns
+    -------
+    random_values : ndarray or float
+        (m, n_random) array for UncArray, n_random values for Unc, which apply to all rows, \
+and the value of exact constants
+    """
+
+    if isinstance(operand, (int, float)):
+        return operand
+    if isinstance(operand, UncArray):
+        return operand.sample()
+    if is_exact_constant(operand):
+        return operand.mean_value
+
+    return sample_operand(operand)
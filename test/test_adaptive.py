@@ -0,0 +1,83 @@
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+from math import inf
+
+import pytest
+from numpy import exp as nexp
+
+from asym_uncertainty import (adaptive_propagation, correlate, numerical_tolerance,
+                              pdg_rounding_exponent, Unc)
+
+def model(x, y):
+    return x*nexp(-y)
+
+class TestAdaptive(object):
+    def test_tolerance(self):
+        assert pdg_rounding_exponent(0.123) == -2
+        assert pdg_rounding_exponent(0.5) == -1
+        assert pdg_rounding_exponent(97.) == 0
+
+        assert numerical_tolerance([10., 0.123, 0.5]) == pytest.approx(0.005)
+        assert numerical_tolerance([10., 0., 0.]) == pytest.approx(0.5)
+        assert numerical_tolerance([0., 0., 0.]) is None
+
+    def test_adaptive_propagation(self):
+        x = Unc(1., 0.1, 0.2)
+        y = Unc(2., 0.3, 0.3, limits=[0., inf])
+
+        z = adaptive_propagation(model, x, y)
+        # An easy quantity needs much less than the default n_random
+        assert z.n_random < int(1e6)
+        assert z.n_random % int(1e4) == 0
+        assert abs(z.mean_value - 0.12) < 0.005
+
+        # The result is reproducible
+        z_repeated = adaptive_propagation(model, x, y)
+        assert z_repeated.n_random == z.n_random
+        assert z_repeated.mean_value == z.mean_value
+
+        # The same input in several places of the model is correlated with itself
+        assert (adaptive_propagation(lambda x_1, x_2: x_1*x_2, x, x).mean_value ==
+                adaptive_propagation(lambda x_1: x_1**2, x).mean_value)
+
+        z = adaptive_propagation(model, x, 2., store=True)
+        assert len(z.random_values) == z.n_random
+
+    def test_correlated_stored_inputs(self):
+        x = Unc(1., 0.1, 0.1, n_random=int(1e5), store=True)
+        y = Unc(2., 0.2, 0.2, n_random=int(1e5), store=True)
+
+        # A stored result is re-sampled jointly with the stored inputs it was built from, so
+        # the model recovers the distribution of y instead of a broader one
+        z = adaptive_propagation(lambda x, w: w/x, x, x*y)
+        assert z.sigma_low + z.sigma_up == pytest.approx(0.4, rel=0.05)
+
+        # Correlated copies keep their correlation
+        x_1, x_2 = correlate([x, x], [[1., 0.99], [0.99, 1.]])
+        z = adaptive_propagation(lambda x_1, x_2: x_1 - x_2, x_1, x_2)
+        assert z.sigma_low + z.sigma_up < 0.04
+
+    def test_max_n_random(self):
+        x = Unc(1., 0.1, 0.2)
+
+        with pytest.warns(RuntimeWarning):
+            z = adaptive_propagation(lambda x: x**3, x, batch_size=100, max_n_random=300)
+        assert z.n_random == 300
+
+        with pytest.raises(ValueError):
+            adaptive_propagation(model, x, 2., batch_size=100, max_n_random=100)
+        with pytest.raises(ValueError):
+            adaptive_propagation(model, x, "2")
@@ -0,0 +1,73 @@
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+from numpy import array_equal
+
+from asym_uncertainty import (buffer_pool_info, clear_buffer_pool, exp, option_context,
+                              randn_asym, Unc)
+
+N_RANDOM = 10000
+
+class TestBufferPool(object):
+    def test_operator_chain(self):
+        a, b, c, d = [Unc(1. + i, 0.1, 0.2, n_random=N_RANDOM) for i in range(4)]
+        with option_context(buffer_pool_size=0):
+            y_unpooled = a/b
+
+        clear_buffer_pool()
+        y = exp(((a + b)*c)/d)
+        # Two operands and the result of a single operation
+        assert buffer_pool_info()["allocations"] == 3
+        assert buffer_pool_info()["n_buffers"] == 3
+
+        y = exp(((a + b)*c)/d)
+        assert buffer_pool_info()["allocations"] == 3
+        # Each binary operation takes three buffers and exp() two
+        assert buffer_pool_info()["reuses"] == 2*(3*3 + 2) - 3
+
+        # Intermediate results have new seeds, so only single operations can be compared
+        y = a/b
+        assert [y.mean_value, y.sigma_low, y.sigma_up] == \
+            [y_unpooled.mean_value, y_unpooled.sigma_low, y_unpooled.sigma_up]
+
+    def test_control_variates(self):
+        a, b = Unc(1., 0.1, 0.2, n_random=N_RANDOM), Unc(2., 0.1, 0.2, n_random=N_RANDOM)
+
+        clear_buffer_pool()
+        with option_context(control_variates=True):
+            for _ in range(20):
+                a*b + a
+        # The result of the weighted evaluation is released like the others
+        assert buffer_pool_info()["allocations"] == 3
+
+    def test_kept_buffers(self):
+        a = Unc(1., 0.1, 0.2, n_random=N_RANDOM)
+        b = Unc(2., 0.1, 0.2, store=True, n_random=N_RANDOM)
+
+        clear_buffer_pool()
+        # Stored results keep their buffer, pending evaluations keep it until they are done
+        y = a*b
+        assert buffer_pool_info()["n_buffers"] == 1
+        assert array_equal(y.random_values, randn_asym(1., [0.1, 0.2], random_seed=a.seed,
+                                                       n_random=N_RANDOM)*b.random_values)
+        with option_context(lazy_evaluation=True):
+            z = a*a
+            assert buffer_pool_info()["n_buffers"] == 2
+            z.mean_value
+            assert buffer_pool_info()["n_buffers"] == 3
+
+        with option_context(buffer_pool_size=N_RANDOM*8):
+            a*a
+        assert buffer_pool_info()["discards"] == 2
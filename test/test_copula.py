@@ -0,0 +1,80 @@
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+from math import asin, pi
+
+import pytest
+from numpy import argsort, corrcoef, empty_like, quantile
+from numpy import exp as nexp
+
+from asym_uncertainty import Unc, correlate, exp, randn_asym, randn_asym_correlated
+
+N_RANDOM = 200000
+
+def ranks(values):
+    rank = empty_like(values)
+    rank[argsort(values)] = range(len(values))
+    return rank
+
+class TestCopula(object):
+    def test_randn_asym_correlated(self):
+        correlation = [[1., 0.8, -0.3], [0.8, 1., 0.], [-0.3, 0., 1.]]
+        rand = randn_asym_correlated([1., 2., 0.], [[0.1, 0.2], [0.3, 0.1], [0., 0.]],
+                                     correlation,
+                                     limits=[[-10., 10.], [1.5, 2.5], [-1., 1.]],
+                                     random_seed=1, n_random=N_RANDOM)
+        assert rand.shape == (3, N_RANDOM)
+        assert (rand[2] == 0.).all()
+        assert rand[1].min() >= 1.5 and rand[1].max() <= 2.5
+
+        # The margins are asymmetric normal distributions, with the rank correlation of the
+        # Gaussian copula
+        assert quantile(rand[0], [0.1, 0.5, 0.9]) == pytest.approx(
+            quantile(randn_asym(1., [0.1, 0.2], n_random=N_RANDOM), [0.1, 0.5, 0.9]), abs=0.005)
+        assert corrcoef(ranks(rand[0]), ranks(rand[1]))[0][1] == \
+            pytest.approx(6./pi*asin(0.4), abs=0.01)
+
+        assert (rand == randn_asym_correlated([1., 2., 0.], [[0.1, 0.2], [0.3, 0.1], [0., 0.]],
+                                              correlation,
+                                              limits=[[-10., 10.], [1.5, 2.5], [-1., 1.]],
+                                              random_seed=1, n_random=N_RANDOM)).all()
+
+        for invalid_correlation in ([[1., 0.5]], [[1., 0.5], [0.4, 1.]], [[2., 0.], [0., 1.]],
+                                    [[1., 1.], [1., 1.]]):
+            with pytest.raises(ValueError):
+                randn_asym_correlated([1., 2.], [[0.1, 0.2], [0.3, 0.1]], invalid_correlation,
+                                      n_random=10)
+
+    def test_correlate(self):
+        x = Unc(1., 0.1, 0.2, n_random=N_RANDOM)
+        y = Unc(1., 0.1, 0.2, n_random=N_RANDOM)
+        c = Unc(3., 0., 0.)
+
+        x_corr, y_corr, c_corr = correlate([x, y, c], [[1., 0.9, 0.], [0.9, 1., 0.],
+                                                       [0., 0., 1.]])
+        assert c_corr is c
+        assert x_corr.store and x_corr.n_random == N_RANDOM
+        assert x_corr.mean_value == pytest.approx(x.mean_value, abs=0.03)
+
+        # The correlated samples are used by the operators
+        difference = x_corr - y_corr
+        assert difference.sigma_low + difference.sigma_up < \
+            0.5*((x - y).sigma_low + (x - y).sigma_up)
+        ratio = exp(x_corr)/y_corr
+        assert ratio.random_values == pytest.approx(
+            nexp(x_corr.random_values)/y_corr.random_values)
+
+        with pytest.raises(ValueError):
+            correlate([x, 1.], [[1., 0.], [0., 1.]])
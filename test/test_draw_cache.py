@@ -0,0 +1,86 @@
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+from numpy import allclose, array_equal
+
+from asym_uncertainty import (clear_draw_cache, draw_cache_info, option_context, randn_asym,
+                              Unc)
+
+CACHE_SIZE = 2**27
+
+class TestDrawCache(object):
+    def test_hits_and_misses(self):
+        clear_draw_cache()
+
+        with option_context(draw_cache_size=CACHE_SIZE):
+            random_values = randn_asym(1., [0.5, 2.], random_seed=1, n_random=1000)
+            assert draw_cache_info()["misses"] == 1
+            assert draw_cache_info()["n_bytes"] == 9*1000
+
+            # A hit must reconstruct exactly the same values, also for other mean values and
+            # sigmas of the same seed.
+            assert array_equal(random_values,
+                               randn_asym(1., [0.5, 2.], random_seed=1, n_random=1000))
+            assert allclose(2.*(random_values - 1.) + 3.,
+                            randn_asym(3., [1., 4.], random_seed=1, n_random=1000))
+            assert draw_cache_info()["hits"] == 2
+
+            with option_context(draw_cache_size=0):
+                assert array_equal(random_values,
+                                   randn_asym(1., [0.5, 2.], random_seed=1, n_random=1000))
+            assert draw_cache_info()["hits"] == 2
+
+            # Unseeded and truncated values are not cached
+            randn_asym(1., [0.5, 2.], n_random=1000)
+            randn_asym(1., [0.5, 2.], limits=[0., 2.], random_seed=1, n_random=1000)
+            assert draw_cache_info()["n_entries"] == 1
+
+    def test_eviction(self):
+        clear_draw_cache()
+
+        with option_context(draw_cache_size=2*9*1000):
+            for seed in range(3):
+                randn_asym(1., [0.5, 2.], random_seed=seed, n_random=1000)
+            assert draw_cache_info()["evictions"] == 1
+            assert draw_cache_info()["n_entries"] == 2
+
+            # Seed 0 was evicted, seed 2 is still there
+            randn_asym(1., [0.5, 2.], random_seed=2, n_random=1000)
+            assert draw_cache_info()["hits"] == 1
+            randn_asym(1., [0.5, 2.], random_seed=0, n_random=1000)
+            assert draw_cache_info()["misses"] == 4
+
+            # Entries larger than the cache are not stored
+            randn_asym(1., [0.5, 2.], random_seed=0, n_random=10000)
+            assert draw_cache_info()["n_bytes"] <= 2*9*1000
+
+        with pytest.raises(ValueError):
+            with option_context(draw_cache_size=-1):
+                pass
+
+    def test_repeated_operand(self):
+        clear_draw_cache()
+
+        with option_context(draw_cache_size=CACHE_SIZE):
+            a = Unc(1., 0.1, 0.1, n_random=1000)
+            b = Unc(2., 0.1, 0.2, n_random=1000)
+            a*b
+            a/b
+            b*b
+
+            assert draw_cache_info()["misses"] == 2
+            assert draw_cache_info()["hits"] == 4
+
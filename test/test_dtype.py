@@ -0,0 +1,74 @@
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+from math import inf
+
+import pytest
+from numpy import array_equal, float32, float64
+from numpy import exp as nexp
+
+from asym_uncertainty import (clear_draw_cache, draw_cache_info, evaluate, exp, option_context,
+                              randn_asym, Unc)
+
+N_RANDOM = 100000
+
+# Accuracy benchmark: models of two quantities x and y, which are sampled with the same seeds
+# in double and single precision. The results must agree within the rounding rules of the PDG.
+MODELS = {
+    "sum": lambda x, y: x + y,
+    "product": lambda x, y: x*y,
+    "ratio": lambda x, y: x/y,
+    "power": lambda x, y: x**y,
+    "exponential": lambda x, y: nexp(x*y),
+}
+
+def sample_inputs():
+    return [randn_asym(1., [0.1, 0.2], random_seed=1, n_random=N_RANDOM),
+            randn_asym(2., [0.3, 0.3], limits=[0., inf], random_seed=2, n_random=N_RANDOM)]
+
+class TestDtype(object):
+    @pytest.mark.parametrize("model", MODELS.keys())
+    def test_accuracy(self, model):
+        rounded = {}
+        for dtype in ("float64", "float32"):
+            with option_context(dtype=dtype):
+                evaluation = evaluate(MODELS[model](*sample_inputs()))[0]
+            rounded[dtype] = Unc(*evaluation).rounded
+
+        assert array_equal(rounded["float64"], rounded["float32"])
+
+    def test_pipeline(self):
+        clear_draw_cache()
+
+        with option_context(dtype="float32", draw_cache_size=2**27):
+            for rand in sample_inputs():
+                assert rand.dtype == float32
+            # Cached draws need 4 bytes for |z| and 1 byte for the side
+            assert draw_cache_info()["n_bytes"] == 5*N_RANDOM
+
+            x = Unc(1., 0.1, 0.2, store=True, n_random=N_RANDOM)
+            y = Unc(2., 0.3, 0.3, n_random=N_RANDOM)
+            assert x.random_values.dtype == float32
+
+            # Mean values of type numpy.float64 do not promote the stored values
+            assert (x*y).random_values.dtype == float32
+            assert (x + Unc(x.mean_value)).random_values.dtype == float32
+            assert exp(x/y).random_values.dtype == float32
+
+        assert Unc(1., 0.1, 0.2, store=True, n_random=N_RANDOM).random_values.dtype == float64
+
+        with pytest.raises(ValueError):
+            with option_context(dtype="float16"):
+                pass
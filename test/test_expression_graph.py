@@ -0,0 +1,97 @@
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+from numpy import exp as nexp
+
+from asym_uncertainty import (Unc, clear_mode_estimator_info, evaluate, exp, mode_estimator_info,
+                              option_context, randn_asym)
+
+N_RANDOM = 100000
+
+def n_mode_estimations():
+    return sum(info["calls"] for info in mode_estimator_info().values())
+
+def sample(unc):
+    return randn_asym(unc.mean_value, [unc.sigma_low, unc.sigma_up], limits=unc.limits,
+                      random_seed=unc.seed, n_random=unc.n_random)
+
+class TestExpressionGraph(object):
+    def test_correlations(self):
+        x = Unc(1., 0.1, 0.2, n_random=N_RANDOM)
+        a = Unc(2., 0.3, 0.1, n_random=N_RANDOM)
+        b = Unc(3., 0.2, 0.2, n_random=N_RANDOM)
+        c = Unc(1., 0.1, 0.1, n_random=N_RANDOM)
+
+        with option_context(expression_graph=True):
+            clear_mode_estimator_info()
+            z = x/(1 + x)
+            y = (a*b)/(a + c)
+            u = -exp(x)**2 + 2.*x
+            assert n_mode_estimations() == 0
+            assert z.expression is not None
+            assert (x - x).mean_value == 0. and (x - x).is_exact
+
+        # Each result is evaluated once, with the random values of its leaves
+        assert z.sigma_up > 0.
+        assert n_mode_estimations() == 1
+        rand_x, rand_a, rand_b, rand_c = sample(x), sample(a), sample(b), sample(c)
+        assert [z.mean_value, z.sigma_low, z.sigma_up] == \
+            evaluate(rand_x/(1 + rand_x))[0]
+        assert [y.mean_value, y.sigma_low, y.sigma_up] == \
+            evaluate((rand_a*rand_b)/(rand_a + rand_c))[0]
+        assert [u.mean_value, u.sigma_low, u.sigma_up] == \
+            pytest.approx(evaluate(-nexp(rand_x)**2 + 2.*rand_x)[0])
+
+        # Without the graph, 1 + x is resampled from a fitted distribution
+        z_resampled = x/(1 + x)
+        assert z_resampled.sigma_up > 1.5*z.sigma_up
+
+    def test_mixed_operands(self):
+        x = Unc(1., 0.1, 0.2, n_random=N_RANDOM)
+        x_store = Unc(2., 0.1, 0.1, store=True, n_random=N_RANDOM)
+
+        with option_context(expression_graph=True):
+            z = x/(1 + x)
+            # Stored operands give stored results
+            y = z*x_store
+            assert y.store and y.expression is None
+            assert y.random_values == pytest.approx(
+                sample(x)/(1 + sample(x))*x_store.random_values)
+
+        # Operations without the graph use the random values of the graph
+        w = z*x_store
+        assert w.random_values == pytest.approx(y.random_values)
+
+        # Setting a value removes the node
+        z.set_mean_value(1.)
+        assert z.expression is None
+        assert [z.mean_value, z.sigma_low] == [1., pytest.approx(0.029, abs=0.002)]
+
+    def test_changed_leaves(self):
+        x = Unc(1., 0.1, 0.2, n_random=N_RANDOM)
+        rand_x = sample(x)
+
+        with option_context(expression_graph=True):
+            z = x/(1 + x)
+            w = z*x
+
+        # Changing a leaf after the operation does not change the pending results, like for
+        # operations without the graph
+        x.set_mean_value(5.)
+        x.set_lower_limit(0.95)
+        assert [z.mean_value, z.sigma_low, z.sigma_up] == evaluate(rand_x/(1 + rand_x))[0]
+        assert [w.mean_value, w.sigma_low, w.sigma_up] == \
+            pytest.approx(evaluate(rand_x**2/(1 + rand_x))[0])
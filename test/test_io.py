@@ -15,10 +15,10 @@
 
 import pytest
 
-from numpy import array, mean, std
+from numpy import array, array_equal, mean, ones, std
 from numpy.random import normal, uniform
 
-from asym_uncertainty import exp, Unc
+from asym_uncertainty import evaluate, exp, option_context, Unc
 
 STATISTICAL_UNCERTAINTY_LIMIT = 0.25 # Maximum tolerated absolute deviation from exact result
 
@@ -184,16 +184,25 @@ class TestIO(object):
 
         # Check that, if the value of n_random is changed, the size of the random_values
         # array is adjusted accordingly if store = True
+        # Since the stored values are sampled from a prefix-stable stream, appending values
+        # restores the original ones
         a = Unc(1., 0.5, 0.5, n_random = 100, store=True)
         assert len(a.random_values) == 100
+        random_values = a.random_values.copy()
         a.set_n_random(50)
         assert len(a.random_values) == 50
+        a.set_n_random(100)
+        assert len(a.random_values) == 100
+        assert array_equal(a.random_values, random_values)
+
+        # Values which were not sampled from an asymmetric normal distribution are resampled
+        a = Unc(1., 0.5, 0.5, store=True, random_values=uniform(-1., 1., size=100))
         with pytest.warns(UserWarning) as record:
-            a.set_n_random(100)
-        assert len(record) == 3
+            a.set_n_random(200)
+        assert len(record) == 2
         assert "Requested n_random" in record[0].message.args[0]
         assert "less than 1000 values" in record[1].message.args[0]
-        assert len(a.random_values) == 100
+        assert len(a.random_values) == 200
 
         # Consistency check when both n_random and random_values are set in the constructor
         with pytest.warns(UserWarning) as record:
@@ -260,3 +269,38 @@ class TestIO(object):
         assert -STATISTICAL_UNCERTAINTY_LIMIT < a.mean_value < STATISTICAL_UNCERTAINTY_LIMIT
         assert 1.-STATISTICAL_UNCERTAINTY_LIMIT < a.sigma_low < 1.+STATISTICAL_UNCERTAINTY_LIMIT
         assert 1.-STATISTICAL_UNCERTAINTY_LIMIT < a.sigma_up < 1.+STATISTICAL_UNCERTAINTY_LIMIT
+
+    def test_coverage(self):
+        # The 1 sigma interval is the one of the evaluation of a, both for the analytic
+        # evaluation of its distribution and for the evaluation of its random values
+        a = Unc(1., 0.1, 0.2, store=True, n_random=100000)
+        assert a.coverage(0.6827) == pytest.approx([a.mean_value - a.sigma_low,
+                                                    a.mean_value + a.sigma_up])
+        analytic_intervals = a.coverage([0.6827, 0.9545, 0.9973])
+
+        with option_context(input_evaluation="sampled"):
+            a = Unc(1., 0.1, 0.2, store=True, n_random=100000)
+            assert a.coverage(0.6827) == pytest.approx([a.mean_value - a.sigma_low,
+                                                        a.mean_value + a.sigma_up])
+            sorted_random_values = a.sorted_random_values
+            intervals = a.coverage([0.6827, 0.9545, 0.9973])
+        assert a.sorted_random_values is sorted_random_values
+        assert analytic_intervals == pytest.approx(intervals, abs=0.02)
+        assert intervals.shape == (3, 2)
+        assert (intervals[1:, 0] < intervals[:-1, 0]).all()
+        assert (intervals[1:, 1] > intervals[:-1, 1]).all()
+        assert intervals[1] == pytest.approx([0.78, 1.37], abs=0.01)
+
+        b = Unc(1., 0.1, 0.2, n_random=100000)
+        assert b.coverage(0.9545) == pytest.approx([0.78, 1.37], abs=0.01)
+        assert array_equal(Unc(2., 0., 0.).coverage([0.5, 0.9]), [[2., 2.], [2., 2.]])
+
+        evaluation = evaluate(a.random_values, full_output=True,
+                              coverage_probabilities=[0.6827, 0.9545, 0.9973])
+        assert array_equal(evaluation[2]["coverage_intervals"], intervals)
+        evaluation = evaluate(a.random_values, full_output=True, weights=ones(100000),
+                              coverage_probabilities=[0.6827, 0.9545, 0.9973])
+        assert evaluation[2]["coverage_intervals"] == pytest.approx(intervals, abs=1e-3)
+
+        with pytest.raises(ValueError):
+            a.coverage(95.45)
@@ -0,0 +1,84 @@
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from asym_uncertainty import (Unc, clear_mode_estimator_info, exp, mode_estimator_info,
+                              option_context)
+
+N_RANDOM = 100000
+
+def n_mode_estimations():
+    return sum(info["calls"] for info in mode_estimator_info().values())
+
+class TestLazyEvaluation(object):
+    def test_stored_expression(self):
+        a, b, c, d, e = [Unc(1. + i, 0.1, 0.2, store=True, n_random=N_RANDOM) for i in range(5)]
+        y_eager = a*b + c*d - e
+
+        with option_context(lazy_evaluation=True):
+            clear_mode_estimator_info()
+            y = a*b + c*d - e
+            assert n_mode_estimations() == 0
+            assert y.pending_evaluation is not None
+
+        # Only y is evaluated, using the options at the time of the operation
+        assert y.mean_value == y_eager.mean_value
+        assert [y.sigma_low, y.sigma_up] == [y_eager.sigma_low, y_eager.sigma_up]
+        assert y.rounded == pytest.approx(y_eager.rounded)
+        assert y.pending_evaluation is None
+        assert n_mode_estimations() == 1
+
+    def test_intermediate_results(self):
+        a, b, c, d, e = [Unc(1. + i, 0.1, 0.2, n_random=N_RANDOM) for i in range(5)]
+
+        with option_context(lazy_evaluation=True):
+            clear_mode_estimator_info()
+            y = a*b + c*d - e
+            # The intermediate results are represented by their random values
+            assert n_mode_estimations() == 0
+
+        assert y.pending_random_values is not None
+        mean_value = y.mean_value
+        assert y.pending_random_values is None
+        assert n_mode_estimations() == 1
+
+        # Like in an expression graph, each input is sampled once
+        with option_context(expression_graph=True):
+            y_graph = a*b + c*d - e
+        assert mean_value == pytest.approx(y_graph.mean_value)
+        assert [y.sigma_low, y.sigma_up] == pytest.approx([y_graph.sigma_low, y_graph.sigma_up])
+
+    def test_analytic_operands(self):
+        a = Unc(1., 0.1, 0.2, n_random=N_RANDOM)
+        b = Unc(2., 0.3, 0.1, n_random=N_RANDOM)
+
+        with option_context(lazy_evaluation=True):
+            clear_mode_estimator_info()
+            y = exp(a)*b + 1.
+            # exp(a) keeps its random values until it is evaluated, and exp(a)*b is
+            # calculated from them. Neither exp(a), exp(a)*b nor y are evaluated.
+            assert n_mode_estimations() == 0
+        assert y.mean_value > 1.
+        assert not y.is_exact
+        # y is evaluated from exp(a)*b, but exp(a) is never evaluated
+        assert n_mode_estimations() == 1
+
+        # Setting a value replaces the pending evaluation
+        with option_context(lazy_evaluation=True):
+            y = a*b
+        y.set_mean_value(5.)
+        assert y.mean_value == 5.
+        assert y.sigma_low > 0.
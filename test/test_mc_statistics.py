@@ -14,12 +14,18 @@
 #    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
 
 import pytest
-from numpy import array, concatenate, inf, linspace, maximum, mean, std
+from numpy import array, array_equal, concatenate, empty, inf, linspace, maximum, mean, std
 from scipy.stats import norm
 from scipy.stats import expon
 from scipy.stats import beta 
+from scipy.stats import truncnorm
 
-from asym_uncertainty import cdf, check_num_array_argument, chi2, randn_asym, shortest_coverage
+from asym_uncertainty import (MODE_ESTIMATORS, asym_normal_ppf, asym_normal_shortest_coverage,
+                              cdf, check_num_array_argument, chi2, clear_mode_estimator_info,
+                              evaluate, evaluate_approximate, evaluate_batch,
+                              evaluate_distribution, mode_estimator_info, option_context, randn_asym,
+                              randn_asym_untruncated, register_mode_estimator, shortest_coverage,
+                              shortest_coverage_indices, truncated_normal_ppf, Unc)
 
 def test_cdf():
     # Test CDF with a simple array
@@ -89,6 +95,117 @@ def test_shortest_coverage():
 
     assert sc_result[1] - sc_result[3] <= 0. and sc_result[1] + sc_result[3] >= 0.
 
+def test_coverage_uncertainties():
+    random_values = randn_asym(0., [1., 1.], random_seed=1, n_random=int(1e6))
+    evaluation = evaluate(random_values, full_output=True, coverage_uncertainty="order_statistics")
+    bound = evaluation[2]["coverage_uncertainties"]
+    evaluation = evaluate(random_values, full_output=True, coverage_uncertainty="bootstrap",
+                          random_seed=1)
+    bootstrap = evaluation[2]["coverage_uncertainties"]
+    assert evaluate(random_values, full_output=True)[2]["coverage_uncertainties"] is None
+
+    # Spread of the endpoints for independent samples
+    endpoints = array([shortest_coverage(cdf(randn_asym(0., [1., 1.], random_seed=seed,
+                                                        n_random=int(1e6))))
+                       for seed in range(2, 12)])
+    spread = std(endpoints, axis=0)
+    assert (bootstrap > 0.3*spread).all() and (bootstrap < 3.*spread).all()
+    assert (bound > bootstrap).all()
+
+    # The bounds shrink with the number of values
+    evaluation = evaluate(random_values[:10000], full_output=True,
+                          coverage_uncertainty="order_statistics")
+    assert (evaluation[2]["coverage_uncertainties"] > bound).all()
+
+def test_evaluate_sorted():
+    # The shortest coverage interval from a single sorted array is the same as from the CDF,
+    # and sorting in place does not change the evaluation
+    rand = randn_asym(1., [0.1, 0.2], random_seed=1, n_random=100000)
+    sorted_rand = cdf(rand)[0]
+    first, last = shortest_coverage_indices(sorted_rand)
+    assert array_equal(sorted_rand[[first, last]], shortest_coverage(cdf(rand)))
+
+    evaluation = evaluate(rand)
+    assert not array_equal(evaluation[1], sorted_rand)
+    evaluation_in_place = evaluate(rand.copy(), overwrite_input=True)
+    assert evaluation_in_place[0] == evaluation[0]
+    assert array_equal(evaluation_in_place[1], sorted_rand)
+
+    # Values which are equal to the endpoints are inside the shortest coverage interval
+    register_mode_estimator("mean", lambda data, limits, weights=None, distribution=None:
+                            data.mean(), "O(N)")
+    try:
+        discrete = array([9., 2., 2., 1., 2., 2., 2., 2., 1., 9.])
+        assert evaluate(discrete, mode_estimator="mean")[0] == [1.75, 0.75, 0.25]
+    finally:
+        del MODE_ESTIMATORS["mean"]
+
+def test_evaluate_approximate():
+    rand = randn_asym(1., [0.1, 0.2], random_seed=1, n_random=200000)
+    evaluation = evaluate(rand)[0]
+    s_cov = [evaluation[0] - evaluation[1], evaluation[0] + evaluation[2]]
+
+    # The error bounds of the endpoints hold and are a few bins of the histogram wide
+    approximate, _, info = evaluate_approximate(rand, full_output=True)
+    bin_width = (rand.max() - rand.min())/2**16
+    for endpoint, approximate_endpoint, error in zip(
+            s_cov, [approximate[0] - approximate[1], approximate[0] + approximate[2]],
+            info["coverage_errors"]):
+        assert abs(approximate_endpoint - endpoint) <= error < 100.*bin_width
+    assert approximate[0] == pytest.approx(evaluation[0], abs=1e-4)
+
+    # The refined endpoints are exact, also for discrete values
+    refined, _, info = evaluate_approximate(rand, refine=True, full_output=True)
+    assert [refined[0] - refined[1], refined[0] + refined[2]] == s_cov
+    assert info["coverage_errors"] == [0., 0.]
+    assert refined[0] == pytest.approx(evaluation[0], abs=1e-4)
+    discrete = (10.*rand).round()
+    evaluation = evaluate(discrete, use_kde=False)[0]
+    refined = evaluate_approximate(discrete, use_kde=False, refine=True, n_bins=64)[0]
+    assert refined == evaluation
+
+    # The option 'evaluation' selects the approximate evaluation, but sorted values are
+    # evaluated exactly
+    with option_context(evaluation="refined"):
+        assert evaluate(rand)[0] == evaluate_approximate(rand, refine=True)[0]
+        assert (evaluate(cdf(rand)[0], presorted=True)[0] ==
+                evaluate(rand, evaluation="exact")[0])
+        x = Unc(1., 0.1, 0.2)
+        assert (2.*x).sigma_up == pytest.approx(0.4, rel=0.01)
+
+    assert evaluate_approximate(0.*rand + 2.)[0] == [2., 0., 0.]
+    with pytest.raises(ValueError):
+        evaluate_approximate(rand, n_bins=1)
+
+@pytest.mark.parametrize("mode_estimator", ["binned_kde", "histogram", "half_sample"])
+def test_evaluate_batch(mode_estimator):
+    # Two blocks of rows with different distributions and a constant row
+    rand_results = empty((100, 5000))
+    for i in range(99):
+        rand_results[i] = randn_asym(1. + i, [0.1, 0.01*(i + 1)], random_seed=i, n_random=5000)
+    rand_results[99] = 2.
+
+    clear_mode_estimator_info()
+    evaluation = evaluate_batch(rand_results, mode_estimator=mode_estimator)
+    assert mode_estimator_info()[mode_estimator]["calls"] == 100
+    assert evaluation.shape == (100, 3)
+    assert array_equal(evaluation[99], [2., 0., 0.])
+
+    for rand_result, batch_evaluation in zip(rand_results, evaluation):
+        single_evaluation = evaluate(rand_result, mode_estimator=mode_estimator)[0]
+        # The binned kernel density estimates use different grids
+        tolerance = 1e-3*single_evaluation[1] if mode_estimator == "binned_kde" else 1e-12
+        assert batch_evaluation == pytest.approx(single_evaluation, abs=tolerance)
+        assert (batch_evaluation[0] - batch_evaluation[1] ==
+                single_evaluation[0] - single_evaluation[1])
+
+    assert array_equal(evaluate_batch(rand_results, mode_estimator=mode_estimator,
+                                      overwrite_input=True), evaluation)
+    assert (rand_results[:, 1:] >= rand_results[:, :-1]).all()
+
+    with pytest.raises(ValueError):
+        evaluate_batch(rand_results[0])
+
 def test_chi2():
     assert chi2(array([0., 1.]), array([1., 1.]), array([1., 0.]), degrees_of_freedom=1) == 2.
 
@@ -177,3 +294,83 @@ def test_randn_asym_input():
         len(randn_asym(1, [0.5, 0.5], limits=[-inf, 0.], n_random=1))
     with pytest.raises(TypeError):
         len(randn_asym(1, [0.5, 0.5], limits=[0., 2.], n_random=1))
+
+def test_randn_asym_untruncated():
+    # Half of the values should be on each side of the mode, and each side should have
+    # the shape of a half-normal distribution with the respective sigma
+    random_values = randn_asym_untruncated(1., [0.5, 2.], random_seed=1, n_random=int(1e5))
+    low = random_values[random_values < 1.]
+    up = random_values[random_values >= 1.]
+    assert 0.49 <= len(low)/len(random_values) <= 0.51
+    assert 0.39 <= mean(1. - low) <= 0.41
+    assert 1.58 <= mean(up - 1.) <= 1.61
+
+    # Branch weights for the conservation of the mean value
+    random_values = randn_asym_untruncated(0., [1., 3.], probability_low=0.75, random_seed=1,
+                                           n_random=int(1e5))
+    assert 0.74 <= mean(random_values < 0.) <= 0.76
+    assert -0.02 <= mean(random_values) <= 0.02
+
+    # The result is written into a given buffer
+    buffer = empty(1000)
+    random_values = randn_asym(1., [0.5, 2.], random_seed=3, n_random=1000, out=buffer)
+    assert random_values is buffer
+    assert array_equal(buffer, randn_asym(1., [0.5, 2.], random_seed=3, n_random=1000))
+
+    buffer = empty(1000)
+    random_values = randn_asym(1., [0.5, 2.], limits=[0., 2.], random_seed=3, n_random=1000,
+                               out=buffer)
+    assert random_values is buffer
+    assert (buffer >= 0.).all() and (buffer <= 2.).all()
+
+def test_randn_asym_truncated():
+    # Compare the inverse CDF of the truncated normal distribution with scipy, also for
+    # limits far out in the tails
+    u = linspace(0.01, 0.99, 99)
+    for limits in ([-inf, 0.], [-1., 2.], [4., inf], [-45., -40.], [30., 31.]):
+        assert maximum.reduce(abs(truncated_normal_ppf(u, limits[0], limits[1]) -
+                                  truncnorm.ppf(u, limits[0], limits[1]))) < 1e-10
+
+    # Without limits, the asymmetric inverse CDF is given by the two halves of normal
+    # distributions
+    assert abs(asym_normal_ppf(0.25, 1., [0.5, 2.]) - (1. + 0.5*norm.ppf(0.25))) < 1e-12
+    assert abs(asym_normal_ppf(0.75, 1., [0.5, 2.]) - (1. + 2.*norm.ppf(0.75))) < 1e-12
+
+    # Truncated distributions with limits many sigma away from the mode must neither give
+    # infinite values nor values outside the limits
+    for limits in ([10., inf], [2., 2.5], [-inf, -40.], [40., 40.1]):
+        random_values = randn_asym(0., [1., 1.], limits=limits, random_seed=1,
+                                   n_random=int(1e5))
+        assert (random_values >= limits[0]).all() and (random_values <= limits[1]).all()
+        assert abs(mean(random_values) - truncnorm.mean(limits[0], limits[1])) < 0.01
+
+def test_asym_normal_shortest_coverage():
+    # Without limits and with equal standard deviations, the interval is symmetric
+    assert asym_normal_shortest_coverage(1., [0.5, 0.5], coverage_percent=95.) == pytest.approx(
+        [1. - 0.5*norm.ppf(0.975), 1. + 0.5*norm.ppf(0.975)])
+
+    # Compare with the shortest coverage interval of random values
+    for mean_value, sigma, limits in ((1., [0.5, 2.], None), (0., [1., 2.], [-0.5, 3.]),
+                                      (0., [1., 2.], [0.5, 3.]), (0., [2., 1.], [-3., -0.5])):
+        interval = asym_normal_shortest_coverage(mean_value, sigma, limits=limits)
+        random_values = randn_asym(mean_value, sigma, limits=limits, random_seed=1,
+                                   n_random=int(1e6))
+        assert interval == pytest.approx(shortest_coverage(cdf(random_values)), abs=0.01)
+        assert mean((random_values >= interval[0])*(random_values <= interval[1])) == \
+            pytest.approx(0.6827, abs=0.002)
+
+    evaluation = evaluate_distribution([0., [1., 2.], [0.5, 3.]])
+    assert evaluation[0] == 0.5
+    assert evaluation[1] == 0.
+
+    # Stored inputs are evaluated analytically, also after changing their limits
+    x = Unc(1., 0.1, 0.2, store=True)
+    assert x.mean_value == 1.
+    assert [x.sigma_low, x.sigma_up] == evaluate_distribution([1., [0.1, 0.2], [-inf, inf]])[1:]
+    x.set_limits([1.1, 2.])
+    assert x.sampled_distribution == [1., [0.1, 0.2], [1.1, 2.]]
+    assert (x.random_values >= 1.1).all()
+    assert [x.mean_value, x.sigma_low, x.sigma_up] == evaluate_distribution(
+        x.sampled_distribution)
+    with option_context(input_evaluation="sampled"):
+        assert Unc(1., 0.1, 0.2, store=True).mean_value != 1.
@@ -14,8 +14,13 @@
 #    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
 
 import pytest
+from numpy import array, linspace, median, ones
+from numpy.random import default_rng
+from scipy.stats import gaussian_kde
 
-from asym_uncertainty import Unc, evaluate
+from asym_uncertainty import (MODE_ESTIMATORS, Unc, binned_kde_mode, clear_mode_estimator_info,
+                              evaluate, half_sample_mode, linear_binning, mode_estimator_info,
+                              option_context, randn_asym, register_mode_estimator)
 
 def test_mode():
 
@@ -25,4 +30,83 @@ def test_mode():
 
     mode_kde = evaluate(data.random_values,use_kde=True)[0][0]
 
-    assert -0.1 <= mode_kde <= 0.1
\ No newline at end of file
+    assert -0.1 <= mode_kde <= 0.1
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_binned_kde_mode(weighted):
+    rng = default_rng(1)
+    data = rng.gamma(3., size=20000)
+    data = data[(data > 1.) & (data < 3.5)]
+    weights = rng.uniform(0.5, 1.5, size=len(data)) if weighted else None
+
+    # Maximum of the exact KDE on a fine grid
+    grid = linspace(1., 3.5, 20001)
+    density = gaussian_kde(data, weights=weights)(grid)
+    exact_mode = grid[density.argmax()]
+
+    assert binned_kde_mode(data, [1., 3.5], weights=weights) == pytest.approx(exact_mode,
+                                                                               abs=2e-4)
+
+def test_linear_binning():
+    data = default_rng(2).uniform(0., 1., size=1000)
+    weights = default_rng(3).uniform(0., 2., size=1000)
+
+    grid_weights = linear_binning(data, 0., 0.1, 11, weights=weights)
+    assert grid_weights.sum() == pytest.approx(weights.sum())
+    assert (grid_weights*linspace(0., 1., 11)).sum() == pytest.approx((weights*data).sum())
+
+    assert binned_kde_mode(linspace(2., 2., 10), [1., 3.]) == 2.
+
+@pytest.mark.parametrize("mode_estimator", ["binned_kde", "half_sample", "histogram",
+                                            "subsample_kde"])
+def test_mode_estimators(mode_estimator):
+    rand = randn_asym(1., [0.1, 0.2], random_seed=1, n_random=100000)
+    mode = evaluate(rand, mode_estimator=mode_estimator)[0][0]
+    assert abs(mode - 1.) < 0.04
+
+    with option_context(mode_estimator=mode_estimator):
+        assert evaluate(rand)[0][0] == mode
+
+def test_half_sample_mode():
+    data = array([9., 2.5, 1., 2., 5., 2.75])
+    assert half_sample_mode(data) == 2.625
+    assert half_sample_mode(data, weights=ones(6)) == 2.625
+    assert half_sample_mode(array([1., 2.])) == 1.5
+
+def test_mode_estimator_registry():
+    clear_mode_estimator_info()
+    rand = randn_asym(1., [0.1, 0.2], random_seed=1, n_random=10000)
+
+    # Without a known distribution, the analytic estimator falls back to the binned KDE
+    evaluation = evaluate(rand, mode_estimator="analytic", full_output=True)
+    assert evaluation[2]["mode_estimator"] == "binned_kde"
+    assert evaluation[2]["mode_seconds"] > 0.
+    evaluation = evaluate(rand, mode_estimator="analytic", full_output=True,
+                          distribution=[1., [0.1, 0.2], [0.95, 2.]])
+    assert evaluation[0][0] == 1.
+    assert evaluation[2]["mode_estimator"] == "analytic"
+    assert evaluate(rand, use_kde=False, full_output=True)[2]["mode_estimator"] == "histogram"
+
+    info = mode_estimator_info()
+    assert [info[name]["calls"] for name in ("analytic", "binned_kde", "histogram")] == [1, 1, 1]
+    assert info["histogram"]["cost"] == "O(N)"
+
+    with option_context(mode_estimator="analytic"):
+        assert Unc(1., 0.1, 0.2, store=True, n_random=10000).mean_value == 1.
+        assert Unc(1., 0.1, 0.2, store=True, n_random=10000, limits=[1.5, 3.]).mean_value == pytest.approx(
+            1.5, abs=1e-3)
+
+    register_mode_estimator("median", lambda data, limits, weights=None, distribution=None:
+                            median(data), "O(N)")
+    try:
+        with option_context(mode_estimator="median"):
+            mode, sigma_low, sigma_up = evaluate(rand)[0]
+        assert mode == median(rand[(rand >= mode - sigma_low) & (rand <= mode + sigma_up)])
+    finally:
+        del MODE_ESTIMATORS["median"]
+
+    with pytest.raises(ValueError):
+        with option_context(mode_estimator="median"):
+            pass
+    with pytest.raises(ValueError):
+        evaluate(rand, mode_estimator="median")
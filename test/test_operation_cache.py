@@ -0,0 +1,94 @@
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+from asym_uncertainty import (Unc, clear_operation_cache, exp, OPERATION_CACHE_ENTRY_BYTES,
+                              operation_cache_info, option_context)
+
+N_RANDOM = 10000
+
+class TestOperationCache(object):
+    def test_hits_and_invalidation(self):
+        a = Unc(1., 0.1, 0.2, n_random=N_RANDOM)
+        b = Unc(2., 0.3, 0.1, n_random=N_RANDOM)
+
+        clear_operation_cache()
+        assert a/b is not a/b
+        assert operation_cache_info()["n_entries"] == 0
+
+        with option_context(operation_cache_size=2**20):
+            ratio = a/b
+            # The repeated ratio is the same quantity
+            assert a/b is ratio
+            assert (exp(a/b) - exp(ratio)).is_exact
+            assert a/b is not b/a and 2.*a is not 3.*a
+            info = operation_cache_info()
+            assert [info["hits"], info["misses"]] == [4, 6]
+            assert info["hit_rate"] == 0.4
+
+            # Changing an operand or the result removes the entries
+            b.set_sigma_low(0.2)
+            assert operation_cache_info()["invalidations"] == 2
+            assert a/b is not ratio
+            ratio = a/b
+            ratio.set_mean_value(0.6)
+            assert a/b is not ratio
+
+            # Stored operands are identified by their random values
+            c = Unc(1., 0.1, 0.1, store=True, n_random=N_RANDOM)
+            product = c*b
+            assert c*b is product
+            c.random_values = 2.*c.random_values
+            assert c*b is not product
+            product = c*b
+            c.random_values[N_RANDOM//2 + 1] += 1.
+            assert c*b is not product
+
+            # Results depend on the options
+            with option_context(mode_estimator="histogram"):
+                product = a*b
+            assert a*b is not product and a*b is a*b
+
+    def test_eviction(self):
+        a = Unc(1., 0.1, 0.2, store=True, n_random=N_RANDOM)
+
+        entry_bytes = 8*N_RANDOM + OPERATION_CACHE_ENTRY_BYTES
+        clear_operation_cache()
+        with option_context(operation_cache_size=2*entry_bytes):
+            results = [a*i for i in range(3)]
+            info = operation_cache_info()
+            assert [info["evictions"], info["n_entries"], info["n_bytes"]] == \
+                [1, 2, 2*entry_bytes]
+
+            # The least recently used product was evicted
+            assert a*2 is results[2]
+            assert a*0 is not results[0]
+
+    def test_unstored_results(self):
+        a = Unc(1., 0.1, 0.2, n_random=N_RANDOM)
+
+        # Results without random values still count against the size of the cache
+        clear_operation_cache()
+        with option_context(operation_cache_size=3*OPERATION_CACHE_ENTRY_BYTES):
+            for i in range(5):
+                a*i
+            info = operation_cache_info()
+            assert [info["evictions"], info["n_entries"], info["n_bytes"]] == \
+                [2, 3, 3*OPERATION_CACHE_ENTRY_BYTES]
+
+        # Pending lazy evaluations keep their random values
+        clear_operation_cache()
+        with option_context(operation_cache_size=2**20, lazy_evaluation=True):
+            a*a
+            assert operation_cache_info()["n_bytes"] == 8*N_RANDOM + OPERATION_CACHE_ENTRY_BYTES
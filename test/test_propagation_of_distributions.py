@@ -17,7 +17,7 @@ import pytest
 
 from numpy import array, array_equal
 
-from asym_uncertainty import Unc
+from asym_uncertainty import sample_operand, Unc
 
 class TestPropagation(object):
     def test_n_random_mismatch(self):
@@ -85,6 +85,20 @@ class TestPropagation(object):
         assert len(c.random_values) == 3
         assert array_equal(array([2., 3., 6.]), c.random_values)
 
+    def test_stored_left_operand(self):
+        # The stored values of one operand must be combined with the values sampled for
+        # the other one, also if only the left-hand operand stores its values
+        a = Unc(1., 0.5, 0.5, random_values=array([1., 2., 4.]), store=True)
+        b = Unc(1., 0.5, 0.5, n_random=3)
+        rand_b = sample_operand(b)
+
+        for result, rand_result in [(a + b, array([1., 2., 4.]) + rand_b),
+                                    (a - b, array([1., 2., 4.]) - rand_b),
+                                    (a*b, array([1., 2., 4.])*rand_b),
+                                    (a**b, array([1., 2., 4.])**rand_b)]:
+            assert len(result.random_values) == 3
+            assert array_equal(rand_result, result.random_values)
+
     def test_division(self):
         # Test without storage of random values
         with pytest.warns(UserWarning):
@@ -0,0 +1,107 @@
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+import warnings
+
+import pytest
+from numpy import arange, array_equal, bitwise_xor, floor, histogram2d, sort, zeros
+from scipy.stats import norm, qmc
+
+from asym_uncertainty import (latin_hypercube_points, option_context, quasi_random, randn_asym,
+                              SOBOL_BITS, sobol_dimension, sobol_direction_numbers, sobol_points)
+
+class TestQuasiRandom(object):
+    def test_points(self):
+        n_points = 2**10
+
+        for points in (sobol_points(random_seed=3, n_random=n_points),
+                       latin_hypercube_points(random_seed=3, n_random=n_points)):
+            # Exactly one point in each of the intervals [k/n_points, (k + 1)/n_points)
+            assert array_equal(sort(floor(points*n_points)), arange(n_points))
+
+        # Different seeds give different dimensions, which are evenly distributed
+        points_2d = histogram2d(sobol_points(random_seed=1, n_random=n_points),
+                                sobol_points(random_seed=2, n_random=n_points), bins=2)[0]
+        assert (points_2d == n_points/4).all()
+
+        assert array_equal(sobol_points(random_seed=3, n_random=100),
+                           sobol_points(random_seed=3, n_random=100))
+        assert not array_equal(sobol_points(random_seed=3, n_random=100),
+                               sobol_points(random_seed=4, n_random=100))
+
+        # Large seeds get small dimensions
+        sobol_points(random_seed=10**6, n_random=n_points)
+        assert sobol_dimension(10**6) < 10
+
+    def test_direction_numbers(self):
+        assert array_equal(sobol_direction_numbers(0, SOBOL_BITS),
+                           2**arange(SOBOL_BITS - 1, -1, -1))
+
+        # The unscrambled points agree with the ones of scipy.stats.qmc.Sobol
+        n_bits = 10
+        index = arange(2**n_bits)
+        gray_code = index ^ (index >> 1)
+        scipy_points = qmc.Sobol(d=8, scramble=False, bits=SOBOL_BITS).random(2**n_bits)
+        for dimension in range(8):
+            direction_numbers = sobol_direction_numbers(dimension, n_bits)
+            points_int = zeros(2**n_bits, dtype=int)
+            for i in range(n_bits):
+                points_int = bitwise_xor(points_int, ((gray_code >> i) & 1)*direction_numbers[i])
+            assert array_equal(points_int, scipy_points[:, dimension]*2**SOBOL_BITS)
+
+    def test_fallback_warning(self, monkeypatch):
+        n_points = 2**10
+
+        # All dimensions are in use
+        sobol_points(random_seed=1, n_random=n_points)
+        monkeypatch.setattr(quasi_random, "SOBOL_MAX_DIMENSION", len(quasi_random.SOBOL_DIMENSIONS))
+
+        # The fallback to Latin hypercube sampling is only reported once per seed
+        seed = max(quasi_random.SOBOL_DIMENSIONS) + 1
+        with pytest.warns(UserWarning):
+            points = sobol_points(random_seed=seed, n_random=n_points)
+        assert array_equal(sort(floor(points*n_points)), arange(n_points))
+        assert sobol_dimension(seed) is None
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            sobol_points(random_seed=seed, n_random=n_points)
+            # Seeds which already have a dimension still get Sobol' points
+            sobol_points(random_seed=1, n_random=n_points)
+
+        with pytest.warns(UserWarning):
+            sobol_points(random_seed=seed + 1, n_random=n_points)
+
+    def test_randn_asym(self):
+        n_random = 2**12
+
+        with option_context(sampling="sobol"):
+            rand = randn_asym(1., [0.5, 2.], random_seed=1, n_random=n_random)
+            assert array_equal(rand, randn_asym(1., [0.5, 2.], random_seed=1,
+                                                n_random=n_random))
+            # The sample mean is much closer to the exact one than for pseudo-random numbers
+            assert abs(rand.mean() - (1. + 1.5*norm.pdf(0.))) < 1e-3
+
+            rand = randn_asym(1., [0.5, 2.], limits=[0., 1.5], random_seed=2,
+                              n_random=n_random)
+            assert rand.min() >= 0. and rand.max() <= 1.5
+
+        with option_context(sampling="lhs"):
+            rand = randn_asym(0., [1., 1.], random_seed=1, n_random=n_random)
+            assert abs(rand.std() - 1.) < 1e-2
+
+        with pytest.raises(ValueError):
+            with option_context(sampling="halton"):
+                pass
@@ -0,0 +1,96 @@
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from numpy import array_equal, sort
+
+from asym_uncertainty import (evaluate, generator, get_option, merge_sorted, option_context,
+                              PREFIX_BLOCK_SIZE, randn_asym, randn_asym_prefix, set_option,
+                              STREAM_RESAMPLING, Unc)
+
+class TestRandomStreams(object):
+    def test_generator(self):
+        # The same seed gives the same stream, different seeds and different stream keys
+        # give different streams
+        assert array_equal(generator(1).standard_normal(10), generator(1).standard_normal(10))
+        assert not array_equal(generator(1).standard_normal(10),
+                               generator(2).standard_normal(10))
+        assert not array_equal(generator(1).standard_normal(10),
+                               generator(1, stream=STREAM_RESAMPLING).standard_normal(10))
+
+        with pytest.raises(ValueError):
+            generator(-1)
+        with pytest.raises(ValueError):
+            generator(1.5)
+
+    def test_bit_generator(self):
+        assert get_option("bit_generator") == "PCG64"
+
+        random_values_pcg = randn_asym(0., [1., 1.], random_seed=1, n_random=100)
+        with option_context(bit_generator="Philox"):
+            random_values_philox = randn_asym(0., [1., 1.], random_seed=1, n_random=100)
+            assert array_equal(random_values_philox,
+                               randn_asym(0., [1., 1.], random_seed=1, n_random=100))
+        assert get_option("bit_generator") == "PCG64"
+        assert not array_equal(random_values_pcg, random_values_philox)
+
+        with pytest.raises(ValueError):
+            set_option("bit_generator", "MT19937")
+        with pytest.raises(ValueError):
+            set_option("no_option", 1)
+
+    def test_threads(self):
+        # Propagating independent quantities in parallel threads must give the same results
+        # as propagating them one after another.
+        def propagate(seed):
+            return randn_asym(1., [0.5, 1.], limits=[0., 3.], random_seed=seed, n_random=1000)
+
+        serial = [propagate(seed) for seed in range(16)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            parallel = list(executor.map(propagate, range(16)))
+
+        for serial_values, parallel_values in zip(serial, parallel):
+            assert array_equal(serial_values, parallel_values)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            seeds = list(executor.map(lambda _: Unc(1., 0.1, 0.1, n_random=10).seed, range(64)))
+        assert len(set(seeds)) == 64
+
+    def test_prefix_stability(self):
+        n_random = 3*PREFIX_BLOCK_SIZE + 17
+        random_values = randn_asym_prefix(1., [0.5, 1.], limits=[0., 3.], random_seed=1,
+                                          stop=n_random)
+        assert array_equal(randn_asym_prefix(1., [0.5, 1.], limits=[0., 3.], random_seed=1,
+                                             stop=1000), random_values[:1000])
+        assert array_equal(randn_asym_prefix(1., [0.5, 1.], limits=[0., 3.], random_seed=1,
+                                             start=PREFIX_BLOCK_SIZE - 5, stop=n_random),
+                           random_values[PREFIX_BLOCK_SIZE - 5:])
+
+        # Increasing n_random of a stored quantity appends values of the same stream and
+        # merges them into the sorted values
+        with option_context(input_evaluation="sampled"):
+            x = Unc(1., 0.5, 1., store=True, n_random=1000)
+            x.set_n_random(n_random)
+        assert array_equal(x.random_values,
+                           randn_asym_prefix(1., [0.5, 1.], random_seed=x.seed, stop=n_random))
+        assert array_equal(x.sorted_random_values, sort(x.random_values))
+        assert x.mean_value == pytest.approx(evaluate(x.random_values)[0][0])
+
+        assert array_equal(merge_sorted(sort(random_values[:100]), random_values[100:]),
+                           sort(random_values))
+        assert array_equal(merge_sorted(sort(random_values[:-100]), random_values[-100:]),
+                           sort(random_values))
@@ -0,0 +1,81 @@
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+from math import inf
+
+import pytest
+from numpy import concatenate
+from numpy import exp as nexp
+
+from asym_uncertainty import (cdf, correlate, evaluate, sample_chunks, shortest_coverage,
+                              streaming_propagation, Unc)
+
+N_RANDOM = 200000
+
+def model(x, y):
+    return x*nexp(-y)
+
+class TestStreaming(object):
+    @pytest.mark.parametrize("chunk_size, n_bins", [(30000, 2**16), (3000, 64), (100, 8)])
+    def test_shortest_coverage(self, chunk_size, n_bins):
+        x = Unc(1., 0.1, 0.2)
+        y = Unc(2., 0.3, 0.3, limits=[0., inf])
+
+        z = streaming_propagation(model, x, y, n_random=N_RANDOM, chunk_size=chunk_size,
+                                  n_bins=n_bins)
+
+        # Small chunks need several passes to narrow down the endpoints, but the result is
+        # always the same as for all random values at once
+        rand_result = concatenate(list(sample_chunks(model, [x, y], N_RANDOM, chunk_size)))
+        s_cov = shortest_coverage(cdf(rand_result))
+        assert z.mean_value - z.sigma_low == s_cov[0]
+        assert z.mean_value + z.sigma_up == s_cov[1]
+        assert z.n_random == N_RANDOM
+
+        if n_bins == 2**16:
+            assert z.mean_value == pytest.approx(evaluate(rand_result)[0][0], abs=1e-4)
+
+    def test_correlated_stored_inputs(self):
+        x = Unc(1., 0.1, 0.1, n_random=int(1e5), store=True)
+        y = Unc(2., 0.2, 0.2, n_random=int(1e5), store=True)
+
+        # A stored result is re-sampled jointly with the stored inputs it was built from
+        z = streaming_propagation(lambda x, w: w/x, x, x*y, n_random=N_RANDOM, chunk_size=30000)
+        assert z.sigma_low + z.sigma_up == pytest.approx(0.4, rel=0.05)
+
+        x_1, x_2 = correlate([x, x], [[1., 0.99], [0.99, 1.]])
+        z = streaming_propagation(lambda x_1, x_2: x_1 - x_2, x_1, x_2, n_random=N_RANDOM,
+                                  chunk_size=30000)
+        assert z.sigma_low + z.sigma_up < 0.04
+
+    def test_special_cases(self):
+        x = Unc(1., 0.1, 0.2)
+
+        # Discrete values
+        rand_result = concatenate(list(sample_chunks(lambda x: (10.*x).round(), [x], 10000,
+                                                     100)))
+        z = streaming_propagation(lambda x: (10.*x).round(), x, n_random=10000, chunk_size=100)
+        assert [z.mean_value - z.sigma_low,
+                z.mean_value + z.sigma_up] == list(shortest_coverage(cdf(rand_result)))
+
+        z = streaming_propagation(lambda x: 0.*x + 2., x, n_random=1000)
+        assert [z.mean_value, z.sigma_low, z.sigma_up] == [2., 0., 0.]
+
+        with pytest.raises(ValueError):
+            streaming_propagation(model, x, 2., n_random=1)
+        with pytest.raises(ValueError):
+            streaming_propagation(model, x, 2., n_bins=1)
+        with pytest.raises(ValueError):
+            streaming_propagation(model, x, "2")
@@ -0,0 +1,96 @@
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+from math import inf
+
+import pytest
+from numpy import array_equal, linspace
+
+from asym_uncertainty import option_context, randn_asym, Unc, UncArray
+
+N_RANDOM = 10000
+
+class TestUncArray(object):
+    def test_elementwise_operations(self):
+        x = UncArray(linspace(1., 2., 20), 0.1, 0.2, n_random=N_RANDOM)
+        y = UncArray(linspace(2., 3., 20), linspace(0.1, 0.3, 20), limits=[1.5, 4.],
+                     n_random=N_RANDOM)
+        c = Unc(2., 0.3, 0.1, n_random=N_RANDOM)
+
+        # Each element is calculated like the one of the corresponding Unc objects, which
+        # have the same seeds
+        for z, operation in [(x*y, lambda a, b: a*b), (x - c, lambda a, b: a - c),
+                             (c**x, lambda a, b: c**a), (2./y, lambda a, b: 2./b),
+                             (-x + 1., lambda a, b: -a + 1.)]:
+            assert len(z) == 20 and z.n_random == N_RANDOM
+            for i in (0, 7, 19):
+                z_unc = operation(x[i], y[i])
+                if i == 7:
+                    assert not z.store and x[i].seed == x.seeds[i]
+                assert z.mean_value[i] == pytest.approx(z_unc.mean_value, rel=1e-3)
+                assert z.sigma_low[i] == pytest.approx(z_unc.sigma_low, rel=0.05)
+                assert z.sigma_up[i] == pytest.approx(z_unc.sigma_up, rel=0.05)
+
+        assert (x - x).is_exact.all()
+        assert (x/x).mean_value == pytest.approx(1.)
+
+        with pytest.raises(ValueError):
+            x + UncArray([1., 2.])
+        with pytest.raises(ValueError):
+            UncArray([1., 2.], [0.1, -0.1])
+
+    def test_store_and_slices(self):
+        x = UncArray([1., 2., 3., 4.], 0.1, 0.2, store=True, n_random=N_RANDOM)
+        assert x.random_values.shape == (4, N_RANDOM)
+        assert x[1].store and x[1].random_values is not None
+        assert [x.mean_value[1], x.sigma_low[1], x.sigma_up[1]] == \
+            [x[1].mean_value, x[1].sigma_low, x[1].sigma_up]
+
+        # Slices are views
+        x_slice = x[1::2]
+        assert len(x_slice) == 2
+        assert x_slice.random_values.base is x.random_values
+        assert x_slice.mean_value[0] == x.mean_value[1]
+
+        # Results of stored operands store their random values
+        w = UncArray([1., 1.], 0.1, n_random=N_RANDOM)
+        y = x_slice*2. + w
+        assert y.store
+        assert y.random_values[1] == pytest.approx(2.*x.random_values[3] + w.sample()[1])
+        z = UncArray.from_random_values(y.random_values)
+        assert z.mean_value == pytest.approx(y.mean_value)
+
+    def test_sample(self):
+        x = UncArray([1., 2., 3., 4., 5.], [0.1, 0.2, 0., 0.3, 0.1], [0.2, 0.1, 0., 0.1, 0.1],
+                     limits=[[-inf, inf], [-inf, inf], [-inf, inf], [3.5, 6.], [-inf, inf]],
+                     n_random=N_RANDOM)
+
+        # Each row is sampled like the corresponding Unc, also in single precision
+        for dtype in ("float64", "float32"):
+            with option_context(dtype=dtype):
+                rand = x.sample()
+                for i in range(len(x)):
+                    if i == 2:
+                        assert (rand[i] == 3.).all()
+                        continue
+                    assert array_equal(rand[i], randn_asym(
+                        x.mean_value[i], [x.sigma_low[i], x.sigma_up[i]],
+                        limits=list(x.limits[i]), random_seed=int(x.seeds[i]),
+                        n_random=N_RANDOM))
+
+        # Indexing does not reserve new seeds
+        n_instances = Unc.n_instances
+        assert [x[i].seed for i in range(len(x))] == list(x.seeds)
+        assert Unc.n_instances == n_instances
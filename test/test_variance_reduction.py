@@ -0,0 +1,108 @@
+#    This file is part of asym_uncertainty.
+#
+#    asym_uncertainty is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    asym_uncertainty is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with asym_uncertainty.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+from numpy import allclose, maximum, minimum, ones, std
+
+from asym_uncertainty import (asym_normal_mean, cdf, control_variate_weights, evaluate,
+                              option_context, randn_asym, shortest_coverage, Unc,
+                              weighted_cdf, weighted_shortest_coverage)
+
+N_RANDOM = 10000
+
+class TestVarianceReduction(object):
+    def test_antithetic(self):
+        with option_context(antithetic=True):
+            rand = randn_asym(0., [1., 2.], random_seed=1, n_random=N_RANDOM)
+            # Each pair has the same |z| on both sides of the mode
+            assert allclose(maximum(rand[:N_RANDOM//2], rand[N_RANDOM//2:]),
+                            -2.*minimum(rand[:N_RANDOM//2], rand[N_RANDOM//2:]))
+
+            rand = randn_asym(0., [1., 1.], limits=[-1., 1.], random_seed=1, n_random=N_RANDOM)
+            assert allclose(rand[:N_RANDOM//2], -rand[N_RANDOM//2:])
+
+            # Odd numbers of random values have one independent value more
+            assert len(randn_asym(0., [1., 1.], random_seed=1, n_random=101)) == 101
+
+        # The variance of the mean value of a monotonic function decreases
+        means = []
+        for antithetic in (False, True):
+            with option_context(antithetic=antithetic, draw_cache_size=0):
+                means.append([(randn_asym(1., [0.1, 0.2], random_seed=2*i, n_random=N_RANDOM)*
+                               randn_asym(2., [0.3, 0.3], random_seed=2*i + 1,
+                                          n_random=N_RANDOM)).mean()
+                              for i in range(20)])
+        assert std(means[1]) < 0.5*std(means[0])
+
+    def test_stratified(self):
+        with option_context(stratified=True):
+            rand = randn_asym(0., [1., 2.], random_seed=1, n_random=N_RANDOM)
+            assert (rand < 0.).sum() == N_RANDOM//2
+
+            rand = randn_asym(0., [1., 1.], limits=[0., 1.], random_seed=1, n_random=N_RANDOM)
+            assert rand.min() >= 0. and rand.max() <= 1.
+
+    def test_control_variates(self):
+        rand_x = randn_asym(1., [0.1, 0.2], random_seed=1, n_random=N_RANDOM)
+        rand_y = randn_asym(2., [0.3, 0.3], random_seed=2, n_random=N_RANDOM)
+        rand_result = rand_x*rand_y
+
+        control_x = rand_x - asym_normal_mean(1., [0.1, 0.2])
+        weights = control_variate_weights(rand_result, [control_x, rand_y - 2.])
+        assert (weights > 0.).all()
+        assert abs(weights.sum() - N_RANDOM) < 1e-6*N_RANDOM
+
+        # Equal weights give the same shortest coverage interval as the unweighted samples
+        assert allclose(weighted_shortest_coverage(weighted_cdf(rand_result, ones(N_RANDOM))),
+                        shortest_coverage(cdf(rand_result)), atol=1e-3)
+
+        evaluation = evaluate(rand_result, weights=weights, full_output=True)
+        assert 0. < evaluation[2]["effective_sample_size"] <= N_RANDOM
+        assert evaluate(rand_result, full_output=True)[2]["effective_sample_size"] == N_RANDOM
+
+        with option_context(control_variates=True):
+            x = Unc(1., 0.1, 0.2, n_random=N_RANDOM)
+            y = Unc(2., 0.3, 0.3, n_random=N_RANDOM)
+            result = x*y
+            # The mode of the product is about 1.95, the sampling spread is about 0.08
+            assert abs(result.mean_value - 1.95) < 0.15
+            assert abs(result.sigma_low + result.sigma_up - 0.82) < 0.05
+
+    def test_importance_sampling(self):
+        rand, weights = randn_asym(1., [0.5, 2.], limits=[0., 5.], random_seed=1,
+                                   n_random=100*N_RANDOM, importance_scale=2.)
+        assert weights.mean() == pytest.approx(1., abs=0.01)
+        assert (rand*weights).mean() == pytest.approx(asym_normal_mean(1., [0.5, 2.],
+                                                                       limits=[0., 5.]), abs=0.01)
+
+        # The 99.73% interval is more stable than with the same number of unweighted values
+        intervals = [[], []]
+        for seed in range(20):
+            rand = randn_asym(0., [1., 1.], random_seed=seed, n_random=N_RANDOM)
+            intervals[0].append(shortest_coverage(cdf(rand), coverage_percent=99.73))
+            rand, weights = randn_asym(0., [1., 1.], random_seed=seed, n_random=N_RANDOM,
+                                       importance_scale=2.)
+            intervals[1].append(shortest_coverage(cdf(rand, weights), coverage_percent=99.73,
+                                                  weighted=True))
+        assert (std(intervals[1], axis=0) < 0.7*std(intervals[0], axis=0)).all()
+
+        evaluation = evaluate(rand, weights=weights, full_output=True,
+                              coverage_probabilities=[0.9973],
+                              coverage_uncertainty="order_statistics")
+        assert evaluation[2]["coverage_intervals"][0] == pytest.approx([-3., 3.], abs=0.1)
+        assert (evaluation[2]["coverage_uncertainties"] > 0.).all()
+
+        with pytest.raises(ValueError):
+            randn_asym(0., [1., 1.], importance_scale=0.5)